@@ -4,7 +4,7 @@ Application modulaire pour le suivi des configurations de trading
 """
 import streamlit as st
 from trading_dashboard_pro.models.auth import setup_config
-from trading_dashboard_pro.models.data import load_profile_data, save_profile_data
+from trading_dashboard_pro.models.data import load_profile_data, save_profile_data, ProfileData
 from trading_dashboard_pro.views.authentication import show_login_screen
 from trading_dashboard_pro.views.assets import show_assets_view
 from trading_dashboard_pro.views.details import show_details_view
@@ -30,7 +30,7 @@ if 'is_super_admin' not in st.session_state:
 if 'current_profile' not in st.session_state:
     st.session_state.current_profile = ""
 if 'profile_data' not in st.session_state:
-    st.session_state.profile_data = {}
+    st.session_state.profile_data = ProfileData()
 if 'selected_asset' not in st.session_state:
     st.session_state.selected_asset = None
 if 'selected_timeframe' not in st.session_state:
@@ -90,33 +90,26 @@ else:
         if st.session_state.view_mode != "admin" and st.session_state.view_mode != "admin_view_profile":
             st.subheader("Import/Export")
             
-            # Bouton d'export
-            if st.button("Exporter mes données"):
-                from trading_dashboard_pro.models.data import export_profile_data
-                
-                data_str = export_profile_data(st.session_state.current_profile)
-                
-                # Créer un lien de téléchargement
-                import base64
-                b64 = base64.b64encode(data_str.encode()).decode()
-                download_filename = f"{st.session_state.current_profile}_export.json"
-                href = f'<a href="data:file/json;base64,{b64}" download="{download_filename}">Télécharger {download_filename}</a>'
-                st.markdown(href, unsafe_allow_html=True)
+            # Export (fichier temporaire servi par un bouton de téléchargement)
+            with st.expander("Exporter mes données"):
+                from trading_dashboard_pro.views.export import show_export_controls
+                show_export_controls(st.session_state.current_profile, key="user_export")
             
             # Section d'import
             with st.expander("Importer des données"):
-                uploaded_file = st.file_uploader("Choisir un fichier JSON", type=["json"])
+                uploaded_file = st.file_uploader("Choisir un fichier d'export", type=["json", "gz", "zip"])
                 merge_option = st.checkbox("Fusionner avec les données existantes", value=True)
                 
                 if uploaded_file is not None and st.button("Importer"):
-                    from trading_dashboard_pro.models.data import import_profile_data
+                    from trading_dashboard_pro.models.data import import_profile_file, format_import_report
                     
-                    json_data = uploaded_file.read().decode("utf-8")
-                    success, message = import_profile_data(
+                    # Lecture incrémentale du fichier, sans le décoder en entier
+                    report = import_profile_file(
                         st.session_state.current_profile,
-                        json_data,
+                        uploaded_file,
                         merge=merge_option
                     )
+                    success, message = format_import_report(st.session_state.current_profile, report)
                     
                     if success:
                         st.success(message)
@@ -131,14 +124,14 @@ else:
         
         # Bouton de déconnexion
         if st.button("Se déconnecter"):
-            # Sauvegarder les données avant déconnexion
+            # Sauvegarder les données avant déconnexion (écrit aussi les sauvegardes en attente)
             save_profile_data(st.session_state.current_profile, st.session_state.profile_data)
             
             # Réinitialiser les variables de session
             st.session_state.is_logged_in = False
             st.session_state.is_super_admin = False
             st.session_state.current_profile = ""
-            st.session_state.profile_data = {}
+            st.session_state.profile_data = ProfileData()
             st.session_state.selected_asset = None
             st.session_state.selected_timeframe = None
             st.session_state.view_mode = "assets"
@@ -168,6 +161,12 @@ else:
         # Vue principale unifiée (tout sur une page)
         st.session_state.view_mode = "assets"
         
+        # Champs aussi modifiés par une autre session lors des dernières sauvegardes
+        conflicts = st.session_state.profile_data.pop_conflicts()
+        if conflicts:
+            st.warning("Modifications concurrentes: ces champs avaient aussi été modifiés dans une autre "
+                       f"session, vos valeurs ont été conservées: {'; '.join(conflicts)}")
+        
         # Créer un layout à deux colonnes
         col1, col2 = st.columns([1, 1])
         
@@ -187,13 +186,11 @@ else:
         with col2:
             # Panneau de droite : détails de la configuration sélectionnée
             if st.session_state.selected_asset and st.session_state.selected_timeframe:
-                # Vue détaillée d'une configuration
-                updated_data = show_details_view(st.session_state.selected_asset, st.session_state.selected_timeframe)
-                
-                # Si les données ont changé, les sauvegarder
-                if updated_data != st.session_state.profile_data:
-                    st.session_state.profile_data = updated_data
-                    save_profile_data(st.session_state.current_profile, updated_data)
+                # Vue détaillée d'une configuration; elle sauvegarde elle-même les
+                # modifications, détectées par un changement de révision des données
+                st.session_state.profile_data = show_details_view(
+                    st.session_state.selected_asset, st.session_state.selected_timeframe
+                )
             else:
                 st.info("Sélectionnez une configuration en cliquant sur une cellule du tableau pour voir les détails.")
 
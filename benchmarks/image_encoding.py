@@ -0,0 +1,129 @@
+"""
+Benchmark of the screenshot encoding policies.
+Encodes generated sample charts with each policy and prints the stored size
+(raw and as base64 in an export) and the encode time.
+
+    python -m benchmarks.image_encoding [--repeat 3]
+"""
+import time
+import base64
+import argparse
+from io import BytesIO
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from models.imaging import encode_screenshot, encode_image
+
+
+def _draw_chart(width, height, seed, supersample=2):
+    """Candlestick chart with grid and indicator, antialiased like a browser screenshot"""
+    rng = np.random.default_rng(seed)
+    w, h = width * supersample, height * supersample
+    image = Image.new("RGB", (w, h), (19, 23, 34))
+    draw = ImageDraw.Draw(image)
+    for x in range(0, w, w // 16):
+        draw.line([(x, 0), (x, h)], fill=(42, 46, 57), width=supersample)
+    for y in range(0, h, h // 10):
+        draw.line([(0, y), (w, y)], fill=(42, 46, 57), width=supersample)
+
+    candles = 120
+    step = w / candles
+    prices = np.cumsum(rng.normal(0, 1, candles)) + 50
+    low, high = prices.min() - 5, prices.max() + 5
+    to_y = lambda price: h - (price - low) / (high - low) * h
+    average = []
+    for i, close in enumerate(prices):
+        open_ = prices[i - 1] if i else close
+        x = i * step + step / 2
+        color = (38, 166, 154) if close >= open_ else (239, 83, 80)
+        wick = abs(rng.normal(0, 1))
+        draw.line([(x, to_y(max(open_, close) + wick)), (x, to_y(min(open_, close) - wick))],
+                  fill=color, width=supersample)
+        top, bottom = sorted((to_y(open_), to_y(close)))
+        draw.rectangle([x - step / 3, top, x + step / 3, max(bottom, top + supersample)], fill=color)
+        average.append((x, to_y(prices[max(0, i - 9):i + 1].mean())))
+    draw.line(average, fill=(41, 98, 255), width=3 * supersample)
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def sample_images():
+    """
+    Build the benchmark samples
+
+    Returns:
+        dict: {sample name: raw uploaded bytes}
+    """
+    samples = {}
+    for name, size, image_format in (
+        ("graphique 1080p (PNG)", (1920, 1080), "PNG"),
+        ("graphique 4K (PNG)", (3840, 2160), "PNG"),
+        ("graphique 4K (JPEG)", (3840, 2160), "JPEG"),
+    ):
+        buffered = BytesIO()
+        _draw_chart(*size, seed=len(samples)).save(buffered, format=image_format, quality=92)
+        samples[name] = buffered.getvalue()
+
+    # Photo (capture d'écran d'un téléphone photographiant l'écran, par exemple)
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 255, 1920)[None, :, None] * np.ones((1080, 1, 3))
+    photo = np.clip(gradient + rng.normal(0, 18, (1080, 1920, 3)), 0, 255).astype(np.uint8)
+    buffered = BytesIO()
+    Image.fromarray(photo).save(buffered, format="JPEG", quality=90)
+    samples["photo 1080p (JPEG)"] = buffered.getvalue()
+    return samples
+
+
+def _fixed(image_format, quality=None):
+    """Policy encoding every upload in one format, at full size"""
+    def encode(payload):
+        image = Image.open(BytesIO(payload)).convert("RGB")
+        if image_format == "PNG (ancien)":
+            buffered = BytesIO()
+            image.save(buffered, format="PNG")
+            return buffered.getvalue()
+        return encode_image(image, image_format, quality)
+    return encode
+
+
+POLICIES = {
+    "PNG (ancien)": _fixed("PNG (ancien)"),
+    "PNG optimisé": _fixed("PNG"),
+    "WebP sans perte": _fixed("WEBP"),
+    "JPEG q85": _fixed("JPEG", 85),
+    "adaptatif": lambda payload: encode_screenshot(payload)[0],
+}
+
+
+def run(repeat=3):
+    """
+    Encode every sample with every policy and print the results
+
+    Args:
+        repeat (int, optional): Encodings per measure (the best time is kept)
+
+    Returns:
+        list: (sample, policy, bytes, base64 bytes, milliseconds) rows
+    """
+    rows = []
+    for sample, payload in sample_images().items():
+        print(f"\n{sample}: {len(payload) / 1024:.0f} Ko envoyés")
+        print(f"  {'politique':<16} {'octets':>10} {'base64':>10} {'ms':>8}")
+        for policy, encode in POLICIES.items():
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                encoded = encode(payload)
+                elapsed = (time.perf_counter() - start) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            size, b64_size = len(encoded), len(base64.b64encode(encoded))
+            rows.append((sample, policy, size, b64_size, best))
+            print(f"  {policy:<16} {size:>10} {b64_size:>10} {best:>8.1f}")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare les politiques d'encodage des captures d'écran.")
+    parser.add_argument("--repeat", type=int, default=3, help="encodages par mesure (meilleur temps retenu)")
+    args = parser.parse_args()
+    run(repeat=args.repeat)
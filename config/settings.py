@@ -8,8 +8,88 @@ APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # Chemins des dossiers et fichiers
 CONFIG_FILE = os.path.join(APP_DIR, "config", "app_config.json")
+
+# Détection des modifications externes de CONFIG_FILE: surveillance par
+# watchdog si disponible, sinon vérification de la date de modification au
+# plus toutes les CONFIG_POLL_INTERVAL secondes
+CONFIG_WATCHER = True
+CONFIG_POLL_INTERVAL = 2.0
 PROFILES_DIR = os.path.join(APP_DIR, "profiles")
 
+# Disposition des fichiers de profil (backend JSON):
+# - "sharded": PROFILES_DIR/<ab>/<cd>/<nom encodé>.json, sous-dossiers tirés
+#   de l'empreinte du nom (les profils à plat existants sont déplacés au
+#   démarrage, ou avec python -m models.sharding)
+# - "flat": PROFILES_DIR/<nom>.json
+PROFILE_LAYOUT = "sharded"
+
+# Longueur maximale d'un nom de profil
+PROFILE_NAME_MAX_LENGTH = 64
+
+# Nombre de profils affichés par page sur l'écran de connexion
+LOGIN_PROFILE_OPTIONS = 20
+
+# Backend de stockage des profils:
+# - "json": un fichier JSON par profil (voir PROFILE_STORAGE_MODE)
+# - "sqlite": une base SQLite unique pour tous les profils
+#   (migration des fichiers existants: python -m models.sqlite_store)
+STORAGE_BACKEND = "json"
+SQLITE_DB_PATH = os.path.join(PROFILES_DIR, "profiles.db")
+
+# Mode de stockage des profils JSON:
+# - "snapshot": réécriture complète du fichier JSON à chaque sauvegarde
+# - "journal": ajout des seules modifications dans un journal, compacté en arrière-plan
+PROFILE_STORAGE_MODE = "journal"
+
+# Taille du journal (octets) au-delà de laquelle il est replié dans le snapshot
+JOURNAL_COMPACT_THRESHOLD = 1024 * 1024
+
+# Budget mémoire (octets) du cache de profils partagé entre les sessions
+PROFILE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Budget mémoire (octets) du cache d'images prêtes à afficher (miniatures,
+# aperçus, originaux), partagé entre les sessions
+IMAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Catalogue des profils (PROFILES_DIR/.catalog): taille et nombre de
+# configurations des profils modifiés rafraîchis par lots, au plus tard après
+# CATALOG_REFRESH_INTERVAL secondes ou CATALOG_REFRESH_BATCH profils modifiés
+CATALOG_REFRESH_INTERVAL = 30.0
+CATALOG_REFRESH_BATCH = 100
+
+# Écriture différée des profils: délai d'inactivité (secondes) avant écriture,
+# et délai maximal depuis la première modification non écrite
+WRITE_BEHIND_DELAY = 1.0
+WRITE_BEHIND_MAX_DELAY = 5.0
+
+# Stockage des images (adressées par leur empreinte SHA-256)
+BLOB_STORE_DIR = os.path.join(PROFILES_DIR, "_blobs")
+
+# Envoi des captures au navigateur: "static" (fichiers publiés dans STATIC_DIR,
+# désignés par URL et gardés en cache par le navigateur; nécessite
+# server.enableStaticServing, sinon "inline" est utilisé) ou "inline" (octets
+# de l'image envoyés dans la page à chaque affichage)
+SCREENSHOT_SERVING = "static"
+STATIC_DIR = os.path.join(APP_DIR, "static")
+
+# Images dérivées des captures (WebP, stockées à côté de l'original): taille
+# maximale (largeur, hauteur) de chaque variante et qualité d'encodage
+THUMBNAIL_SIZES = {
+    "thumb": (320, 200),
+    "preview": (1024, 640),
+}
+THUMBNAIL_QUALITY = 80
+
+# Import des profils: taille des lectures du fichier importé (octets) et nombre
+# de configurations fusionnées par écriture
+IMPORT_CHUNK_SIZE = 1024 * 1024
+IMPORT_BATCH_SIZE = 500
+
+# Statistiques multi-profils (tableau de bord admin): nombre de threads et
+# délai maximal (secondes) accordé à chaque profil
+STATS_MAX_WORKERS = 8
+STATS_PROFILE_TIMEOUT = 5.0
+
 # Configuration par défaut
 DEFAULT_PROFILE = "admin"
 DEFAULT_APP_CONFIG = {
@@ -135,5 +215,44 @@ DEFAULT_PARAMS = {
     "Inputs in status line": "Yes"
 }
 
+# Type de chaque paramètre de stratégie (les valeurs restent stockées en texte):
+# "float", "int", "color" (#RRGGBB) ou "bool" ("Yes"/"No")
+PARAM_SCHEMA = {
+    "Price Change Threshold (%)": "float",
+    "Kernel Timeframe": "int",
+    "ADX Length": "int",
+    "ADX Level": "int",
+    "Start Regression at Bar": "int",
+    "Lookback Window": "int",
+    "Relative Weighting": "float",
+    "Start Regression at Bar (2)": "int",
+    "Lookback Window (2)": "int",
+    "Relative Weighting (2)": "float",
+    "Smooth Colors": "int",
+    "Bullish Color": "color",
+    "Bearish Color": "color",
+    "Inputs in status line": "bool"
+}
+
 # Nombre maximum de captures d'écran par configuration
 MAX_SCREENSHOTS = 2
+
+# Encodage des captures envoyées: dimension maximale (côté le plus long, en
+# pixels, réduite au-delà), budget d'octets par capture, format sans perte des
+# images graphiques ("WEBP" ou "PNG" optimisé) et plage de qualité JPEG des
+# images photographiques. Une image est graphique (graphique, texte, interface)
+# si elle a au plus graphic_max_colors couleurs. Les métadonnées sont retirées.
+SCREENSHOT_ENCODING = {
+    "max_dimension": 2560,
+    "max_bytes": 750 * 1024,
+    "lossless_format": "WEBP",
+    "jpeg_quality": 85,
+    "jpeg_min_quality": 60,
+    "graphic_max_colors": 4096,
+}
+
+# Traitement des captures envoyées dans des processus séparés: nombre de
+# processus, et intervalle (secondes) de vérification des traitements en cours
+# par la vue détaillée
+IMAGE_WORKERS = 2
+UPLOAD_POLL_INTERVAL = 0.5
@@ -2,37 +2,278 @@
 Module d'authentification et de gestion des profils.
 """
 import os
-import json
+import bisect
 import hashlib
 import secrets
+import unicodedata
 from datetime import datetime
 
-from config.settings import CONFIG_FILE, PROFILES_DIR, DEFAULT_PROFILE, DEFAULT_APP_CONFIG
+from config.settings import (
+    CONFIG_FILE, PROFILES_DIR, PROFILE_LAYOUT, PROFILE_NAME_MAX_LENGTH,
+    DEFAULT_PROFILE, DEFAULT_APP_CONFIG
+)
+from models.sharding import get_sharded_relpath, list_flat_profiles, normalize_profile_name
+from models.config_service import ConfigService
+
+# Configuration en mémoire, rechargée quand son fichier change
+_config_service = ConfigService(
+    lambda: CONFIG_FILE, DEFAULT_APP_CONFIG,
+    parse=lambda app_config: _with_registry(app_config),
+    serialize=lambda app_config: _serialize_config(app_config)
+)
+
+# Dossiers de profils déjà préparés (création, profils à plat à migrer)
+_prepared_dirs = set()
 
 def get_profile_path(profile_name):
     """
     Obtient le chemin du fichier de profil pour un nom donné.
+    
+    Avec la disposition "sharded", le fichier est rangé dans deux niveaux de
+    sous-dossiers tirés de l'empreinte du nom, sous un nom encodé sans
+    caractère dangereux (voir models/sharding.py).
+    """
+    if PROFILE_LAYOUT == "flat":
+        return get_flat_profile_path(profile_name)
+    return os.path.join(PROFILES_DIR, get_sharded_relpath(profile_name))
+
+def get_flat_profile_path(profile_name):
+    """
+    Obtient le chemin du fichier de profil dans l'ancienne disposition à plat.
     """
     return os.path.join(PROFILES_DIR, f"{profile_name}.json")
 
+def get_catalog_path():
+    """
+    Obtient le chemin du catalogue des profils (sans extension .json).
+    """
+    return os.path.join(PROFILES_DIR, ".catalog")
+
+def _search_key(profile_name):
+    return normalize_profile_name(profile_name).casefold()
+
+class ProfileRegistry:
+    """
+    Registre indexé des noms de profils.
+    
+    Remplace la liste app_config["profiles"] et s'utilise comme elle
+    (itération, indexation, append, remove, comparaison avec une liste),
+    mais le test d'appartenance, l'ajout et la suppression sont en O(1).
+    Les noms sont comparés sous leur forme normalisée (NFC), comme les
+    fichiers de profil: deux noms équivalents désignent le même profil.
+    L'ordre d'ajout est conservé (le premier profil est le profil par
+    défaut); un index trié, tenu à jour à chaque modification, sert à la
+    recherche par préfixe paginée.
+    """
+    
+    def __init__(self, profile_names=()):
+        self._names = {}  # {nom normalisé: nom enregistré}, dans l'ordre d'ajout
+        self._list = None  # Liste ordonnée, reconstruite à la demande pour l'indexation
+        self._sorted = None  # [(clé de recherche, nom)], construit à la première recherche
+        for profile_name in profile_names:
+            self._names.setdefault(normalize_profile_name(profile_name), profile_name)
+    
+    def __contains__(self, profile_name):
+        return isinstance(profile_name, str) and normalize_profile_name(profile_name) in self._names
+    
+    def __len__(self):
+        return len(self._names)
+    
+    def __iter__(self):
+        return iter(self._names.values())
+    
+    def __getitem__(self, index):
+        if self._list is None:
+            self._list = list(self._names.values())
+        return self._list[index]
+    
+    def __eq__(self, other):
+        if isinstance(other, (ProfileRegistry, list, tuple)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return f"ProfileRegistry({list(self)!r})"
+    
+    def add(self, profile_name):
+        """
+        Ajoute un profil à la fin du registre.
+        
+        Args:
+            profile_name (str): Nom du profil
+            
+        Returns:
+            bool: True si le profil a été ajouté, False s'il existait déjà
+                (sous ce nom ou un nom équivalent)
+        """
+        key = normalize_profile_name(profile_name)
+        if key in self._names:
+            return False
+        self._names[key] = profile_name
+        self._list = None
+        if self._sorted is not None:
+            bisect.insort(self._sorted, (_search_key(profile_name), profile_name))
+        return True
+    
+    def append(self, profile_name):
+        """Ajoute un profil (compatibilité avec la liste)."""
+        self.add(profile_name)
+    
+    def extend(self, profile_names):
+        """Ajoute plusieurs profils, en ignorant ceux déjà présents."""
+        for profile_name in profile_names:
+            self.add(profile_name)
+    
+    def remove(self, profile_name):
+        """
+        Retire un profil du registre.
+        
+        Args:
+            profile_name (str): Nom du profil
+            
+        Raises:
+            ValueError: Si le profil n'est pas dans le registre
+        """
+        key = normalize_profile_name(profile_name)
+        if key not in self._names:
+            raise ValueError(f"Profil '{profile_name}' absent du registre")
+        profile_name = self._names.pop(key)
+        self._list = None
+        if self._sorted is not None:
+            entry = (_search_key(profile_name), profile_name)
+            del self._sorted[bisect.bisect_left(self._sorted, entry)]
+    
+    def search(self, prefix="", offset=0, limit=None):
+        """
+        Liste les profils dont le nom commence par un préfixe, page par page.
+        
+        La comparaison ignore la casse et les formes Unicode équivalentes.
+        
+        Args:
+            prefix (str, optional): Début du nom recherché. Par défaut, tous.
+            offset (int, optional): Nombre de résultats à sauter
+            limit (int, optional): Nombre maximal de résultats renvoyés
+            
+        Returns:
+            tuple: (noms de la page par ordre alphabétique, nombre total de
+                profils correspondant au préfixe)
+        """
+        if self._sorted is None:
+            self._sorted = sorted((_search_key(name), name) for name in self._names.values())
+        key = _search_key(prefix)
+        start = bisect.bisect_left(self._sorted, (key,))
+        # Premier nom ne commençant plus par le préfixe
+        end = bisect.bisect_left(self._sorted, (key + "\U0010ffff",), start) if key else len(self._sorted)
+        first = start + offset
+        last = end if limit is None else min(end, first + limit)
+        return [name for _, name in self._sorted[first:last]], end - start
+    
+    def to_list(self):
+        """
+        Obtient les noms des profils dans l'ordre d'ajout.
+        
+        Returns:
+            list: Noms des profils
+        """
+        return list(self._names.values())
+
+def get_profile_registry(app_config):
+    """
+    Obtient le registre des profils d'une configuration.
+    
+    Une liste de profils (configuration créée à la main) est remplacée par
+    un registre lors du premier appel.
+    
+    Args:
+        app_config (dict): Configuration de l'application
+        
+    Returns:
+        ProfileRegistry: Registre des profils, partagé avec la configuration
+    """
+    profiles = app_config.get("profiles")
+    if not isinstance(profiles, ProfileRegistry):
+        profiles = app_config["profiles"] = ProfileRegistry(profiles or [])
+    return profiles
+
+def _with_registry(app_config):
+    """Copie une configuration lue en remplaçant la liste des profils par un registre"""
+    app_config = dict(app_config)
+    app_config["profiles"] = ProfileRegistry(app_config.get("profiles") or [])
+    return app_config
+
 def setup_config():
     """
     Configure l'application en créant les dossiers et fichiers nécessaires.
+    
+    La configuration est servie depuis la mémoire (voir
+    models/config_service.py): en régime établi, aucun accès disque.
+    
+    Returns:
+        dict: Configuration de l'application, partagée entre les sessions
     """
-    # Créer le dossier profiles s'il n'existe pas
-    os.makedirs(PROFILES_DIR, exist_ok=True)
+    # Une fois par processus et par dossier: créer le dossier profiles
+    # et déplacer les profils restés à plat
+    if PROFILES_DIR not in _prepared_dirs:
+        _prepared_dirs.add(PROFILES_DIR)
+        os.makedirs(PROFILES_DIR, exist_ok=True)
+        if PROFILE_LAYOUT == "sharded" and list_flat_profiles(PROFILES_DIR):
+            from models.sharding import migrate_flat_profiles
+            migrate_flat_profiles()
     
     # Créer ou charger le fichier de configuration
-    if not os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(DEFAULT_APP_CONFIG, f, indent=4)
-        return DEFAULT_APP_CONFIG
+    return _config_service.get()
+
+def _serialize_config(app_config):
+    """Prépare une configuration pour l'écriture JSON (registre -> liste)"""
+    serialized = dict(app_config)
+    serialized["profiles"] = list(app_config.get("profiles") or [])
+    return serialized
+
+def save_app_config(app_config):
+    """
+    Enregistre la configuration de l'application de façon atomique.
     
-    try:
-        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except:
-        return DEFAULT_APP_CONFIG
+    Args:
+        app_config (dict): Configuration de l'application
+    """
+    _config_service.save(app_config)
+
+def add_profiles_to_config(profile_names):
+    """
+    Ajoute plusieurs profils à la configuration en une seule écriture.
+    
+    La configuration est relue depuis le disque si elle a changé, pour ne
+    pas écraser les modifications faites entre-temps par d'autres processus.
+    
+    Args:
+        profile_names (list): Noms des profils à ajouter
+        
+    Returns:
+        dict: Configuration mise à jour
+    """
+    return _config_service.update(lambda app_config: get_profile_registry(app_config).extend(profile_names))
+
+def validate_profile_name(profile_name):
+    """
+    Vérifie qu'un nom de profil est utilisable.
+    
+    Args:
+        profile_name (str): Nom du profil
+        
+    Returns:
+        str: Message d'erreur, ou None si le nom est valide
+    """
+    if not isinstance(profile_name, str) or not profile_name.strip():
+        return "Nom de profil vide"
+    if profile_name != profile_name.strip():
+        return "Espaces interdits en début ou fin de nom"
+    if len(profile_name) > PROFILE_NAME_MAX_LENGTH:
+        return f"Nom trop long ({PROFILE_NAME_MAX_LENGTH} caractères maximum)"
+    if any(unicodedata.category(char).startswith("C") for char in profile_name):
+        return "Caractères de contrôle interdits"
+    return None
 
 def hash_password(password):
     """
@@ -50,6 +291,10 @@ def create_profile(profile_name, app_config, is_super_admin=False):
     """
     Crée un nouveau profil et met à jour la configuration de l'application.
     
+    La configuration est relue depuis le disque si elle a changé, pour ne
+    pas écraser les profils ajoutés ou supprimés entre-temps par d'autres
+    processus.
+    
     Args:
         profile_name (str): Nom du profil
         app_config (dict): Configuration actuelle de l'application
@@ -58,32 +303,44 @@ def create_profile(profile_name, app_config, is_super_admin=False):
     Returns:
         tuple: (success, message, updated_config)
     """
-    # Vérifier si le profil existe déjà dans la liste des profils
-    if profile_name in app_config.get("profiles", []):
-        return False, "Ce profil existe déjà", app_config
+    error = validate_profile_name(profile_name)
+    if error:
+        return False, error, app_config
     
-    # Ajouter le profil à la liste des profils
-    if "profiles" not in app_config:
-        app_config["profiles"] = []
-    
-    app_config["profiles"].append(profile_name)
-    
-    # Sauvegarder la configuration
-    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(app_config, f, indent=4)
+    def add_profile(current_config):
+        # Vérifier si le profil existe déjà dans le registre des profils
+        # (comparaison sur le nom normalisé, qui détermine les fichiers)
+        registry = get_profile_registry(current_config)
+        if profile_name in registry:
+            raise FileExistsError(profile_name)
+        registry.add(profile_name)
     
-    # Créer le fichier de profil avec des données vides
-    profile_path = get_profile_path(profile_name)
-    
-    # Créer le dossier profiles s'il n'existe pas
-    os.makedirs(os.path.dirname(profile_path), exist_ok=True)
-    
-    # Structure des données de profil
-    profile_data = {}
+    # Ajouter le profil au registre et sauvegarder la configuration
+    try:
+        app_config = _config_service.update(add_profile)
+    except FileExistsError:
+        return False, "Ce profil existe déjà", app_config
     
-    # Sauvegarder le profil
-    with open(profile_path, 'w', encoding='utf-8') as f:
-        json.dump(profile_data, f, indent=4)
+    # Créer le profil avec des données vides, sans jamais écraser des
+    # données déjà stockées sous ce nom (profil créé par un autre processus
+    # ou données résiduelles): le profil est alors retiré du registre
+    from models.storage import init_profile
+    from models.catalog import update_catalog_entry
+    try:
+        init_profile(profile_name, overwrite=False)
+    except FileExistsError:
+        def remove_profile(current_config):
+            registry = get_profile_registry(current_config)
+            if profile_name in registry:
+                registry.remove(profile_name)
+        app_config = _config_service.update(remove_profile)
+        return False, "Des données existent déjà pour ce profil", app_config
+    update_catalog_entry(
+        profile_name,
+        created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        last_login=None,
+        is_super_admin=is_super_admin
+    )
     
     return True, f"Profil '{profile_name}' créé avec succès", app_config
 
@@ -123,8 +380,7 @@ def set_admin_password(password, app_config):
     app_config["super_admin_hash"] = password_hash
     
     # Sauvegarder la configuration
-    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(app_config, f, indent=4)
+    save_app_config(app_config)
     
     return app_config
 
@@ -136,14 +392,18 @@ def get_profile_list(app_config):
         app_config (dict): Configuration de l'application
         
     Returns:
-        list: Liste des noms de profils
+        ProfileRegistry: Registre des noms de profils (s'utilise comme une liste)
     """
-    return app_config.get("profiles", [])
+    return get_profile_registry(app_config)
 
 def delete_profile(profile_name, app_config):
     """
     Supprime un profil.
     
+    La configuration est relue depuis le disque si elle a changé, pour ne
+    pas écraser les profils ajoutés ou supprimés entre-temps par d'autres
+    processus.
+    
     Args:
         profile_name (str): Nom du profil à supprimer
         app_config (dict): Configuration de l'application
@@ -151,53 +411,40 @@ def delete_profile(profile_name, app_config):
     Returns:
         tuple: (success, message, updated_config)
     """
-    # Vérifier si le profil existe dans la configuration
-    if profile_name not in app_config.get("profiles", []):
-        return False, f"Profil '{profile_name}' introuvable", app_config
-    
-    # Supprimer le profil de la liste
-    app_config["profiles"].remove(profile_name)
+    def remove_profile(current_config):
+        # ValueError si le profil n'est pas dans la configuration
+        get_profile_registry(current_config).remove(profile_name)
     
-    # Sauvegarder la configuration
-    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(app_config, f, indent=4)
+    # Supprimer le profil du registre et sauvegarder la configuration
+    try:
+        app_config = _config_service.update(remove_profile)
+    except ValueError:
+        return False, f"Profil '{profile_name}' introuvable", app_config
     
-    # Supprimer le fichier de profil s'il existe
-    profile_path = get_profile_path(profile_name)
-    if os.path.exists(profile_path):
-        try:
-            os.remove(profile_path)
-        except Exception as e:
-            return False, f"Erreur lors de la suppression du fichier: {e}", app_config
+    # Supprimer les fichiers du profil (snapshot et journal) s'ils existent
+    from models.storage import delete_profile_files
+    try:
+        delete_profile_files(profile_name)
+    except Exception as e:
+        return False, f"Erreur lors de la suppression du fichier: {e}", app_config
     
     return True, f"Profil '{profile_name}' supprimé avec succès", app_config
 
 def list_profiles():
     """
-    Liste tous les profils existants.
+    Liste tous les profils existants à partir du catalogue, sans ouvrir
+    les fichiers de profil.
+    
+    Returns:
+        list: Métadonnées de chaque profil (name, created_at, last_login,
+            is_super_admin, size, configs), triées par nom
     """
-    profiles = []
+    from models.catalog import read_catalog
     
     # Créer le dossier profiles s'il n'existe pas
     os.makedirs(PROFILES_DIR, exist_ok=True)
     
-    # Lister les fichiers .json dans le dossier profiles
-    for filename in os.listdir(PROFILES_DIR):
-        if filename.endswith('.json'):
-            profile_name = filename[:-5]  # Enlever l'extension .json
-            profile_path = os.path.join(PROFILES_DIR, filename)
-            
-            try:
-                with open(profile_path, 'r', encoding='utf-8') as f:
-                    profile_data = json.load(f)
-                
-                profiles.append({
-                    "name": profile_name,
-                    "created_at": profile_data.get("created_at"),
-                    "last_login": profile_data.get("last_login"),
-                    "is_super_admin": profile_data.get("is_super_admin", False)
-                })
-            except:
-                continue
-    
-    return profiles
+    return [
+        {"name": profile_name, **entry}
+        for profile_name, entry in sorted(read_catalog().items())
+    ]
@@ -0,0 +1,125 @@
+"""
+Blob store for the Trading Dashboard Pro application.
+Stores screenshot images as raw binary files addressed by the SHA-256 of
+their content, so identical uploads are kept only once.
+"""
+import os
+import hashlib
+
+from config.settings import BLOB_STORE_DIR
+from utils.fileio import atomic_write_bytes
+
+
+def get_blob_hash(payload):
+    """
+    Compute the content address of a payload
+
+    Args:
+        payload (bytes): Raw content
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    return hashlib.sha256(payload).hexdigest()
+
+
+def get_blob_path(blob_hash):
+    """
+    Get the file path of a blob
+
+    Args:
+        blob_hash (str): Hex SHA-256 digest
+
+    Returns:
+        str: Path of the blob file (two-character fan-out directory)
+    """
+    return os.path.join(BLOB_STORE_DIR, blob_hash[:2], blob_hash)
+
+
+def put_blob(payload):
+    """
+    Store a payload, unless identical content is already stored
+
+    Args:
+        payload (bytes): Raw content
+
+    Returns:
+        str: Hex SHA-256 digest of the payload
+    """
+    blob_hash = get_blob_hash(payload)
+    path = get_blob_path(blob_hash)
+    if not os.path.exists(path):
+        atomic_write_bytes(path, payload)
+    return blob_hash
+
+
+def read_blob(blob_hash):
+    """
+    Read the content of a blob
+
+    Args:
+        blob_hash (str): Hex SHA-256 digest
+
+    Returns:
+        bytes: Raw content
+    """
+    with open(get_blob_path(blob_hash), 'rb') as f:
+        return f.read()
+
+
+def blob_exists(blob_hash):
+    """
+    Check if a blob is stored
+
+    Args:
+        blob_hash (str): Hex SHA-256 digest
+
+    Returns:
+        bool: True if the blob exists
+    """
+    return os.path.exists(get_blob_path(blob_hash))
+
+
+def iter_blobs():
+    """
+    List the stored blobs
+
+    Yields:
+        str: Hex SHA-256 digests (derivative images excluded)
+    """
+    if not os.path.isdir(BLOB_STORE_DIR):
+        return
+    for fan_out in os.listdir(BLOB_STORE_DIR):
+        directory = os.path.join(BLOB_STORE_DIR, fan_out)
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            if '.' not in name:
+                yield name
+
+
+def remove_unreferenced_blobs(referenced):
+    """
+    Delete every stored blob that is not referenced anymore, with its
+    derivative images (<hash>.<variant>.webp)
+
+    Args:
+        referenced (set): Hashes still referenced by profiles
+
+    Returns:
+        int: Number of deleted files
+    """
+    if not os.path.isdir(BLOB_STORE_DIR):
+        return 0
+
+    removed = 0
+    for fan_out in os.listdir(BLOB_STORE_DIR):
+        directory = os.path.join(BLOB_STORE_DIR, fan_out)
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            # Une image dérivée suit le sort de son original
+            if name.split('.', 1)[0] not in referenced and not name.startswith('.'):
+                os.remove(os.path.join(directory, name))
+                removed += 1
+    return removed
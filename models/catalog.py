@@ -0,0 +1,259 @@
+"""
+Profile catalog for the Trading Dashboard Pro application.
+Keeps a single manifest (PROFILES_DIR/.catalog) with the metadata of every
+profile: creation and last login timestamps, stored size, configuration
+count and admin flag. Listing profiles reads this one file instead of
+opening every profile. Profile writes only mark their entry stale: sizes
+and configuration counts are refreshed in batches (flush_catalog, at the
+latest after CATALOG_REFRESH_INTERVAL seconds or CATALOG_REFRESH_BATCH
+profiles, and before the catalog is read), so a save does not rewrite the
+whole manifest. Updates hold a lock file (.catalog.lock) shared by every
+process, and rebuild_catalog recomputes the catalog from the stored
+profiles after any drift.
+"""
+import os
+import time
+import atexit
+import argparse
+import json
+import threading
+from datetime import datetime
+
+from config.settings import CATALOG_REFRESH_INTERVAL, CATALOG_REFRESH_BATCH
+from models.auth import get_catalog_path
+from utils.fileio import atomic_write_json, file_fingerprint
+from utils.filelock import FileLock
+
+# Champs d'une entrée du catalogue et leur valeur par défaut
+CATALOG_FIELDS = {
+    "created_at": None,
+    "last_login": None,
+    "size": None,
+    "configs": 0,
+    "is_super_admin": False,
+}
+
+# Lecture-modification-écriture du catalogue, entre threads et entre processus
+_catalog_lock = FileLock(lambda: get_catalog_path() + ".lock")
+
+# Profils modifiés dont l'entrée reste à rafraîchir, et instant du premier marquage
+_stale = set()
+_stale_since = None
+_stale_lock = threading.Lock()
+
+# Dernier catalogue lu ou écrit: (fingerprint du fichier, entrées, chemin)
+_catalog = None
+
+
+def _timestamp():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _load_entries():
+    """Get the catalog entries (shared, caller holds the lock), or None if unreadable"""
+    global _catalog
+    path = get_catalog_path()
+    fingerprint = file_fingerprint(path)
+    if _catalog is not None and _catalog[0] == fingerprint and _catalog[2] == path:
+        return _catalog[1]
+    if fingerprint is None:
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)["profiles"]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"WARNING: Unreadable profile catalog, it will be rebuilt: {e}")
+        return None
+    _catalog = (fingerprint, entries, path)
+    return entries
+
+
+def _store_entries(entries):
+    """Write the catalog atomically (caller holds the lock)"""
+    global _catalog
+    path = get_catalog_path()
+    # Donnée dérivée, reconstructible: pas besoin de fsync
+    atomic_write_json(path, {"profiles": entries}, indent=None, fsync=False)
+    _catalog = (file_fingerprint(path), entries, path)
+
+
+def read_catalog():
+    """
+    Get the metadata of every profile
+
+    Returns:
+        dict: {profile name: entry dict with the CATALOG_FIELDS}
+    """
+    flush_catalog()
+    with _catalog_lock:
+        entries = _load_entries()
+        if entries is None:
+            entries = rebuild_catalog()
+        return {name: dict(entry) for name, entry in entries.items()}
+
+
+def update_catalog_entry(profile_name, **fields):
+    """
+    Create or update the catalog entry of a profile
+
+    Args:
+        profile_name (str): Name of the profile
+        **fields: Values of CATALOG_FIELDS to set
+    """
+    update_catalog_entries({profile_name: fields})
+
+
+def update_catalog_entries(updates, create=True):
+    """
+    Create or update the catalog entries of several profiles, in one write
+
+    Args:
+        updates (dict): {profile name: dict of CATALOG_FIELDS values to set}
+        create (bool, optional): Add the profiles missing from the catalog.
+            Default is True; False only updates existing entries.
+    """
+    with _catalog_lock:
+        entries = _load_entries()
+        if entries is None:
+            entries = rebuild_catalog()
+        changed = {}
+        for profile_name, fields in updates.items():
+            if not create and profile_name not in entries:
+                continue
+            entry = dict(entries.get(profile_name) or CATALOG_FIELDS)
+            entry.update(fields)
+            if entries.get(profile_name) != entry:
+                changed[profile_name] = entry
+        if not changed:
+            return
+        try:
+            _store_entries({**entries, **changed})
+        except OSError as e:
+            print(f"WARNING: Could not update profile catalog for {', '.join(changed)}: {e}")
+
+
+def remove_catalog_entry(profile_name):
+    """
+    Remove the catalog entry of a profile
+
+    Args:
+        profile_name (str): Name of the profile
+    """
+    with _stale_lock:
+        _stale.discard(profile_name)
+    with _catalog_lock:
+        entries = _load_entries()
+        if entries is None or profile_name not in entries:
+            return
+        entries = {name: entry for name, entry in entries.items() if name != profile_name}
+        try:
+            _store_entries(entries)
+        except OSError as e:
+            print(f"WARNING: Could not update profile catalog for '{profile_name}': {e}")
+
+
+def mark_catalog_stale(profile_name):
+    """
+    Schedule the refresh of the size and configuration count of a profile
+
+    The refresh is batched with those of other modified profiles; it is
+    written right away once the batch is full or the oldest mark is older
+    than CATALOG_REFRESH_INTERVAL.
+
+    Args:
+        profile_name (str): Name of the profile
+    """
+    global _stale_since
+    now = time.monotonic()
+    with _stale_lock:
+        _stale.add(profile_name)
+        if _stale_since is None:
+            _stale_since = now
+        due = len(_stale) >= CATALOG_REFRESH_BATCH or now - _stale_since >= CATALOG_REFRESH_INTERVAL
+    if due:
+        flush_catalog()
+
+
+def flush_catalog():
+    """
+    Refresh the catalog entries of the profiles marked stale, in one write
+
+    Profiles deleted since they were marked are not added back.
+
+    Returns:
+        int: Number of profiles refreshed
+    """
+    global _stale_since
+    with _stale_lock:
+        names = list(_stale)
+        _stale.clear()
+        _stale_since = None
+    if not names:
+        return 0
+
+    from models.storage import get_profile_size, read_profile_stats
+
+    # Résumés lus hors du verrou du catalogue (ils prennent les verrous des profils)
+    updates = {}
+    for profile_name in names:
+        counts = read_profile_stats(profile_name)
+        updates[profile_name] = {
+            "size": get_profile_size(profile_name),
+            "configs": counts["total"] if counts else 0,
+        }
+    update_catalog_entries(updates, create=False)
+    return len(names)
+
+
+def record_login(profile_name):
+    """
+    Record the login time of a profile
+
+    Args:
+        profile_name (str): Name of the profile
+    """
+    update_catalog_entry(profile_name, last_login=_timestamp())
+
+
+def rebuild_catalog():
+    """
+    Recompute the catalog from the stored profiles
+
+    Sizes and configuration counts come from the storage layer (status
+    summaries, not profile bodies, unless a summary is stale); timestamps
+    and admin flags are kept from the previous catalog when it is readable.
+
+    Returns:
+        dict: New catalog entries
+    """
+    from models.storage import list_stored_profiles, get_profile_size, read_profile_stats
+
+    with _catalog_lock:
+        previous = _load_entries() or {}
+        entries = {}
+        for profile_name in list_stored_profiles():
+            entry = dict(CATALOG_FIELDS)
+            entry.update(previous.get(profile_name) or {})
+            counts = read_profile_stats(profile_name)
+            entry["configs"] = counts["total"] if counts else 0
+            entry["size"] = get_profile_size(profile_name)
+            entries[profile_name] = entry
+        try:
+            _store_entries(entries)
+        except OSError as e:
+            print(f"WARNING: Could not write profile catalog: {e}")
+        print(f"Rebuilt profile catalog with {len(entries)} profiles")
+        return entries
+
+
+atexit.register(flush_catalog)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Reconstruit le catalogue des profils à partir des profils stockés."
+    )
+    parser.parse_args()
+
+    catalog = rebuild_catalog()
+    print(f"Profils catalogués: {len(catalog)} ({os.path.abspath(get_catalog_path())})")
@@ -0,0 +1,185 @@
+"""
+Application configuration service for the Trading Dashboard Pro application.
+Keeps the parsed configuration in memory, so the reruns of every session
+read it without any file access. External changes of the file are detected
+by a watchdog observer on its directory or, when watchdog is unavailable,
+by checking the file's mtime at most every CONFIG_POLL_INTERVAL seconds.
+All writes go through the service and are atomic.
+"""
+import os
+import json
+import time
+import threading
+
+from config.settings import CONFIG_WATCHER, CONFIG_POLL_INTERVAL
+from utils.fileio import atomic_write_json, file_fingerprint
+
+try:
+    from watchdog.observers import Observer
+except ImportError:  # watchdog absent: surveillance par mtime
+    Observer = None
+
+
+class _ChangeHandler:
+    """Watchdog event handler marking the configuration stale when its file changes"""
+
+    def __init__(self, service, path):
+        self._service = service
+        self._path = os.path.abspath(path)
+
+    def dispatch(self, event):
+        # Écriture atomique: le fichier arrive par un déplacement (dest_path)
+        for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+            if path and os.path.abspath(os.fsdecode(path)) == self._path:
+                self._service.invalidate()
+                return
+
+
+class ConfigService:
+    """
+    In-memory JSON configuration, reloaded when its file changes
+
+    The object returned by get() is shared by every caller until the next
+    reload or save; callers that modify it must save it.
+    """
+
+    def __init__(self, path_func, default, parse=None, serialize=None):
+        """
+        Args:
+            path_func (callable): Returns the configuration file path, so a
+                changed path (tests, settings) is followed
+            default (dict): Configuration written when the file is missing
+            parse (callable, optional): Builds the in-memory configuration
+                from the decoded JSON
+            serialize (callable, optional): Builds the JSON data to write
+                from the in-memory configuration
+        """
+        self._path_func = path_func
+        self._default = default
+        self._parse = parse or dict
+        self._serialize = serialize or dict
+        self._lock = threading.RLock()
+        self._path = None
+        self._config = None
+        self._fingerprint = None
+        self._stale = False
+        self._checked_at = 0.0
+        self._observer = None
+        self._watch = None
+        self._stats = {"reads": 0, "writes": 0}
+
+    def get(self):
+        """
+        Get the current configuration
+
+        Returns:
+            dict: Parsed configuration (shared, see the class docstring)
+        """
+        path = self._path_func()
+        with self._lock:
+            if path != self._path:
+                self._load(path)
+                self._start_watching(path)
+            elif self._stale or (self._watch is None
+                                 and time.monotonic() - self._checked_at >= CONFIG_POLL_INTERVAL):
+                self.refresh()
+            return self._config
+
+    def refresh(self):
+        """Reload the configuration now if its file changed since it was read"""
+        with self._lock:
+            self._stale = False
+            self._checked_at = time.monotonic()
+            if self._path is not None and file_fingerprint(self._path) != self._fingerprint:
+                self._load(self._path)
+
+    def invalidate(self):
+        """Mark the configuration for a file check at the next access"""
+        self._stale = True
+
+    def save(self, config):
+        """
+        Write a configuration atomically and make it the current one
+
+        Args:
+            config (dict): In-memory configuration
+        """
+        path = self._path_func()
+        with self._lock:
+            atomic_write_json(path, self._serialize(config))
+            self._stats["writes"] += 1
+            if path != self._path:
+                self._start_watching(path)
+            self._path = path
+            self._config = config
+            # Notre propre écriture ne provoque pas de relecture
+            self._fingerprint = file_fingerprint(path)
+            self._checked_at = time.monotonic()
+
+    def update(self, mutator):
+        """
+        Modify the configuration and save it, without losing changes made
+        meanwhile in the file by other processes
+
+        Args:
+            mutator (callable): Modifies in place a fresh copy of the
+                configuration
+
+        Returns:
+            dict: Saved configuration
+        """
+        with self._lock:
+            self.get()
+            self.refresh()
+            config = self._parse(json.loads(json.dumps(self._serialize(self._config))))
+            mutator(config)
+            self.save(config)
+            return config
+
+    def get_stats(self):
+        """
+        Get the activity counters of the service
+
+        Returns:
+            dict: Reads and writes of the configuration file, and the change
+                detection in use ("watchdog" or "mtime")
+        """
+        return dict(self._stats, watcher="watchdog" if self._watch is not None else "mtime")
+
+    def _load(self, path):
+        """Read the configuration file, creating it with the defaults if missing (lock held)"""
+        self._path = path
+        self._checked_at = time.monotonic()
+        if not os.path.exists(path):
+            self.save(self._parse(json.loads(json.dumps(self._default))))
+            return
+        fingerprint = file_fingerprint(path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                config = self._parse(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"WARNING: Unreadable configuration file {path}, using defaults: {e}")
+            config = self._parse(json.loads(json.dumps(self._default)))
+        self._stats["reads"] += 1
+        self._config = config
+        self._fingerprint = fingerprint
+
+    def _start_watching(self, path):
+        """Watch the directory of the configuration file (lock held)"""
+        if not CONFIG_WATCHER or Observer is None:
+            return
+        try:
+            if self._observer is None:
+                self._observer = Observer()
+                self._observer.daemon = True
+                self._observer.start()
+            if self._watch is not None:
+                self._observer.unschedule(self._watch)
+                self._watch = None
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._watch = self._observer.schedule(_ChangeHandler(self, path), directory, recursive=False)
+        except Exception as e:
+            # Limite de surveillance atteinte, système de fichiers distant...
+            print(f"WARNING: Configuration file watcher unavailable, polling its mtime: {e}")
+            self._watch = None
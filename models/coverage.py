@@ -0,0 +1,165 @@
+"""
+Cross-profile coverage for the Trading Dashboard Pro application.
+Stacks the status flags of every profile into a profiles × assets ×
+timeframes cube, so coverage questions across all users are answered with
+array reductions instead of loops over profiles and cells.
+"""
+import numpy as np
+
+from config.settings import ASSET_CATEGORIES, TIMEFRAMES
+from models.data import load_profile_data, get_status_flags
+from models.profile_stats import iter_profile_stats
+from models.status_index import STATUS_TESTED
+
+
+class CoverageCube:
+    """
+    Status flags (uint8) of several profiles over the catalog assets
+
+    Attributes:
+        profiles (list): Profile names, one per layer of the cube
+        assets (list): Catalog assets from ASSET_CATEGORIES, one per row
+        timeframes (list): Timeframes, one per column
+        flags (numpy.ndarray): uint8 array of shape (profiles, assets, timeframes)
+        errors (dict): {profile name: error message} for profiles that could
+            not be read (their layer is all zeros)
+    """
+
+    def __init__(self, profiles, flags, errors=None):
+        self.profiles = list(profiles)
+        self.assets = catalog_assets()
+        self.timeframes = list(TIMEFRAMES)
+        self.flags = flags
+        self.errors = errors or {}
+
+    @classmethod
+    def build(cls, profile_names, **options):
+        """
+        Build the cube of several profiles, reading them concurrently
+
+        Args:
+            profile_names (list): Names of the profiles
+            **options: Pool options, see iter_profile_stats
+
+        Returns:
+            CoverageCube: Cube of every profile
+        """
+        profile_names = list(profile_names)
+        assets = catalog_assets()
+        layers = {name: i for i, name in enumerate(profile_names)}
+        flags = np.zeros((len(profile_names), len(assets), len(TIMEFRAMES)), dtype=np.uint8)
+        errors = {}
+
+        def profile_flags(profile_name):
+            return get_status_flags(assets, TIMEFRAMES, load_profile_data(profile_name, cache=False))
+
+        for profile_name, block, error in iter_profile_stats(
+                profile_names, stats_func=profile_flags, **options):
+            if error:
+                errors[profile_name] = error
+            else:
+                flags[layers[profile_name]] = block
+        return cls(profile_names, flags, errors)
+
+    def mask(self, status=STATUS_TESTED):
+        """
+        Get the cells that have a status
+
+        Args:
+            status (int, optional): STATUS_* flag(s). Default is STATUS_TESTED.
+
+        Returns:
+            numpy.ndarray: Boolean array of shape (profiles, assets, timeframes)
+        """
+        return (self.flags & status) != 0
+
+    def cell_counts(self, status=STATUS_TESTED):
+        """
+        Count the profiles having a status, cell by cell
+
+        Args:
+            status (int, optional): STATUS_* flag(s). Default is STATUS_TESTED.
+
+        Returns:
+            numpy.ndarray: int array of shape (assets, timeframes)
+        """
+        return self.mask(status).sum(axis=0)
+
+    def uncovered_cells(self, status=STATUS_TESTED):
+        """
+        List the asset/timeframe cells that no profile covers
+
+        Args:
+            status (int, optional): STATUS_* flag(s). Default is STATUS_TESTED.
+
+        Returns:
+            list: (asset, timeframe) tuples, in catalog order
+        """
+        rows, columns = np.nonzero(self.cell_counts(status) == 0)
+        return [(self.assets[r], self.timeframes[c]) for r, c in zip(rows, columns)]
+
+    def category_coverage(self, status=STATUS_TESTED):
+        """
+        Compute the share of covered cells per asset category and timeframe
+
+        Args:
+            status (int, optional): STATUS_* flag(s). Default is STATUS_TESTED.
+
+        Returns:
+            tuple: (category names, float array of shape (categories, timeframes)
+                with percentages of profile × asset pairs covered)
+        """
+        categories = list(ASSET_CATEGORIES)
+        rows = {asset: i for i, asset in enumerate(self.assets)}
+        membership = np.zeros((len(categories), len(self.assets)))
+        for i, category in enumerate(categories):
+            membership[i, [rows[asset] for asset in ASSET_CATEGORIES[category]["assets"]]] = 1
+
+        covered = membership @ self.cell_counts(status)
+        possible = membership.sum(axis=1, keepdims=True) * max(len(self.profiles), 1)
+        names = [ASSET_CATEGORIES[category]["name"] for category in categories]
+        return names, 100.0 * covered / np.maximum(possible, 1)
+
+    def profile_counts(self, status=STATUS_TESTED):
+        """
+        Count the covered assets of each profile per timeframe
+
+        Args:
+            status (int, optional): STATUS_* flag(s). Default is STATUS_TESTED.
+
+        Returns:
+            numpy.ndarray: int array of shape (profiles, timeframes)
+        """
+        return self.mask(status).sum(axis=1)
+
+    def top_profiles(self, status=STATUS_TESTED, limit=5):
+        """
+        Rank the profiles covering the most assets on each timeframe
+
+        Args:
+            status (int, optional): STATUS_* flag(s). Default is STATUS_TESTED.
+            limit (int, optional): Number of profiles per timeframe
+
+        Returns:
+            dict: {timeframe: [(profile name, count), ...]}, best first,
+                without profiles that cover nothing
+        """
+        counts = self.profile_counts(status)
+        # Tri stable décroissant: à égalité, l'ordre des profils est conservé
+        order = np.argsort(-counts, axis=0, kind="stable")[:limit]
+        return {
+            tf: [(self.profiles[p], int(counts[p, c])) for p in order[:, c] if counts[p, c] > 0]
+            for c, tf in enumerate(self.timeframes)
+        }
+
+
+def catalog_assets():
+    """
+    List the assets of ASSET_CATEGORIES without duplicates
+
+    Returns:
+        list: Asset names, in catalog order
+    """
+    return list(dict.fromkeys(
+        asset for category in ASSET_CATEGORIES.values() for asset in category["assets"]
+    ))
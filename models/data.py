@@ -5,73 +5,444 @@ parameters, notes, and screenshots.
 """
 import os
 import json
+import gzip
+import zipfile
+import tempfile
 from datetime import datetime
-from io import BytesIO
+from io import BytesIO, StringIO
 import base64
 from PIL import Image
 from models.auth import get_profile_path
-from config.settings import DEFAULT_PARAMS, MAX_SCREENSHOTS
+from models.storage import (
+    read_profile, write_profile, read_profile_stats, count_statuses, as_profile_dict
+)
+from models.write_behind import queue_profile_save, flush_profile_writes, get_pending_profile
+from models.blobs import put_blob, read_blob, get_blob_path, get_blob_hash, blob_exists, remove_unreferenced_blobs
+from models.thumbnails import ensure_derivatives, make_derivatives, read_derivative, get_derivative_path
+from models.imaging import encode_screenshot
+from models.image_cache import get_cached_image, put_cached_image, invalidate_cached_images
+from models.static_images import get_static_image_url, remove_unreferenced_static_images
+from models.status_index import StatusIndex
+from utils.jsonstream import iter_object_items
+from config.settings import (
+    DEFAULT_PARAMS, MAX_SCREENSHOTS, TIMEFRAMES, IMPORT_CHUNK_SIZE, IMPORT_BATCH_SIZE
+)
 
-def load_profile_data(profile_name):
+# Traitement des captures d'écran à l'export: intégrées en base64, exclues,
+# ou référencées et livrées comme fichiers séparés dans une archive zip
+EXPORT_SCREENSHOT_MODES = ("inline", "omit", "external")
+
+def _copy_value(value):
+    return value.copy() if isinstance(value, (dict, list)) else value
+
+# Champs d'une configuration stockés dans les slots de ConfigRecord
+CONFIG_FIELDS = ("tested", "improved", "note", "params", "screenshots", "last_modified")
+
+class ConfigRecord:
+    """
+    Fields of one configuration, in compact slots
+    
+    Reads like the dict it replaces (missing fields raise KeyError). Records
+    may be shared between ProfileData copies, so they are only modified
+    through ProfileData.update_config.
+    """
+    
+    __slots__ = CONFIG_FIELDS + ("extra",)
+    
+    def __init__(self, fields=None):
+        for field in CONFIG_FIELDS:
+            setattr(self, field, None)
+        self.extra = None
+        if fields:
+            self._set_fields(fields)
+    
+    def _set_fields(self, fields):
+        for field, value in fields.items():
+            if field in CONFIG_FIELDS:
+                setattr(self, field, value)
+            else:
+                # Champs inconnus conservés tels quels (copie avant modification)
+                extra = dict(self.extra or {})
+                if value is None:
+                    extra.pop(field, None)
+                else:
+                    extra[field] = value
+                self.extra = extra or None
+    
+    def copy(self):
+        """
+        Copy the record (field values are shared)
+        
+        Returns:
+            ConfigRecord: New record with the same fields
+        """
+        record = ConfigRecord.__new__(ConfigRecord)
+        for field in ConfigRecord.__slots__:
+            setattr(record, field, getattr(self, field))
+        return record
+    
+    def to_dict(self):
+        """
+        Get the fields as a dict
+        
+        Returns:
+            dict: Present fields (values are shared)
+        """
+        fields = {field: getattr(self, field) for field in CONFIG_FIELDS if getattr(self, field) is not None}
+        if self.extra:
+            fields.update(self.extra)
+        return fields
+    
+    def __getitem__(self, field):
+        value = getattr(self, field, None) if field in CONFIG_FIELDS else (self.extra or {}).get(field)
+        if value is None:
+            raise KeyError(field)
+        return value
+    
+    def __contains__(self, field):
+        try:
+            self[field]
+        except KeyError:
+            return False
+        return True
+    
+    def get(self, field, default=None):
+        try:
+            return self[field]
+        except KeyError:
+            return default
+    
+    def keys(self):
+        return self.to_dict().keys()
+    
+    def items(self):
+        return self.to_dict().items()
+    
+    def __iter__(self):
+        return iter(self.to_dict())
+    
+    def __len__(self):
+        return len(self.to_dict())
+    
+    def __eq__(self, other):
+        if isinstance(other, ConfigRecord):
+            other = other.to_dict()
+        return self.to_dict() == other
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return f"ConfigRecord({self.to_dict()!r})"
+
+class ProfileData:
+    """
+    Profile data with change tracking
+    
+    Configurations are ConfigRecord objects; other top-level keys (such as
+    '_custom_assets') are few and kept as plain values, copied with the
+    profile. Every change bumps `revision` and adds the key to `dirty`, so
+    callers detect changes with an integer comparison and savers persist
+    only the touched keys. The value of a key before its first change is
+    kept in `base`, so the storage layer can merge the changes with edits
+    saved meanwhile by other sessions; fields edited on both sides are
+    added to `conflicts`, a list shared with the copies handed to savers,
+    so the session that saved in the background learns about them. Copies
+    share their records until one side modifies them (copy-on-write). The
+    status index is built on first use and kept up to date by the same
+    changes.
+    """
+    
+    __slots__ = ("_records", "_values", "_owned", "_index", "revision", "dirty", "base", "conflicts")
+    
+    def __init__(self):
+        self._records = {}
+        self._values = {}
+        self._owned = set()  # Enregistrements propres à cet objet, modifiables sur place
+        self._index = None
+        self.revision = 0
+        self.dirty = set()
+        self.base = {}
+        self.conflicts = []
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build profile data from plain nested dicts
+        
+        The source is not modified and field values are shared with it, so
+        it may be the shared cached state.
+        
+        Args:
+            data (dict): Plain profile data
+            
+        Returns:
+            ProfileData: Clean profile data (revision 0, nothing dirty)
+        """
+        profile = cls()
+        for key, value in data.items():
+            if isinstance(value, dict):
+                profile._records[key] = ConfigRecord(value)
+            else:
+                profile._values[key] = _copy_value(value)
+        return profile
+    
+    def to_dict(self, keys=None):
+        """
+        Get the profile data as plain nested dicts
+        
+        Args:
+            keys (iterable, optional): Keys to include. Default is all keys.
+            
+        Returns:
+            dict: Plain profile data (field values are shared)
+        """
+        if keys is None:
+            keys = list(self)
+        plain = {}
+        for key in keys:
+            if key in self._records:
+                plain[key] = self._records[key].to_dict()
+            elif key in self._values:
+                plain[key] = self._values[key]
+        return plain
+    
+    def copy(self):
+        """
+        Copy the profile data, sharing records until they are modified
+        
+        Returns:
+            ProfileData: Copy with the same revision and dirty keys
+        """
+        copied = ProfileData()
+        copied._records = dict(self._records)
+        copied._values = {key: _copy_value(value) for key, value in self._values.items()}
+        copied._index = self._index.copy() if self._index is not None else None
+        copied.revision = self.revision
+        copied.dirty = set(self.dirty)
+        copied.base = dict(self.base)
+        # Conflits des sauvegardes de la copie signalés à l'original
+        copied.conflicts = self.conflicts
+        # Les enregistrements sont désormais partagés des deux côtés
+        self._owned = set()
+        return copied
+    
+    def pop_conflicts(self):
+        """
+        Get and forget the conflicts reported by the saves of this data
+        
+        Returns:
+            list: Conflicting edits, as "configuration (fields)" strings
+        """
+        conflicts = list(self.conflicts)
+        del self.conflicts[:len(conflicts)]
+        return conflicts
+    
+    def mark_clean(self):
+        """Forget the dirty keys, once their changes are handed to a saver"""
+        self.dirty = set()
+        self.base = {}
+    
+    @property
+    def status_index(self):
+        """StatusIndex of the profile, built on first use"""
+        if self._index is None:
+            self._index = StatusIndex.build(self)
+        return self._index
+    
+    def _remember(self, key):
+        """Keep the value of a key before its first change since the last save"""
+        if key in self.base:
+            return
+        if key in self._records:
+            self.base[key] = self._records[key].to_dict()
+        else:
+            self.base[key] = _copy_value(self._values.get(key))
+    
+    def _touch(self, key):
+        self.dirty.add(key)
+        self.revision += 1
+        if self._index is not None:
+            self._index.update(key, self._records.get(key))
+    
+    def update_config(self, config_id, **fields):
+        """
+        Set fields of a configuration, creating it if needed
+        
+        Args:
+            config_id (str): Configuration ID
+            **fields: Field values; None removes the field
+            
+        Returns:
+            ConfigRecord: Updated record
+        """
+        self._remember(config_id)
+        record = self._records.get(config_id)
+        if record is None:
+            self._values.pop(config_id, None)
+            record = ConfigRecord()
+        elif config_id not in self._owned:
+            record = record.copy()
+        record._set_fields(fields)
+        self._records[config_id] = record
+        self._owned.add(config_id)
+        self._touch(config_id)
+        return record
+    
+    def __setitem__(self, key, value):
+        self._remember(key)
+        if isinstance(value, (dict, ConfigRecord)):
+            self._values.pop(key, None)
+            self._records[key] = ConfigRecord(dict(value.items()))
+            self._owned.add(key)
+        else:
+            self._records.pop(key, None)
+            self._values[key] = value
+        self._touch(key)
+    
+    def __delitem__(self, key):
+        self._remember(key)
+        if key in self._records:
+            del self._records[key]
+            self._owned.discard(key)
+        else:
+            del self._values[key]
+        self._touch(key)
+    
+    def __getitem__(self, key):
+        if key in self._records:
+            return self._records[key]
+        return self._values[key]
+    
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def __contains__(self, key):
+        return key in self._records or key in self._values
+    
+    def __iter__(self):
+        yield from list(self._records)
+        yield from list(self._values)
+    
+    def __len__(self):
+        return len(self._records) + len(self._values)
+    
+    def keys(self):
+        return list(self)
+    
+    def values(self):
+        return [self[key] for key in self]
+    
+    def items(self):
+        return [(key, self[key]) for key in self]
+    
+    def __eq__(self, other):
+        if isinstance(other, ProfileData):
+            other = other.to_dict()
+        return self.to_dict() == other
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return f"ProfileData(revision={self.revision}, configs={len(self._records)}, dirty={len(self.dirty)})"
+
+def get_status_flags(assets, timeframes, data):
+    """
+    Get the status flags of a block of asset × timeframe cells in one lookup
+    
+    Args:
+        assets (list): List of assets
+        timeframes (list): List of timeframes
+        data (dict or ProfileData): Profile data
+        
+    Returns:
+        numpy.ndarray: uint8 matrix of STATUS_* flags (models/status_index.py),
+            one row per asset and one column per timeframe
+    """
+    index = data.status_index if isinstance(data, ProfileData) else StatusIndex.build(data)
+    return index.block(assets, timeframes)
+
+def _update_config(data, config_id, **fields):
+    """Set fields of a configuration (created if needed) and stamp its modification date"""
+    fields['last_modified'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(data, ProfileData):
+        data.update_config(config_id, **fields)
+    else:
+        data.setdefault(config_id, {}).update(fields)
+
+def load_profile_data(profile_name, cache=True):
     """
     Load data for a given profile
     
     Args:
         profile_name (str): Name of the profile
+        cache (bool, optional): Keep the profile in the shared profile cache.
+            Default is True; analytics over every profile pass False.
         
     Returns:
-        dict: Profile data
+        ProfileData: Profile data
     """
+    # Queued saves not yet written are the most recent state
+    pending = get_pending_profile(profile_name)
+    if pending is not None:
+        if isinstance(pending, ProfileData):
+            data = pending.copy()
+            data.mark_clean()
+            data.conflicts = []  # Conflits propres à la session qui a sauvegardé
+            return data
+        return ProfileData.from_dict(pending)
+    
     profile_path = get_profile_path(profile_name)
     print(f"Loading profile data from: {profile_path}")
     
-    if os.path.exists(profile_path):
-        try:
-            with open(profile_path, 'r') as f:
-                data = json.load(f)
-            print(f"Successfully loaded profile '{profile_name}' with {len(data)} configurations")
-            return data
-        except Exception as e:
-            print(f"ERROR loading profile '{profile_name}': {e}")
-            import traceback
-            traceback.print_exc()
-            return {}
-    else:
+    try:
+        # Records share the cached state until modified (copy-on-write)
+        data = read_profile(profile_name, factory=ProfileData.from_dict, cache=cache)
+    except Exception as e:
+        print(f"ERROR loading profile '{profile_name}': {e}")
+        import traceback
+        traceback.print_exc()
+        return ProfileData()
+    
+    if data is None:
         print(f"Profile file not found: {profile_path}")
-        return {}
+        return ProfileData()
+    
+    print(f"Successfully loaded profile '{profile_name}' with {len(data)} configurations")
+    return data
 
 def save_profile_data(profile_name, data):
     """
-    Save data for a given profile
+    Save data for a given profile, synchronously
+    
+    Views should prefer queue_profile_save, which coalesces rapid saves
+    into a single background write.
     
     Args:
         profile_name (str): Name of the profile
-        data (dict): Profile data to save
+        data (dict or ProfileData): Profile data to save. For a ProfileData
+            only the dirty configurations are written.
         
     Returns:
         bool: Success status
     """
     try:
+        # Queued saves must not land after (and overwrite) this one
+        flush_profile_writes(profile_name)
+        
         profile_path = get_profile_path(profile_name)
         print(f"Saving profile data to: {profile_path}")
         
-        # Make sure the directory exists
-        directory = os.path.dirname(profile_path)
-        if not os.path.exists(directory):
-            os.makedirs(directory)
-            print(f"Created directory: {directory}")
-        
-        # Save the data
-        with open(profile_path, 'w') as f:
-            json.dump(data, f, indent=4)
-        
-        # Verify the file was created
-        if os.path.exists(profile_path):
-            file_size = os.path.getsize(profile_path)
-            print(f"Successfully saved profile data. File size: {file_size} bytes")
+        # Save the data (backend and mode configured in config/settings.py)
+        if write_profile(profile_name, data):
+            if isinstance(data, ProfileData):
+                data.mark_clean()
+            print(f"Successfully saved profile data for '{profile_name}'")
             return True
         else:
-            print(f"WARNING: File does not exist after writing: {profile_path}")
+            print(f"WARNING: Profile data not found after writing: {profile_path}")
             return False
     except Exception as e:
         print(f"ERROR saving profile '{profile_name}': {e}")
@@ -141,12 +512,8 @@ def toggle_tested(asset, timeframe, data):
         tuple: (updated data, new status)
     """
     config_id = get_config_id(asset, timeframe)
-    if config_id not in data:
-        data[config_id] = {}
-    
-    current_status = data[config_id].get('tested', False)
-    data[config_id]['tested'] = not current_status
-    data[config_id]['last_modified'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    current_status = config_id in data and data[config_id].get('tested', False)
+    _update_config(data, config_id, tested=not current_status)
     
     return data, not current_status
 
@@ -163,12 +530,8 @@ def toggle_improved(asset, timeframe, data):
         tuple: (updated data, new status)
     """
     config_id = get_config_id(asset, timeframe)
-    if config_id not in data:
-        data[config_id] = {}
-    
-    current_status = data[config_id].get('improved', False)
-    data[config_id]['improved'] = not current_status
-    data[config_id]['last_modified'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    current_status = config_id in data and data[config_id].get('improved', False)
+    _update_config(data, config_id, improved=not current_status)
     
     return data, not current_status
 
@@ -186,7 +549,7 @@ def get_params(asset, timeframe, data):
     """
     config_id = get_config_id(asset, timeframe)
     if config_id in data and 'params' in data[config_id]:
-        return data[config_id]['params']
+        return dict(data[config_id]['params'])
     return DEFAULT_PARAMS.copy()
 
 def save_params(asset, timeframe, params, data):
@@ -203,11 +566,7 @@ def save_params(asset, timeframe, params, data):
         dict: Updated profile data
     """
     config_id = get_config_id(asset, timeframe)
-    if config_id not in data:
-        data[config_id] = {}
-    
-    data[config_id]['params'] = params
-    data[config_id]['last_modified'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    _update_config(data, config_id, params=params)
     
     return data
 
@@ -242,11 +601,7 @@ def save_note(asset, timeframe, note, data):
         dict: Updated profile data
     """
     config_id = get_config_id(asset, timeframe)
-    if config_id not in data:
-        data[config_id] = {}
-    
-    data[config_id]['note'] = note
-    data[config_id]['last_modified'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    _update_config(data, config_id, note=note)
     
     return data
 
@@ -268,6 +623,190 @@ def has_note(asset, timeframe, data=None):
     note = get_note(asset, timeframe, data)
     return note != ""
 
+def select_configs(assets, timeframes):
+    """
+    Build the configuration IDs of every asset × timeframe pair
+
+    Args:
+        assets (list): List of assets
+        timeframes (list): List of timeframes
+
+    Returns:
+        list: Configuration IDs, row by row
+    """
+    return [get_config_id(asset, timeframe) for asset in assets for timeframe in timeframes]
+
+def apply_bulk(profile_name, selector, ops, data=None):
+    """
+    Apply the same changes to many configurations and save them in one write
+
+    Supported operations:
+        tested (bool), improved (bool): Set the status
+        params (dict): Parameters merged over the current ones (or the defaults)
+        clear_note (bool): Empty the note
+
+    Configurations already in the requested state are left untouched.
+
+    Args:
+        profile_name (str): Name of the profile
+        selector (iterable): Configuration IDs or (asset, timeframe) pairs
+        ops (dict): Operations to apply
+        data (ProfileData, optional): Profile data to modify. If None, the
+            profile is loaded.
+
+    Returns:
+        tuple: (updated data, number of changed configurations, success status)
+
+    Raises:
+        ValueError: If an operation or a parameter name is unknown
+    """
+    unknown = sorted(set(ops) - {'tested', 'improved', 'params', 'clear_note'})
+    if unknown:
+        raise ValueError(f"Unknown bulk operations: {', '.join(unknown)}")
+    new_params = {name: str(value) for name, value in ops.get('params', {}).items()}
+    unknown = sorted(name for name in new_params if name not in DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(unknown)}")
+
+    if data is None:
+        data = load_profile_data(profile_name)
+
+    changed = 0
+    for item in selector:
+        config_id = get_config_id(*item) if isinstance(item, tuple) else item
+        current = data.get(config_id) or {}
+        fields = {}
+        for field in ('tested', 'improved'):
+            if field in ops and bool(current.get(field, False)) != bool(ops[field]):
+                fields[field] = bool(ops[field])
+        if new_params:
+            params = dict(current.get('params') or DEFAULT_PARAMS)
+            params.update(new_params)
+            if params != current.get('params'):
+                fields['params'] = params
+        if ops.get('clear_note') and current.get('note'):
+            fields['note'] = ""
+        if fields:
+            _update_config(data, config_id, **fields)
+            changed += 1
+
+    if not changed:
+        return data, 0, True
+    return data, changed, save_profile_data(profile_name, data)
+
+class ScreenshotHandle:
+    """
+    Lazy access to a stored screenshot
+
+    Metadata is available immediately; the image bytes are only read from
+    the blob store (or decoded, for legacy inline records) on demand.
+    """
+    
+    def __init__(self, record):
+        self.record = record
+    
+    @property
+    def date(self):
+        return self.record.get('date', '')
+    
+    @property
+    def description(self):
+        return self.record.get('description', '')
+    
+    @property
+    def blob_hash(self):
+        return self.record.get('blob')
+    
+    @property
+    def size(self):
+        return self.record.get('size')
+    
+    @property
+    def width(self):
+        return self.record.get('width')
+    
+    @property
+    def height(self):
+        return self.record.get('height')
+    
+    def read_bytes(self):
+        """
+        Read the image content
+        
+        Returns:
+            bytes: Raw image data
+        """
+        if self.blob_hash:
+            return read_blob(self.blob_hash)
+        return base64.b64decode(self.record.get('image_data', ''))
+    
+    def read_thumbnail(self, variant="thumb"):
+        """
+        Read a reduced version of the image
+        
+        Args:
+            variant (str, optional): Size in THUMBNAIL_SIZES ("thumb" or "preview")
+            
+        Returns:
+            bytes: WebP image data, or the original image if it cannot be reduced
+        """
+        if self.blob_hash:
+            content = read_derivative(self.blob_hash, variant)
+        else:
+            # Ancien format en ligne: réduction en mémoire, sans stockage
+            try:
+                content = make_derivatives(self.read_bytes(), [variant])[variant]
+            except OSError:
+                content = None
+        return content if content is not None else self.read_bytes()
+    
+    @property
+    def content_hash(self):
+        """Hash of the image content, also for legacy inline records"""
+        if self.blob_hash:
+            return self.blob_hash
+        return get_blob_hash(self.record.get('image_data', '').encode())
+    
+    def read_image(self, variant=None):
+        """
+        Read display-ready image bytes through the shared image cache
+        
+        Args:
+            variant (str, optional): Size in THUMBNAIL_SIZES, None for the original
+            
+        Returns:
+            bytes: Image data
+        """
+        content_hash = self.content_hash
+        content = get_cached_image(content_hash, variant)
+        if content is None:
+            content = self.read_thumbnail(variant) if variant else self.read_bytes()
+            put_cached_image(content_hash, variant, content)
+        return content
+    
+    def get_image_url(self, variant=None):
+        """
+        Get the URL of the image published as a static file
+        
+        Args:
+            variant (str, optional): Size in THUMBNAIL_SIZES, None for the original
+            
+        Returns:
+            str: URL relative to the app, or None if the image cannot be served
+                as a static file
+        """
+        source = None
+        if self.blob_hash:
+            # Publié comme lien vers le fichier stocké, sans copie
+            source = get_derivative_path(self.blob_hash, variant) if variant else get_blob_path(self.blob_hash)
+        return get_static_image_url(self.content_hash, variant, lambda: self.read_image(variant), source)
+    
+    def __getitem__(self, key):
+        # Compatibilité avec l'ancien format dict des captures d'écran
+        if key == 'image_data':
+            return base64.b64encode(self.read_bytes()).decode()
+        return self.record[key]
+
 def get_screenshots(asset, timeframe, data):
     """
     Get screenshots for a configuration
@@ -278,11 +817,11 @@ def get_screenshots(asset, timeframe, data):
         data (dict): Profile data
         
     Returns:
-        list: Screenshots for the configuration
+        list: ScreenshotHandle objects for the configuration
     """
     config_id = get_config_id(asset, timeframe)
     if config_id in data and 'screenshots' in data[config_id]:
-        return data[config_id]['screenshots']
+        return [ScreenshotHandle(record) for record in data[config_id]['screenshots']]
     return []
 
 def has_screenshots(asset, timeframe, data=None):
@@ -303,6 +842,37 @@ def has_screenshots(asset, timeframe, data=None):
     screenshots = get_screenshots(asset, timeframe, data)
     return len(screenshots) > 0
 
+def store_screenshot_image(image_data, derivatives=True):
+    """
+    Store image content in the blob store
+    
+    Args:
+        image_data (bytes or str): Raw image data, or base64-encoded image data
+        derivatives (bool, optional): Also make the thumbnail and preview now.
+            Otherwise they are made on first display or by the backfill.
+        
+    Returns:
+        dict: Screenshot reference fields (blob, size, width, height)
+    """
+    if isinstance(image_data, str):
+        image_data = base64.b64decode(image_data)
+    
+    try:
+        width, height = Image.open(BytesIO(image_data)).size
+    except Exception:
+        width, height = None, None
+    
+    blob_hash = put_blob(image_data)
+    if derivatives:
+        ensure_derivatives(blob_hash, image_data)
+    
+    return {
+        'blob': blob_hash,
+        'size': len(image_data),
+        'width': width,
+        'height': height
+    }
+
 def save_screenshot(asset, timeframe, image_data, description, data):
     """
     Save a screenshot for a configuration
@@ -310,7 +880,7 @@ def save_screenshot(asset, timeframe, image_data, description, data):
     Args:
         asset (str): Asset name
         timeframe (str): Timeframe
-        image_data (str): Base64-encoded image data
+        image_data (bytes or str): Raw image data, or base64-encoded image data
         description (str): Description for the screenshot
         data (dict): Profile data
         
@@ -318,25 +888,23 @@ def save_screenshot(asset, timeframe, image_data, description, data):
         dict: Updated profile data
     """
     config_id = get_config_id(asset, timeframe)
-    if config_id not in data:
-        data[config_id] = {}
-    
-    if 'screenshots' not in data[config_id]:
-        data[config_id]['screenshots'] = []
+    screenshots = list(data[config_id].get('screenshots', [])) if config_id in data else []
     
     # Limit to MAX_SCREENSHOTS
-    if len(data[config_id]['screenshots']) >= MAX_SCREENSHOTS:
-        data[config_id]['screenshots'].pop(0)  # Remove the oldest
+    if len(screenshots) >= MAX_SCREENSHOTS:
+        invalidate_cached_images(ScreenshotHandle(screenshots.pop(0)).content_hash)  # Remove the oldest
     
-    # Add new screenshot
+    # Add new screenshot (the image itself lives in the blob store)
     screenshot_data = {
         'date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        'description': description,
-        'image_data': image_data
+        'description': description
     }
+    screenshot_data.update(store_screenshot_image(image_data))
+    # Miniature éventuellement mise en cache avant sa création (original à défaut)
+    invalidate_cached_images(screenshot_data['blob'])
     
-    data[config_id]['screenshots'].append(screenshot_data)
-    data[config_id]['last_modified'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    screenshots.append(screenshot_data)
+    _update_config(data, config_id, screenshots=screenshots)
     
     return data
 
@@ -358,48 +926,418 @@ def delete_screenshot(asset, timeframe, index, data):
         'screenshots' in data[config_id] and 
         0 <= index < len(data[config_id]['screenshots'])):
         
-        data[config_id]['screenshots'].pop(index)
-        data[config_id]['last_modified'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        screenshots = list(data[config_id]['screenshots'])
+        invalidate_cached_images(ScreenshotHandle(screenshots.pop(index)).content_hash)
+        _update_config(data, config_id, screenshots=screenshots)
         return data, True
     
     return data, False
 
 def process_uploaded_image(uploaded_file):
     """
-    Process an uploaded image file to base64
+    Process an uploaded image file following SCREENSHOT_ENCODING
     
     Args:
         uploaded_file: Uploaded file object
         
     Returns:
-        str: Base64-encoded image data
+        bytes: Encoded image data (lossless WebP/PNG for charts, JPEG for
+            photos), downscaled and within the byte budget, or None on error
     """
     try:
-        # Open image from uploaded file
-        image = Image.open(uploaded_file)
-        
-        # Convert to base64
-        buffered = BytesIO()
-        image.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
-        
-        return img_str
+        # L'aperçu de la vue a pu déjà lire le fichier
+        if hasattr(uploaded_file, 'seek'):
+            uploaded_file.seek(0)
+        image_bytes, _ = encode_screenshot(uploaded_file)
+        return image_bytes
     except Exception as e:
         print(f"Error processing image: {e}")
         return None
 
+def _inline_screenshots(config_data):
+    """Copy a configuration with its screenshot images embedded as base64"""
+    config_data = dict(config_data)
+    config_data['screenshots'] = [
+        {
+            'date': handle.date,
+            'description': handle.description,
+            'image_data': handle['image_data']
+        }
+        for handle in map(ScreenshotHandle, config_data['screenshots'])
+    ]
+    return config_data
+
+def _externalize_screenshots(data):
+    """Move base64 screenshot images of imported data into the blob store"""
+    for config_data in data.values():
+        if not isinstance(config_data, dict):
+            continue
+        for screenshot in config_data.get('screenshots', []):
+            if 'image_data' in screenshot:
+                # Miniatures créées à l'affichage: l'import reste rapide
+                screenshot.update(store_screenshot_image(screenshot.pop('image_data'), derivatives=False))
+    return data
+
 def export_profile_data(profile_name):
     """
     Export profile data as JSON
     
+    Screenshots are embedded as base64 so the export is self-contained.
+    
     Args:
         profile_name (str): Name of the profile
         
     Returns:
         str: JSON string with profile data
     """
+    return "".join(iter_profile_export(profile_name))
+
+def _export_config(config_data, screenshots, blob_hashes):
+    """Prepare one configuration for export according to the screenshot mode"""
+    if not isinstance(config_data, dict) or not config_data.get('screenshots'):
+        return config_data
+    
+    config_data = dict(config_data)
+    if screenshots == "omit":
+        del config_data['screenshots']
+    elif screenshots == "external":
+        config_data['screenshots'] = [dict(s) for s in config_data['screenshots'] if 'blob' in s]
+        if blob_hashes is not None:
+            blob_hashes.update(s['blob'] for s in config_data['screenshots'])
+    else:
+        config_data = _inline_screenshots(config_data)
+    return config_data
+
+def iter_profile_export(profile_name, screenshots="inline", blob_hashes=None):
+    """
+    Export profile data as JSON, in chunks, one configuration at a time
+    
+    The concatenated chunks are identical to the former json.dumps(indent=4)
+    export, but only one configuration (and its images) is encoded at once.
+    
+    Args:
+        profile_name (str): Name of the profile
+        screenshots (str, optional): "inline" embeds images as base64, "omit"
+            leaves screenshots out, "external" keeps only blob references.
+            Default is "inline".
+        blob_hashes (set, optional): Collects the blob hashes referenced by
+            the export in "external" mode
+        
+    Yields:
+        str: Chunks of the JSON document
+    """
+    if screenshots not in EXPORT_SCREENSHOT_MODES:
+        raise ValueError(f"Unknown screenshot export mode: {screenshots}")
+    
     data = load_profile_data(profile_name)
-    return json.dumps(data, indent=4)
+    if not data:
+        yield "{}"
+        return
+    
+    separator = "{\n"
+    for key in data:
+        config_data = _export_config(data.to_dict([key])[key], screenshots, blob_hashes)
+        # Les chaînes JSON n'ont pas de retour à la ligne brut: l'indentation peut être décalée
+        value = json.dumps(config_data, indent=4).replace("\n", "\n    ")
+        yield f"{separator}    {json.dumps(key)}: {value}"
+        separator = ",\n"
+    yield "\n}"
+
+def export_profile_to_file(profile_name, compress=False, screenshots="inline", directory=None):
+    """
+    Stream the export of a profile into a temporary file
+    
+    In "external" mode the file is a zip archive holding the JSON export
+    and the referenced images under blobs/<hash>; otherwise it is the JSON
+    export, gzip-compressed if requested.
+    
+    Args:
+        profile_name (str): Name of the profile
+        compress (bool, optional): Compress the export. Default is False.
+        screenshots (str, optional): Screenshot mode, see iter_profile_export
+        directory (str, optional): Directory of the temporary file
+        
+    Returns:
+        tuple: (file path, download file name, MIME type); the caller
+            deletes the file
+    """
+    if screenshots == "external":
+        suffix, mime = ".zip", "application/zip"
+    elif compress:
+        suffix, mime = ".json.gz", "application/gzip"
+    else:
+        suffix, mime = ".json", "application/json"
+    
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            if screenshots == "external":
+                blob_hashes = set()
+                method = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+                with zipfile.ZipFile(f, 'w', compression=method) as archive:
+                    with archive.open(f"{profile_name}.json", 'w') as entry:
+                        for chunk in iter_profile_export(profile_name, screenshots, blob_hashes):
+                            entry.write(chunk.encode('utf-8'))
+                    for blob_hash in sorted(blob_hashes):
+                        archive.write(get_blob_path(blob_hash), f"blobs/{blob_hash}")
+            else:
+                stream = gzip.GzipFile(fileobj=f, mode='wb') if compress else f
+                try:
+                    for chunk in iter_profile_export(profile_name, screenshots):
+                        stream.write(chunk.encode('utf-8'))
+                finally:
+                    if stream is not f:
+                        stream.close()
+    except Exception:
+        os.remove(path)
+        raise
+    
+    return path, f"{profile_name}_export{suffix}", mime
+
+def validate_config_record(config_id, record):
+    """
+    Check an imported profile entry against the profile schema
+    
+    Parameters follow DEFAULT_PARAMS: unknown names are dropped, missing
+    ones take their default value and numbers are converted to strings.
+    Values that do not match PARAM_SCHEMA are kept but reported.
+    
+    Args:
+        config_id (str): Key of the entry
+        record: Imported value
+        
+    Returns:
+        tuple: (cleaned value, or None if the entry is rejected, list of messages)
+    """
+    if config_id.startswith('_'):
+        if config_id == '_custom_assets':
+            if not isinstance(record, list) or not all(isinstance(asset, str) for asset in record):
+                return None, ["'_custom_assets' doit être une liste de symboles"]
+            return sorted(set(record)), []
+        return record, []
+    
+    asset, _, timeframe = config_id.rpartition('_')
+    if not asset or timeframe not in TIMEFRAMES:
+        return None, [f"Identifiant de configuration invalide: {config_id}"]
+    if not isinstance(record, dict):
+        return None, ["La configuration doit être un objet JSON"]
+    
+    record = dict(record)
+    errors = []
+    messages = []
+    
+    for field in ('tested', 'improved'):
+        if field in record and not isinstance(record[field], bool):
+            errors.append(f"'{field}' doit être un booléen")
+    for field in ('note', 'last_modified'):
+        if field in record and not isinstance(record[field], str):
+            errors.append(f"'{field}' doit être une chaîne de caractères")
+    
+    if 'params' in record:
+        params = record['params']
+        if not isinstance(params, dict):
+            errors.append("'params' doit être un objet JSON")
+        else:
+            unknown = sorted(name for name in params if name not in DEFAULT_PARAMS)
+            if unknown:
+                messages.append(f"Paramètres inconnus ignorés: {', '.join(unknown)}")
+            missing = [name for name in DEFAULT_PARAMS if name not in params]
+            if missing:
+                messages.append(f"{len(missing)} paramètre(s) manquant(s) remplacé(s) par la valeur par défaut")
+            cleaned = {}
+            for name, default in DEFAULT_PARAMS.items():
+                value = params.get(name, default)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    value = str(value)
+                if not isinstance(value, str):
+                    errors.append(f"Valeur invalide pour le paramètre '{name}'")
+                cleaned[name] = value
+            record['params'] = cleaned
+            if not errors:
+                from models.params import invalid_params
+                mistyped = invalid_params(cleaned)
+                if mistyped:
+                    messages.append(f"Valeurs non conformes au type attendu: {', '.join(mistyped)}")
+    
+    if 'screenshots' in record:
+        screenshots = record['screenshots']
+        if not isinstance(screenshots, list) or not all(
+            isinstance(s, dict) and (isinstance(s.get('blob'), str) or isinstance(s.get('image_data'), str))
+            for s in screenshots
+        ):
+            errors.append("'screenshots' doit être une liste de captures (blob ou image_data)")
+        else:
+            kept = [s for s in screenshots if 'image_data' in s or blob_exists(s['blob'])]
+            if len(kept) < len(screenshots):
+                messages.append(f"{len(screenshots) - len(kept)} capture(s) sans image ignorée(s)")
+            if len(kept) > MAX_SCREENSHOTS:
+                messages.append(f"Seules les {MAX_SCREENSHOTS} dernières captures sont conservées")
+                kept = kept[-MAX_SCREENSHOTS:]
+            record['screenshots'] = kept
+    
+    if errors:
+        return None, errors
+    return record, messages
+
+def _write_import_batch(profile_name, records, deleted=()):
+    """Write imported entries over the stored ones and delete keys, without loading the profile"""
+    # Clés à supprimer présentes (valeur None) pour pouvoir être retirées
+    batch = ProfileData.from_dict(dict.fromkeys(deleted))
+    for key in deleted:
+        del batch[key]
+    for key, record in records.items():
+        batch[key] = record
+    # Les entrées importées remplacent les valeurs stockées, sans fusion à trois voies
+    batch.base.clear()
+    if batch.dirty and not save_profile_data(profile_name, batch):
+        raise IOError(f"Erreur lors de la sauvegarde du profil '{profile_name}'")
+
+def import_profile_stream(profile_name, fileobj, merge=False, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Import profile data from a JSON stream, one configuration at a time
+    
+    Entries are parsed incrementally, validated, and written to storage
+    every batch_size entries; only the current batch and the imported keys
+    are kept in memory. In merge mode the batches are written as they are
+    read, and the ones read before an error stay imported. In replace mode
+    the entries are staged in a temporary file and only applied, with the
+    removal of the existing entries missing from the import, once the whole
+    file has been read successfully: a file that cannot be read leaves the
+    profile unchanged.
+    
+    Args:
+        profile_name (str): Name of the profile
+        fileobj: Binary or text file object holding a JSON object
+        merge (bool, optional): Whether to merge with existing data. Default is False.
+        batch_size (int, optional): Number of entries written per save
+        
+    Returns:
+        dict: Report with the number of imported and rejected entries, the
+            entries that were rejected or adjusted ({key, status, messages}),
+            and the error that stopped the import, or None
+    """
+    report = {"imported": 0, "rejected": 0, "entries": [], "error": None}
+    imported_keys = set()
+    batch = {}
+    staged = None if merge else tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+    
+    def save_batch():
+        if staged is not None:
+            for key, record in batch.items():
+                staged.write(json.dumps([key, record]) + "\n")
+        else:
+            _write_import_batch(profile_name, batch)
+        batch.clear()
+    
+    try:
+        for key, value in iter_object_items(fileobj, IMPORT_CHUNK_SIZE):
+            record, messages = validate_config_record(key, value)
+            if record is not None:
+                try:
+                    _externalize_screenshots({key: record})
+                except Exception as e:
+                    record, messages = None, [f"Image invalide: {e}"]
+            
+            if record is None:
+                report["rejected"] += 1
+                report["entries"].append({"key": key, "status": "rejected", "messages": messages})
+                continue
+            
+            batch[key] = record
+            imported_keys.add(key)
+            report["imported"] += 1
+            if messages:
+                report["entries"].append({"key": key, "status": "adjusted", "messages": messages})
+            if len(batch) >= batch_size:
+                save_batch()
+        save_batch()
+        
+        if staged is not None:
+            # Fichier lu en entier: application des entrées mises de côté
+            staged.seek(0)
+            for line in staged:
+                key, record = json.loads(line)
+                batch[key] = record
+                if len(batch) >= batch_size:
+                    _write_import_batch(profile_name, batch)
+                    batch.clear()
+            # Replace existing data
+            flush_profile_writes(profile_name)
+            stored_keys = read_profile(profile_name, factory=list) or []
+            _write_import_batch(profile_name, batch,
+                                [key for key in stored_keys if key not in imported_keys])
+    except ValueError as e:
+        report["error"] = f"Fichier JSON invalide: {e}"
+        if staged is not None:
+            report["imported"] = 0
+            report["error"] += "; profil inchangé"
+        else:
+            # Les entrées valides déjà lues restent importées
+            try:
+                save_batch()
+            except Exception as save_error:
+                report["error"] += f"; {save_error}"
+    except Exception as e:
+        report["error"] = f"Erreur lors de l'importation: {e}"
+    finally:
+        if staged is not None:
+            staged.close()
+    
+    return report
+
+def import_profile_file(profile_name, fileobj, merge=False):
+    """
+    Import a profile export file: JSON, gzip-compressed JSON, or a zip
+    archive with separate screenshot files (see export_profile_to_file)
+    
+    Args:
+        profile_name (str): Name of the profile
+        fileobj: Seekable binary file object
+        merge (bool, optional): Whether to merge with existing data. Default is False.
+        
+    Returns:
+        dict: Import report, see import_profile_stream
+    """
+    head = fileobj.read(2)
+    fileobj.seek(0)
+    
+    if head == b'PK':
+        with zipfile.ZipFile(fileobj) as archive:
+            names = archive.namelist()
+            # Les images d'abord, pour que les références soient valides
+            for name in names:
+                if name.startswith('blobs/') and not name.endswith('/'):
+                    put_blob(archive.read(name))
+            json_names = [name for name in names if name.endswith('.json')]
+            if not json_names:
+                return {"imported": 0, "rejected": 0, "entries": [],
+                        "error": "Aucun fichier JSON dans l'archive"}
+            with archive.open(json_names[0]) as stream:
+                return import_profile_stream(profile_name, stream, merge)
+    
+    if head == b'\x1f\x8b':
+        with gzip.GzipFile(fileobj=fileobj) as stream:
+            return import_profile_stream(profile_name, stream, merge)
+    
+    return import_profile_stream(profile_name, fileobj, merge)
+
+def format_import_report(profile_name, report):
+    """
+    Summarize an import report for display
+    
+    Args:
+        profile_name (str): Name of the profile
+        report (dict): Import report
+        
+    Returns:
+        tuple: (success, message)
+    """
+    if report["error"]:
+        return False, f"{report['error']} ({report['imported']} entrée(s) importée(s) avant l'erreur)"
+    message = f"Données importées avec succès dans '{profile_name}' ({report['imported']} entrée(s))."
+    if report["rejected"]:
+        message += f" {report['rejected']} entrée(s) rejetée(s)."
+    return True, message
 
 def import_profile_data(profile_name, json_data, merge=False):
     """
@@ -413,23 +1351,28 @@ def import_profile_data(profile_name, json_data, merge=False):
     Returns:
         tuple: (success, message)
     """
-    try:
-        import_data = json.loads(json_data)
-        
-        if merge:
-            # Merge with existing data
-            current_data = load_profile_data(profile_name)
-            for config_id, config_data in import_data.items():
-                current_data[config_id] = config_data
-            
-            save_profile_data(profile_name, current_data)
-        else:
-            # Replace existing data
-            save_profile_data(profile_name, import_data)
+    report = import_profile_stream(profile_name, StringIO(json_data), merge)
+    return format_import_report(profile_name, report)
+
+def collect_unused_screenshots(profile_names):
+    """
+    Delete stored screenshot images no longer referenced by any profile,
+    with their derivatives and published static files
+    
+    Args:
+        profile_names (list): Names of all profiles
         
-        return True, f"Données importées avec succès dans '{profile_name}'."
-    except Exception as e:
-        return False, f"Erreur lors de l'importation: {e}"
+    Returns:
+        int: Number of deleted images
+    """
+    referenced = set()
+    for profile_name in profile_names:
+        data = as_profile_dict(load_profile_data(profile_name))
+        for config_data in data.values():
+            if isinstance(config_data, dict):
+                referenced.update(ScreenshotHandle(s).content_hash for s in config_data.get('screenshots', []))
+    remove_unreferenced_static_images(referenced)
+    return remove_unreferenced_blobs(referenced)
 
 def get_custom_assets(profile_name, data=None):
     """
@@ -464,17 +1407,14 @@ def add_custom_asset(profile_name, asset_symbol, data=None):
     if data is None:
         data = load_profile_data(profile_name)
     
-    # Initialiser la liste des actifs personnalisés si elle n'existe pas
-    if '_custom_assets' not in data:
-        data['_custom_assets'] = []
+    custom_assets = data['_custom_assets'] if '_custom_assets' in data else []
     
     # Vérifier si l'actif existe déjà
-    if asset_symbol in data['_custom_assets']:
+    if asset_symbol in custom_assets:
         return False, f"L'actif {asset_symbol} existe déjà.", data
     
-    # Ajouter le nouvel actif
-    data['_custom_assets'].append(asset_symbol)
-    data['_custom_assets'].sort()  # Garder la liste triée
+    # Ajouter le nouvel actif (nouvelle liste: l'ancienne peut être partagée)
+    data['_custom_assets'] = sorted(custom_assets + [asset_symbol])  # Garder la liste triée
     
     # Sauvegarder les modifications
     if save_profile_data(profile_name, data):
@@ -500,7 +1440,7 @@ def remove_custom_asset(profile_name, asset_symbol, data=None):
     if '_custom_assets' not in data or asset_symbol not in data['_custom_assets']:
         return False, f"L'actif {asset_symbol} n'existe pas.", data
     
-    data['_custom_assets'].remove(asset_symbol)
+    data['_custom_assets'] = [asset for asset in data['_custom_assets'] if asset != asset_symbol]
     
     if save_profile_data(profile_name, data):
         return True, f"Actif {asset_symbol} supprimé avec succès.", data
@@ -511,37 +1451,35 @@ def get_profile_stats(profile_name):
     """
     Get statistics for a profile
     
+    Counts come from the status summary maintained on every write, so the
+    profile itself is not loaded.
+    
     Args:
         profile_name (str): Name of the profile
         
     Returns:
         dict: Profile statistics
     """
-    data = load_profile_data(profile_name)
+    # Queued saves not yet written are the most recent state (already in memory)
+    pending = get_pending_profile(profile_name)
+    if pending is not None:
+        counts = count_statuses(as_profile_dict(pending))
+    else:
+        counts = read_profile_stats(profile_name)
     
-    if not data:
-        return {
-            "total_configs": 0,
-            "configs_tested": 0,
-            "configs_improved": 0,
-            "configs_with_notes": 0,
-            "configs_with_screenshots": 0,
-            "percent_tested": 0,
-            "percent_improved": 0
-        }
+    if counts is None:
+        counts = count_statuses({})
     
-    total_configs = len(data)
-    configs_tested = sum(1 for config_id in data if 'tested' in data[config_id] and data[config_id]['tested'])
-    configs_improved = sum(1 for config_id in data if 'improved' in data[config_id] and data[config_id]['improved'])
-    configs_with_notes = sum(1 for config_id in data if 'note' in data[config_id] and data[config_id]['note'])
-    configs_with_screenshots = sum(1 for config_id in data if 'screenshots' in data[config_id] and data[config_id]['screenshots'])
+    total_configs = counts["total"]
+    configs_tested = counts["tested"]
+    configs_improved = counts["improved"]
     
     return {
         "total_configs": total_configs,
         "configs_tested": configs_tested,
         "configs_improved": configs_improved,
-        "configs_with_notes": configs_with_notes,
-        "configs_with_screenshots": configs_with_screenshots,
+        "configs_with_notes": counts["with_notes"],
+        "configs_with_screenshots": counts["with_screenshots"],
         "percent_tested": round(configs_tested / max(1, total_configs) * 100, 1),
         "percent_improved": round(configs_improved / max(1, total_configs) * 100, 1)
     }
@@ -0,0 +1,67 @@
+"""
+Process-wide screenshot image cache for the Trading Dashboard Pro application.
+Keeps the display-ready bytes of recently shown screenshots (thumbnail,
+preview or original) in memory, shared by every Streamlit session, so
+switching between configurations does not read, decode and reduce the same
+images on every rerun. Entries are keyed by content hash, so they never go
+stale; saving or deleting a screenshot drops its entries to free the memory.
+"""
+from config.settings import IMAGE_CACHE_MAX_BYTES, THUMBNAIL_SIZES
+from utils.lru import ByteBudgetLRU
+
+_cache = ByteBudgetLRU(IMAGE_CACHE_MAX_BYTES)
+
+# Variantes d'une image: miniatures de THUMBNAIL_SIZES, None pour l'original
+IMAGE_VARIANTS = tuple(THUMBNAIL_SIZES) + (None,)
+
+
+def get_cached_image(content_hash, variant=None):
+    """
+    Get cached display-ready image bytes
+
+    Args:
+        content_hash (str): Hash of the original image content
+        variant (str, optional): Size in THUMBNAIL_SIZES, None for the original
+
+    Returns:
+        bytes: Cached image, or None on a miss
+    """
+    return _cache.get((content_hash, variant))
+
+
+def put_cached_image(content_hash, variant, content):
+    """
+    Cache display-ready image bytes
+
+    Args:
+        content_hash (str): Hash of the original image content
+        variant (str): Size in THUMBNAIL_SIZES, None for the original
+        content (bytes): Image to cache
+    """
+    _cache.put((content_hash, variant), content, len(content))
+
+
+def invalidate_cached_images(content_hash):
+    """
+    Drop every cached variant of an image
+
+    Args:
+        content_hash (str): Hash of the original image content
+    """
+    for variant in IMAGE_VARIANTS:
+        _cache.pop((content_hash, variant))
+
+
+def clear_image_cache():
+    """Drop every cached image"""
+    _cache.clear()
+
+
+def get_image_cache_stats():
+    """
+    Get the image cache counters
+
+    Returns:
+        dict: Hits, misses, evictions, invalidations, entries and bytes
+    """
+    return _cache.stats()
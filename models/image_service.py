@@ -0,0 +1,171 @@
+"""
+Background image processing for the Trading Dashboard Pro application.
+Uploaded screenshots are encoded (models.imaging) and reduced
+(models.thumbnails) in a pool of IMAGE_WORKERS processes, so large images
+neither freeze the Streamlit script thread nor make concurrent users wait on
+each other for the GIL. submit_upload returns a future that is resolved once
+the encoded image and its derivatives are in the blob store; the view then
+attaches the image to the profile with save_screenshot.
+"""
+import sys
+import time
+import types
+import threading
+import multiprocessing
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config.settings import IMAGE_WORKERS
+from models.blobs import put_blob
+from models.imaging import encode_screenshot
+from models.thumbnails import make_derivatives, store_derivatives
+
+# Nombre de traitements récents retenus pour la latence
+LATENCY_WINDOW = 100
+
+_executor = None
+_lock = threading.Lock()
+
+# Traitements soumis et pas encore terminés
+_pending = 0
+
+# Durées (secondes) entre soumission et image prête, des derniers traitements
+_latencies = deque(maxlen=LATENCY_WINDOW)
+
+# Compteurs d'activité
+_stats = {"submitted": 0, "completed": 0, "failed": 0}
+
+
+def process_upload(payload):
+    """
+    Encode an uploaded image and make its derivatives (run in a worker process)
+
+    Args:
+        payload (bytes): Uploaded file content
+
+    Returns:
+        tuple: (encoded image bytes, {variant: WebP bytes})
+    """
+    image_bytes, _ = encode_screenshot(payload)
+    return image_bytes, make_derivatives(image_bytes)
+
+
+def _get_executor():
+    """Get the worker pool, started on first use (lock held)"""
+    global _executor
+    if _executor is None:
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            # forkserver: pas de fork d'un processus qui a des threads (écriture
+            # différée, surveillance de la configuration)
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload([__name__])
+            _executor = ProcessPoolExecutor(max_workers=IMAGE_WORKERS, mp_context=context)
+        else:
+            # Windows (spawn seulement): Pillow libère le GIL pendant l'essentiel
+            # du traitement, des threads gardent la page réactive
+            _executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image-service")
+    return _executor
+
+
+@contextmanager
+def _script_main_hidden():
+    """
+    Hide the running Streamlit script while worker processes start
+
+    Streamlit installs the script as the __main__ module; multiprocessing
+    would run it again in every new worker process.
+    """
+    main = sys.modules.get("__main__")
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+def _finish(result, submitted_at, job):
+    """Store the processed image, record the counters and resolve the caller's future"""
+    global _pending, _executor
+    error = job.exception()
+    if error is None:
+        try:
+            image_bytes, derivatives = job.result()
+            store_derivatives(put_blob(image_bytes), derivatives)
+        except Exception as e:
+            error = e
+
+    with _lock:
+        _pending -= 1
+        _latencies.append(time.monotonic() - submitted_at)
+        _stats["failed" if error else "completed"] += 1
+        if isinstance(error, BrokenProcessPool) and _executor is not None:
+            # Processus tué (mémoire...): nouveau pool à la prochaine soumission
+            _executor.shutdown(wait=False)
+            _executor = None
+
+    if error:
+        print(f"ERROR processing uploaded image: {error}")
+        result.set_exception(error)
+    else:
+        result.set_result(image_bytes)
+
+
+def submit_upload(payload):
+    """
+    Process an uploaded image in the background
+
+    Args:
+        payload (bytes): Uploaded file content
+
+    Returns:
+        concurrent.futures.Future: Resolved with the encoded image bytes,
+            already stored with its derivatives, or with the processing error
+    """
+    global _pending, _executor
+    result = Future()
+    submitted_at = time.monotonic()
+    # Les processus sont démarrés à la demande, lors des soumissions
+    with _lock, _script_main_hidden():
+        try:
+            job = _get_executor().submit(process_upload, payload)
+        except BrokenProcessPool:
+            _executor = None
+            job = _get_executor().submit(process_upload, payload)
+        _pending += 1
+        _stats["submitted"] += 1
+    job.add_done_callback(lambda job: _finish(result, submitted_at, job))
+    return result
+
+
+def get_image_service_stats():
+    """
+    Get the image processing counters
+
+    Returns:
+        dict: Submitted, completed and failed uploads, the queue depth
+            (uploads not processed yet), the number of worker processes, and
+            the mean and 95th percentile latency (milliseconds, from
+            submission to stored image) of the recent uploads
+    """
+    with _lock:
+        latencies = sorted(_latencies)
+        stats = dict(_stats, queue_depth=_pending, workers=IMAGE_WORKERS)
+    stats["latency_avg_ms"] = sum(latencies) / len(latencies) * 1000 if latencies else None
+    stats["latency_p95_ms"] = latencies[int(0.95 * (len(latencies) - 1))] * 1000 if latencies else None
+    return stats
+
+
+def shutdown_image_service(wait=True):
+    """
+    Stop the worker processes; they are started again on the next upload
+
+    Args:
+        wait (bool, optional): Wait for the uploads in progress. Default is True.
+    """
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
@@ -0,0 +1,133 @@
+"""
+Screenshot encoding for the Trading Dashboard Pro application.
+Uploaded images are re-encoded following SCREENSHOT_ENCODING instead of
+always as PNG. They are downscaled past a maximum size and stripped of their
+metadata. Graphics such as charts are stored losslessly (WebP or optimized
+PNG). Photographic images, and sources that were already JPEG, are stored as
+JPEG. Every result is kept under a byte budget.
+"""
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+from config.settings import SCREENSHOT_ENCODING
+
+# Formats sources déjà avec perte: un réencodage sans perte ne ferait que grossir
+LOSSY_SOURCE_FORMATS = ("JPEG", "MPO")
+
+# Qualité JPEG diminuée par pas de JPEG_QUALITY_STEP pour tenir le budget
+JPEG_QUALITY_STEP = 10
+
+# Côté le plus long en dessous duquel une image n'est plus réduite pour le budget
+MIN_BUDGET_DIMENSION = 480
+
+# Côté de l'échantillon utilisé pour compter les couleurs
+COLOR_SAMPLE_SIZE = 512
+
+
+def is_graphic(image, max_colors):
+    """
+    Check if an image is a graphic (chart, text, interface) rather than a photo
+
+    Args:
+        image (PIL.Image.Image): RGB or RGBA image
+        max_colors (int): Maximum number of distinct colors of a graphic
+
+    Returns:
+        bool: True if the image has at most max_colors colors
+    """
+    sample = image
+    if max(image.size) > COLOR_SAMPLE_SIZE:
+        # Échantillonnage au plus proche voisin: aucune couleur intermédiaire créée
+        ratio = COLOR_SAMPLE_SIZE / max(image.size)
+        sample = image.resize((max(1, int(image.width * ratio)), max(1, int(image.height * ratio))),
+                              Image.NEAREST)
+    return sample.getcolors(max_colors) is not None
+
+
+def encode_image(image, image_format, quality=None):
+    """
+    Encode an image without any metadata
+
+    Args:
+        image (PIL.Image.Image): RGB or RGBA image
+        image_format (str): "WEBP" (lossless), "PNG" (optimized) or "JPEG"
+        quality (int, optional): JPEG quality. Required for JPEG.
+
+    Returns:
+        bytes: Encoded image
+    """
+    buffered = BytesIO()
+    if image_format == "JPEG":
+        if image.mode == "RGBA":
+            # Pas de transparence en JPEG: fond blanc
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        image.save(buffered, format="JPEG", quality=quality, optimize=True, progressive=True)
+    elif image_format == "WEBP":
+        image.save(buffered, format="WEBP", lossless=True, quality=80, method=4)
+    else:
+        image.save(buffered, format="PNG", optimize=True)
+    return buffered.getvalue()
+
+
+def _encode_within_budget(image, policy, lossless):
+    """Encode with the first candidate fitting the budget, else the smallest; returns (bytes, format)"""
+    candidates = [(policy["lossless_format"], None)] if lossless else []
+    quality = policy["jpeg_quality"]
+    while quality > policy["jpeg_min_quality"]:
+        candidates.append(("JPEG", quality))
+        quality -= JPEG_QUALITY_STEP
+    candidates.append(("JPEG", policy["jpeg_min_quality"]))
+
+    smallest = None
+    for image_format, quality in candidates:
+        payload = encode_image(image, image_format, quality)
+        if len(payload) <= policy["max_bytes"]:
+            return payload, image_format
+        if smallest is None or len(payload) < len(smallest[0]):
+            smallest = (payload, image_format)
+    return smallest
+
+
+def encode_screenshot(source, policy=None):
+    """
+    Encode an uploaded screenshot following the encoding policy
+
+    Args:
+        source: Image file object, or raw image bytes
+        policy (dict, optional): Overrides of SCREENSHOT_ENCODING entries
+
+    Returns:
+        tuple: (encoded bytes, format name)
+
+    Raises:
+        OSError: If the source is not a readable image
+    """
+    policy = dict(SCREENSHOT_ENCODING, **(policy or {}))
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+
+    with Image.open(source) as opened:
+        source_format = opened.format
+        # Orientation EXIF appliquée aux pixels, car les métadonnées sont retirées
+        image = ImageOps.exif_transpose(opened)
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    max_dimension = policy["max_dimension"]
+    if max(image.size) > max_dimension:
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+    lossless = (source_format not in LOSSY_SOURCE_FORMATS
+                and is_graphic(image, policy["graphic_max_colors"]))
+    while True:
+        payload, image_format = _encode_within_budget(image, policy, lossless)
+        if len(payload) <= policy["max_bytes"] or max(image.size) <= MIN_BUDGET_DIMENSION:
+            break
+        # Budget dépassé même à la qualité minimale: réduction de l'image
+        image = image.resize((max(1, image.width * 3 // 4), max(1, image.height * 3 // 4)), Image.LANCZOS)
+    if len(payload) > policy["max_bytes"]:
+        print(f"WARNING: Screenshot exceeds the byte budget ({len(payload)} > {policy['max_bytes']} bytes)")
+    return payload, image_format
@@ -0,0 +1,260 @@
+"""
+Typed strategy parameters for the Trading Dashboard Pro application.
+Parameters are stored as text; this module parses them according to
+PARAM_SCHEMA, column by column, into NumPy arrays so their distribution
+across all profiles is analysed with array operations.
+"""
+import numpy as np
+import pandas as pd
+
+from config.settings import PARAM_SCHEMA
+from models.data import load_profile_data
+from models.profile_stats import iter_profile_stats
+from models.status_index import split_config_id
+
+# Types dont la distribution a un sens (percentiles, histogrammes)
+NUMERIC_KINDS = ("float", "int")
+
+_TRUE_VALUES = ["yes", "true", "1", "oui"]
+_FALSE_VALUES = ["no", "false", "0", "non"]
+
+# Valeur de chaque caractère hexadécimal, -1 pour les autres (index 128: hors ASCII)
+_HEX_DIGITS = np.full(129, -1, dtype=np.int64)
+for _i, _c in enumerate("0123456789abcdef"):
+    _HEX_DIGITS[ord(_c)] = _HEX_DIGITS[ord(_c.upper())] = _i
+_HEX_WEIGHTS = 16 ** np.arange(5, -1, -1, dtype=np.int64)
+
+
+def parse_param_column(kind, values):
+    """
+    Parse the text values of one parameter
+
+    Args:
+        kind (str): Parameter type from PARAM_SCHEMA
+        values (list): Text values
+
+    Returns:
+        numpy.ndarray: float64 array, NaN where a value does not match the
+            type. Colors are 0xRRGGBB integers, booleans 1.0 / 0.0.
+    """
+    values = np.char.strip(np.asarray(values, dtype=str).reshape(-1))
+    if kind in NUMERIC_KINDS:
+        numbers = pd.to_numeric(
+            pd.Series(values, dtype=object).str.replace(",", ".", regex=False), errors="coerce"
+        ).to_numpy(dtype=np.float64, copy=True)
+        if kind == "int":
+            numbers[numbers != np.round(numbers)] = np.nan
+        return numbers
+
+    parsed = np.full(len(values), np.nan)
+    if kind == "bool":
+        lowered = np.char.lower(values)
+        parsed[np.isin(lowered, _TRUE_VALUES)] = 1.0
+        parsed[np.isin(lowered, _FALSE_VALUES)] = 0.0
+    elif kind == "color":
+        digits_text = np.char.lstrip(values, "#")
+        codes = digits_text.astype("U6").view(np.uint32).reshape(len(values), 6)
+        digits = _HEX_DIGITS[np.minimum(codes, 128)]
+        valid = (np.char.str_len(digits_text) == 6) & (digits >= 0).all(axis=1)
+        parsed[valid] = digits[valid] @ _HEX_WEIGHTS
+    else:
+        raise ValueError(f"Unknown parameter type: {kind}")
+    return parsed
+
+
+def parse_param(name, value):
+    """
+    Parse one parameter value according to PARAM_SCHEMA
+
+    Args:
+        name (str): Parameter name
+        value (str): Text value
+
+    Returns:
+        float: Parsed value, or None if it does not match the type
+    """
+    parsed = parse_param_column(PARAM_SCHEMA[name], [value])[0]
+    return None if np.isnan(parsed) else float(parsed)
+
+
+def invalid_params(params):
+    """
+    List the parameters whose value does not match their type
+
+    Args:
+        params (dict): Parameters of a configuration
+
+    Returns:
+        list: Names of the invalid parameters, in PARAM_SCHEMA order
+    """
+    return [
+        name for name in PARAM_SCHEMA
+        if name in params and parse_param(name, params[name]) is None
+    ]
+
+
+class ParamTable:
+    """
+    Parameters of many configurations, one NumPy column per parameter
+
+    Attributes:
+        profiles (numpy.ndarray): Profile name of each row
+        assets (numpy.ndarray): Asset of each row
+        timeframes (numpy.ndarray): Timeframe of each row
+        columns (dict): {parameter name: float64 array, NaN if missing or invalid}
+        errors (dict): {profile name: error message} for unread profiles
+    """
+
+    def __init__(self, profiles, assets, timeframes, columns, errors=None):
+        self.profiles = profiles
+        self.assets = assets
+        self.timeframes = timeframes
+        self.columns = columns
+        self.errors = errors or {}
+
+    def __len__(self):
+        return len(self.profiles)
+
+    @classmethod
+    def from_rows(cls, rows, errors=None):
+        """
+        Build the table from configuration rows
+
+        Args:
+            rows (list): (profile name, asset, timeframe, params dict) tuples
+            errors (dict, optional): Profiles that could not be read
+
+        Returns:
+            ParamTable: Table with one parsed column per PARAM_SCHEMA entry
+        """
+        text = {name: [params.get(name, "") for _, _, _, params in rows] for name in PARAM_SCHEMA}
+        return cls(
+            np.array([row[0] for row in rows], dtype=object),
+            np.array([row[1] for row in rows], dtype=object),
+            np.array([row[2] for row in rows], dtype=object),
+            {name: parse_param_column(kind, text[name]) for name, kind in PARAM_SCHEMA.items()},
+            errors
+        )
+
+    @classmethod
+    def build(cls, profile_names, **options):
+        """
+        Build the table of every configuration with parameters, reading the
+        profiles concurrently
+
+        Args:
+            profile_names (list): Names of the profiles
+            **options: Pool options, see iter_profile_stats
+
+        Returns:
+            ParamTable: Table of all the profiles
+        """
+        def profile_rows(profile_name):
+            rows = []
+            for config_id, record in load_profile_data(profile_name, cache=False).items():
+                cell = split_config_id(config_id)
+                params = record.get('params') if hasattr(record, 'get') else None
+                if cell and isinstance(params, dict):
+                    rows.append((profile_name, cell[0], cell[1], params))
+            return rows
+
+        rows = []
+        errors = {}
+        for profile_name, found, error in iter_profile_stats(
+                profile_names, stats_func=profile_rows, **options):
+            if error:
+                errors[profile_name] = error
+            else:
+                rows.extend(found)
+        return cls.from_rows(rows, errors)
+
+    def frame(self, name):
+        """
+        Get one parameter with its row labels
+
+        Args:
+            name (str): Parameter name
+
+        Returns:
+            pandas.DataFrame: Columns profile, asset, timeframe and value,
+                without the rows where the value is missing or invalid
+        """
+        values = self.columns[name]
+        valid = ~np.isnan(values)
+        return pd.DataFrame({
+            "profile": self.profiles[valid],
+            "asset": self.assets[valid],
+            "timeframe": self.timeframes[valid],
+            "value": values[valid]
+        })
+
+
+def param_percentiles(table, name, percentiles=(5, 25, 50, 75, 95)):
+    """
+    Compute the percentiles of a parameter per asset and timeframe
+
+    Args:
+        table (ParamTable): Parameter table
+        name (str): Parameter name
+        percentiles (tuple, optional): Percentiles to compute
+
+    Returns:
+        pandas.DataFrame: One row per (asset, timeframe), with a count
+            column and one column per percentile
+    """
+    quantiles = [p / 100 for p in percentiles]
+    grouped = table.frame(name).groupby(["asset", "timeframe"])["value"]
+    result = grouped.quantile(quantiles).unstack().reindex(columns=quantiles)
+    result.columns = [f"p{p}" for p in percentiles]
+    result.insert(0, "count", grouped.size())
+    return result
+
+
+def param_histogram(table, name, bins=20, asset=None, timeframe=None):
+    """
+    Compute the histogram of a parameter
+
+    Args:
+        table (ParamTable): Parameter table
+        name (str): Parameter name
+        bins (int, optional): Number of bins
+        asset (str, optional): Only count this asset
+        timeframe (str, optional): Only count this timeframe
+
+    Returns:
+        tuple: (counts, bin edges) as returned by numpy.histogram
+    """
+    values = table.columns[name]
+    keep = ~np.isnan(values)
+    if asset is not None:
+        keep &= table.assets == asset
+    if timeframe is not None:
+        keep &= table.timeframes == timeframe
+    return np.histogram(values[keep], bins=bins)
+
+
+def param_outliers(table, name, k=1.5, min_count=4):
+    """
+    Find the unusual values of a parameter within each asset and timeframe
+
+    A value is an outlier when it lies more than k interquartile ranges
+    outside the quartiles of its (asset, timeframe) group.
+
+    Args:
+        table (ParamTable): Parameter table
+        name (str): Parameter name
+        k (float, optional): Width of the fences, in interquartile ranges
+        min_count (int, optional): Smallest group size considered
+
+    Returns:
+        pandas.DataFrame: Outlier rows with profile, asset, timeframe, value,
+            and the low and high fences of their group
+    """
+    frame = table.frame(name)
+    grouped = frame.groupby(["asset", "timeframe"])["value"]
+    q1 = grouped.transform("quantile", 0.25)
+    q3 = grouped.transform("quantile", 0.75)
+    frame["low"] = q1 - k * (q3 - q1)
+    frame["high"] = q3 + k * (q3 - q1)
+    outside = (frame["value"] < frame["low"]) | (frame["value"] > frame["high"])
+    return frame[outside & (grouped.transform("size") >= min_count)].reset_index(drop=True)
@@ -0,0 +1,93 @@
+"""
+Process-wide profile cache for the Trading Dashboard Pro application.
+Keeps the last persisted state of recently used profiles in memory, shared by
+every Streamlit session and validated against a storage version token (file
+mtime/size for JSON profiles, revision number for SQLite).
+"""
+from config.settings import PROFILE_CACHE_MAX_BYTES
+from utils.lru import ByteBudgetLRU
+
+_cache = ByteBudgetLRU(PROFILE_CACHE_MAX_BYTES)
+
+
+def estimate_profile_size(data):
+    """
+    Estimate the memory used by profile data
+
+    Args:
+        data (dict): Profile data
+
+    Returns:
+        int: Approximate size in bytes
+    """
+    size = 0
+    for key, value in data.items():
+        size += 100 + len(key)
+        if isinstance(value, dict):
+            for field, field_value in value.items():
+                size += 50 + len(field)
+                if isinstance(field_value, str):
+                    size += len(field_value)
+                elif isinstance(field_value, (dict, list)):
+                    size += 200 * len(field_value)
+        elif isinstance(value, list):
+            size += 60 * len(value)
+    return size
+
+
+def get_cached_profile(profile_name, token, touch=True):
+    """
+    Get the cached state of a profile if it is still current
+
+    The returned object is shared: callers must copy it before handing it
+    to a session, and only modify it under the profile storage lock.
+
+    Args:
+        profile_name (str): Name of the profile
+        token: Current storage version token of the profile
+        touch (bool, optional): Mark the profile as recently used. Default
+            is True; bulk readers pass False so they do not keep profiles
+            of no active session in the cache.
+
+    Returns:
+        dict: Cached profile data, or None on a miss
+    """
+    entry = _cache.get(profile_name, validate=lambda cached: cached[0] == token, touch=touch)
+    return entry[1] if entry is not None else None
+
+
+def put_cached_profile(profile_name, token, data):
+    """
+    Cache the persisted state of a profile
+
+    Args:
+        profile_name (str): Name of the profile
+        token: Storage version token matching data
+        data (dict): Profile data, owned by the cache from now on
+    """
+    _cache.put(profile_name, (token, data), estimate_profile_size(data))
+
+
+def invalidate_cached_profile(profile_name):
+    """
+    Drop a profile from the cache
+
+    Args:
+        profile_name (str): Name of the profile
+    """
+    _cache.pop(profile_name)
+
+
+def clear_profile_cache():
+    """Drop every cached profile"""
+    _cache.clear()
+
+
+def get_profile_cache_stats():
+    """
+    Get the profile cache counters
+
+    Returns:
+        dict: Hits, misses, evictions, invalidations, entries and bytes
+    """
+    return _cache.stats()
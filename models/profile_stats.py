@@ -0,0 +1,122 @@
+"""
+Cross-profile statistics for the Trading Dashboard Pro application.
+Computes the statistics of many profiles concurrently on a bounded set of
+worker threads, yielding each result as soon as it is ready, with a
+per-profile timeout so a single slow or corrupt profile cannot stall the
+admin pages: the thread of a profile that times out is abandoned and
+replaced, so the remaining profiles keep max_workers threads.
+"""
+import time
+import queue
+import threading
+from collections import deque
+
+from config.settings import STATS_MAX_WORKERS, STATS_PROFILE_TIMEOUT
+from models.data import get_profile_stats
+
+
+def iter_profile_stats(profile_names, max_workers=STATS_MAX_WORKERS, timeout=STATS_PROFILE_TIMEOUT,
+                       stats_func=get_profile_stats):
+    """
+    Compute the statistics of several profiles concurrently
+
+    The timeout of a profile runs from the moment its computation starts,
+    not from its submission, so a long queue does not count against it.
+    A thread cannot be interrupted: when a profile times out its thread is
+    left to finish on its own, its result is ignored, and a new thread takes
+    over the queue.
+
+    Args:
+        profile_names (list): Names of the profiles
+        max_workers (int, optional): Number of worker threads
+        timeout (float, optional): Maximum time (seconds) per profile
+        stats_func (callable, optional): Statistics of one profile. Default
+            is get_profile_stats.
+
+    Yields:
+        tuple: (profile name, statistics dict or None, error message or None),
+            in completion order
+    """
+    queued = deque(dict.fromkeys(profile_names))
+    remaining = len(queued)
+    results = queue.Queue()
+    started = {}  # {profil: début du calcul}
+    completed = set()  # Profils calculés, résultat dans results
+    abandoned = set()  # Profils ayant dépassé le délai
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            try:
+                profile_name = queued.popleft()
+            except IndexError:
+                return
+            started[profile_name] = time.monotonic()
+            try:
+                result = (profile_name, stats_func(profile_name), None)
+            except Exception as e:
+                result = (profile_name, None, e)
+            with lock:
+                if profile_name in abandoned:
+                    # Remplacé par un autre thread pendant le calcul
+                    return
+                completed.add(profile_name)
+                results.put(result)
+
+    def start_worker():
+        threading.Thread(target=worker, name="profile-stats", daemon=True).start()
+
+    for _ in range(min(max_workers, remaining)):
+        start_worker()
+
+    try:
+        while remaining:
+            now = time.monotonic()
+            running = [(name, at) for name, at in list(started.items())
+                       if name not in completed and name not in abandoned]
+            wait_for = max(0.0, min(at for _, at in running) + timeout - now) if running else timeout
+            try:
+                profile_name, stats, error = results.get(timeout=wait_for)
+            except queue.Empty:
+                pass
+            else:
+                remaining -= 1
+                if error is None:
+                    yield profile_name, stats, None
+                else:
+                    print(f"ERROR computing stats for profile '{profile_name}': {error}")
+                    yield profile_name, None, str(error)
+
+            now = time.monotonic()
+            for profile_name, at in running:
+                if now - at < timeout:
+                    continue
+                with lock:
+                    if profile_name in completed:
+                        continue
+                    abandoned.add(profile_name)
+                remaining -= 1
+                print(f"WARNING: Stats for profile '{profile_name}' timed out after {timeout}s")
+                yield profile_name, None, f"Délai dépassé ({timeout:g} s)"
+                if queued:
+                    start_worker()
+    finally:
+        # Arrêt anticipé: les threads s'arrêtent après leur profil en cours
+        queued.clear()
+
+
+def collect_profile_stats(profile_names, **options):
+    """
+    Compute the statistics of several profiles concurrently, all at once
+
+    Args:
+        profile_names (list): Names of the profiles
+        **options: See iter_profile_stats
+
+    Returns:
+        dict: {profile name: statistics dict, or None if it failed or timed out}
+    """
+    results = dict.fromkeys(profile_names)
+    for profile_name, stats, _ in iter_profile_stats(profile_names, **options):
+        results[profile_name] = stats
+    return results
@@ -0,0 +1,219 @@
+"""
+Bulk profile provisioning for the Trading Dashboard Pro application.
+Creates many profiles (a whole class) from a CSV file: every row is
+validated first, the profile files are written in parallel, then the
+catalog and the profiles list of CONFIG_FILE are each updated with a
+single atomic write (python -m models.provisioning students.csv).
+
+CSV columns (',', ';' or tab separated, first row is the header):
+    name                  Profile name (required)
+    asset, timeframe      Configuration to seed (optional)
+    <parameter name>      Seed value of a DEFAULT_PARAMS parameter (optional)
+A profile may span several rows, one per seeded configuration.
+"""
+import io
+import os
+import csv
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from config.settings import ASSET_CATEGORIES, DEFAULT_PARAMS, TIMEFRAMES, STATS_MAX_WORKERS
+from models.auth import validate_profile_name, add_profiles_to_config, setup_config
+from models.catalog import update_catalog_entries
+from models.params import invalid_params
+from models.sharding import normalize_profile_name
+from models.storage import init_profile, read_profile_stats, get_profile_size, list_stored_profiles
+
+NAME_COLUMN = "name"
+SEED_COLUMNS = ("asset", "timeframe")
+
+
+def parse_provisioning_csv(source):
+    """
+    Read and validate a provisioning CSV
+
+    Args:
+        source: Text or binary file object, or CSV text
+
+    Returns:
+        tuple: (profiles, errors) where profiles is {profile name: initial
+            profile data} in file order and errors a list of
+            (line number, message) for the rejected rows
+    """
+    if isinstance(source, str):
+        text = source
+    else:
+        text = source.read()
+        if isinstance(text, bytes):
+            text = text.decode("utf-8-sig")
+    text = text.lstrip("\ufeff")
+
+    try:
+        dialect = csv.Sniffer().sniff(text.split("\n", 1)[0], delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(text), dialect=dialect)
+    columns = [column.strip() for column in reader.fieldnames or []]
+    reader.fieldnames = columns
+
+    if NAME_COLUMN not in columns:
+        return {}, [(1, f"Colonne '{NAME_COLUMN}' manquante")]
+    unknown = [c for c in columns if c not in DEFAULT_PARAMS and c not in SEED_COLUMNS + (NAME_COLUMN,)]
+    if unknown:
+        return {}, [(1, f"Colonnes inconnues: {', '.join(unknown)}")]
+
+    catalog = {asset for category in ASSET_CATEGORIES.values() for asset in category["assets"]}
+    profiles = {}
+    canonical = {}
+    rejected = set()
+    errors = []
+    for line, row in enumerate(reader, start=2):
+        row = {column: (value or "").strip() for column, value in row.items() if column}
+        if not any(row.values()):
+            continue
+        name = row.get(NAME_COLUMN, "")
+        error = validate_profile_name(name)
+        # Noms équivalents après normalisation: mêmes fichiers
+        key = normalize_profile_name(name)
+        if error is None and canonical.setdefault(key, name) != name:
+            error = f"Doublon de '{canonical[key]}'"
+        if error is None:
+            error = _seed_config(profiles.setdefault(name, {}), row, catalog)
+        if error:
+            errors.append((line, f"{name or '?'}: {error}"))
+            rejected.add(name)
+    # Un profil dont une ligne est rejetée n'est pas créé du tout
+    return {name: data for name, data in profiles.items() if name not in rejected}, errors
+
+
+def _seed_config(data, row, catalog):
+    """Add the configuration seeded by a CSV row to profile data; returns an error or None"""
+    asset, timeframe = row.get("asset", ""), row.get("timeframe", "")
+    params = {name: value for name, value in row.items() if name in DEFAULT_PARAMS and value}
+    if not (asset or timeframe or params):
+        return None
+    if not (asset and timeframe):
+        return "Actif et unité de temps requis pour initialiser une configuration"
+    if timeframe not in TIMEFRAMES:
+        return f"Unité de temps inconnue: {timeframe}"
+    invalid = invalid_params(params)
+    if invalid:
+        return f"Valeurs non conformes au type attendu: {', '.join(invalid)}"
+
+    config_id = f"{asset}_{timeframe}"
+    config = data.setdefault(config_id, {"params": dict(DEFAULT_PARAMS)})
+    config["params"].update(params)
+    config["last_modified"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if asset not in catalog and asset not in data.setdefault("_custom_assets", []):
+        data["_custom_assets"].append(asset)
+    return None
+
+
+def _create_profile_files(profile_name, data):
+    """Write the storage of one new profile; returns its catalog entry"""
+    init_profile(profile_name, data, update_catalog=False, overwrite=False)
+    counts = read_profile_stats(profile_name)
+    return {
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "last_login": None,
+        "is_super_admin": False,
+        "size": get_profile_size(profile_name),
+        "configs": counts["total"] if counts else 0,
+    }
+
+
+def provision_profiles(profiles, max_workers=STATS_MAX_WORKERS):
+    """
+    Create many profiles at once
+
+    Profiles already listed in the configuration or already stored are
+    skipped; existing profile files are never overwritten. The files are
+    written in parallel; the catalog and CONFIG_FILE are then updated once
+    each, listing only the profiles whose files were written.
+
+    Args:
+        profiles (dict): {profile name: initial profile data}, as returned
+            by parse_provisioning_csv
+        max_workers (int, optional): Number of profiles written concurrently
+
+    Returns:
+        dict: Names of created and skipped profiles, (name, error message)
+            of the failed ones, and the updated app configuration
+            ("app_config")
+    """
+    existing = {normalize_profile_name(name)
+                for name in list(setup_config().get("profiles", [])) + list_stored_profiles()}
+    report = {"created": [], "skipped": [], "failed": [], "app_config": None}
+    todo = {}
+    for profile_name, data in profiles.items():
+        if normalize_profile_name(profile_name) in existing:
+            report["skipped"].append(profile_name)
+        else:
+            todo[profile_name] = data
+
+    entries = {}
+    if todo:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="provisioning") as pool:
+            futures = {name: pool.submit(_create_profile_files, name, data) for name, data in todo.items()}
+            for profile_name, future in futures.items():
+                try:
+                    entries[profile_name] = future.result()
+                    report["created"].append(profile_name)
+                except FileExistsError:
+                    # Créé entre-temps par ailleurs: ses données sont conservées
+                    report["failed"].append((profile_name, "Le profil existe déjà"))
+                except Exception as e:
+                    report["failed"].append((profile_name, str(e)))
+
+        update_catalog_entries(entries)
+    report["app_config"] = add_profiles_to_config(report["created"])
+    print(f"Provisioned {len(report['created'])} profiles "
+          f"({len(report['skipped'])} skipped, {len(report['failed'])} failed)")
+    return report
+
+
+def provision_from_csv(source, max_workers=STATS_MAX_WORKERS, dry_run=False):
+    """
+    Validate a provisioning CSV and create its profiles
+
+    Args:
+        source: CSV file object or text, see parse_provisioning_csv
+        max_workers (int, optional): Number of profiles written concurrently
+        dry_run (bool, optional): Only validate, create nothing
+
+    Returns:
+        dict: Report of provision_profiles (empty lists for a dry run), with
+            the rejected rows under "errors"
+    """
+    profiles, errors = parse_provisioning_csv(source)
+    if dry_run:
+        report = {"created": [], "skipped": [], "failed": [], "app_config": None}
+    else:
+        report = provision_profiles(profiles, max_workers=max_workers)
+    report["errors"] = errors
+    report["valid"] = list(profiles)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Crée des profils en masse à partir d'un fichier CSV (colonne 'name', "
+                    "colonnes 'asset', 'timeframe' et paramètres facultatives)."
+    )
+    parser.add_argument("csv_file", help="fichier CSV des profils")
+    parser.add_argument("--workers", type=int, default=STATS_MAX_WORKERS,
+                        help="nombre de profils écrits en parallèle")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="valider le fichier sans rien créer")
+    args = parser.parse_args()
+
+    with open(args.csv_file, 'rb') as f:
+        result = provision_from_csv(f, max_workers=args.workers, dry_run=args.dry_run)
+    for line, message in result["errors"]:
+        print(f"Ligne {line}: {message}")
+    for profile_name, message in result["failed"]:
+        print(f"Échec de création de '{profile_name}': {message}")
+    print(f"Valides: {len(result['valid'])}, créés: {len(result['created'])}, "
+          f"ignorés: {len(result['skipped'])}, échecs: {len(result['failed'])}, "
+          f"lignes rejetées: {len(result['errors'])} ({os.path.abspath(args.csv_file)})")
@@ -0,0 +1,209 @@
+"""
+Sharded profile layout for the Trading Dashboard Pro application.
+Profile files are stored as PROFILES_DIR/<ab>/<cd>/<encoded name>.json,
+where ab/cd are the first hex digits of the SHA-256 of the normalized
+profile name, so no directory grows past a few hundred entries however many
+users there are. Names are encoded into safe, reversible file names, so no
+name can escape the directory or collide with another one. The files of the
+former flat layout (PROFILES_DIR/<name>.json) are moved over, in parallel,
+by migrate_flat_profiles (python -m models.sharding).
+"""
+import os
+import argparse
+import hashlib
+import string
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import unquote
+
+# Caractères conservés tels quels dans les noms de fichiers: minuscules
+# seulement, pour rester distincts sur les systèmes insensibles à la casse
+_SAFE_CHARS = frozenset(string.ascii_lowercase + string.digits + "_-")
+
+_HEX_CHARS = frozenset(string.hexdigits.lower())
+
+# Fichiers d'un profil, déplacés ensemble lors de la migration (le fichier
+# de verrou ne l'est pas: il est tenu pendant le déplacement)
+PROFILE_FILE_SUFFIXES = (".json", ".journal", ".journal.compacting", ".stats")
+
+
+def normalize_profile_name(profile_name):
+    """
+    Get the canonical form of a profile name
+
+    Args:
+        profile_name (str): Name of the profile
+
+    Returns:
+        str: NFC-normalized name, so visually identical names share their files
+    """
+    return unicodedata.normalize("NFC", profile_name)
+
+
+def encode_profile_name(profile_name):
+    """
+    Encode a profile name into a safe file name stem
+
+    Args:
+        profile_name (str): Name of the profile
+
+    Returns:
+        str: Stem made of lowercase letters, digits, '_' and '-', other
+            characters as %XX UTF-8 escapes
+    """
+    return "".join(
+        char if char in _SAFE_CHARS else "".join(f"%{byte:02X}" for byte in char.encode("utf-8"))
+        for char in normalize_profile_name(profile_name)
+    )
+
+
+def decode_profile_name(stem):
+    """
+    Decode a file name stem made by encode_profile_name
+
+    Args:
+        stem (str): File name without extension
+
+    Returns:
+        str: Profile name
+    """
+    return unquote(stem, errors="strict")
+
+
+@lru_cache(maxsize=4096)
+def get_sharded_relpath(profile_name):
+    """
+    Get the path of a profile file relative to PROFILES_DIR
+
+    Args:
+        profile_name (str): Name of the profile
+
+    Returns:
+        str: <ab>/<cd>/<encoded name>.json
+    """
+    digest = hashlib.sha256(normalize_profile_name(profile_name).encode("utf-8")).hexdigest()
+    return os.path.join(digest[:2], digest[2:4], encode_profile_name(profile_name) + ".json")
+
+
+def _is_shard(entry):
+    return entry.is_dir() and len(entry.name) == 2 and set(entry.name) <= _HEX_CHARS
+
+
+def iter_sharded_profiles(profiles_dir):
+    """
+    Find the profiles stored in the sharded layout
+
+    Args:
+        profiles_dir (str): Root profiles directory
+
+    Yields:
+        str: Profile names, in no particular order
+    """
+    if not os.path.isdir(profiles_dir):
+        return
+    with os.scandir(profiles_dir) as level1:
+        shards = [entry.path for entry in level1 if _is_shard(entry)]
+    for shard in shards:
+        with os.scandir(shard) as level2:
+            subshards = [entry.path for entry in level2 if _is_shard(entry)]
+        for subshard in subshards:
+            with os.scandir(subshard) as files:
+                for entry in files:
+                    if entry.name.endswith(".json") and entry.is_file():
+                        try:
+                            yield decode_profile_name(entry.name[:-5])
+                        except UnicodeDecodeError:
+                            print(f"WARNING: Ignoring undecodable profile file: {entry.path}")
+
+
+def list_flat_profiles(profiles_dir):
+    """
+    Find the profiles still stored in the flat layout
+
+    Args:
+        profiles_dir (str): Root profiles directory
+
+    Returns:
+        list: Profile names, sorted
+    """
+    if not os.path.isdir(profiles_dir):
+        return []
+    with os.scandir(profiles_dir) as entries:
+        return sorted(
+            entry.name[:-5] for entry in entries
+            if entry.name.endswith(".json") and entry.is_file()
+        )
+
+
+def _migrate_profile(profile_name, overwrite):
+    """Move the files of one flat profile to its shard; returns the report key"""
+    from models.auth import get_profile_path, get_flat_profile_path
+    from models.storage import get_profile_lock
+    from models.profile_cache import invalidate_cached_profile
+
+    source = os.path.splitext(get_flat_profile_path(profile_name))[0]
+    target = os.path.splitext(get_profile_path(profile_name))[0]
+    with get_profile_lock(profile_name):
+        if os.path.exists(target + ".json") and not overwrite:
+            return "skipped"
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        for suffix in PROFILE_FILE_SUFFIXES:
+            if os.path.exists(source + suffix):
+                # Même système de fichiers: chaque déplacement est atomique
+                os.replace(source + suffix, target + suffix)
+            elif os.path.exists(target + suffix):
+                # Restes d'un profil remplacé (--overwrite)
+                os.remove(target + suffix)
+        if os.path.exists(source + ".lock"):
+            os.remove(source + ".lock")
+        invalidate_cached_profile(profile_name)
+    return "migrated"
+
+
+def migrate_flat_profiles(max_workers=8, overwrite=False):
+    """
+    Move the profiles of the flat layout into their shards, in parallel
+
+    Args:
+        max_workers (int, optional): Number of profiles moved concurrently
+        overwrite (bool, optional): Replace profiles already present in the
+            sharded layout. Default is False (they are skipped).
+
+    Returns:
+        dict: Names of migrated, skipped and failed profiles
+    """
+    from models.auth import get_flat_profile_path
+
+    report = {"migrated": [], "skipped": [], "failed": []}
+    profiles_dir = os.path.dirname(get_flat_profile_path("_"))
+    profile_names = list_flat_profiles(profiles_dir)
+    if not profile_names:
+        return report
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="profile-migration") as pool:
+        futures = {name: pool.submit(_migrate_profile, name, overwrite) for name in profile_names}
+        for profile_name, future in futures.items():
+            try:
+                report[future.result()].append(profile_name)
+            except Exception as e:
+                print(f"ERROR migrating profile '{profile_name}' to the sharded layout: {e}")
+                report["failed"].append(profile_name)
+
+    print(f"Migrated {len(report['migrated'])} profiles to the sharded layout")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Déplace les profils du dossier à plat vers la disposition en sous-dossiers."
+    )
+    parser.add_argument("--workers", type=int, default=8,
+                        help="nombre de profils déplacés en parallèle")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="remplacer les profils déjà présents dans les sous-dossiers")
+    args = parser.parse_args()
+
+    result = migrate_flat_profiles(max_workers=args.workers, overwrite=args.overwrite)
+    print(f"Migrés: {len(result['migrated'])}, ignorés: {len(result['skipped'])}, "
+          f"échecs: {len(result['failed'])}")
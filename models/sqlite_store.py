@@ -0,0 +1,408 @@
+"""
+SQLite storage backend for the Trading Dashboard Pro application.
+Stores the configurations of every profile in a single database in WAL mode,
+one row per configuration, so that toggling a status is a single-row UPDATE
+and profile statistics are an aggregate over an index.
+"""
+import os
+import json
+import sqlite3
+import argparse
+import threading
+
+from config.settings import SQLITE_DB_PATH, PROFILES_DIR
+from models.storage import (
+    copy_profile, as_profile_dict, diff_to_persist, report_conflicts, update_baseline,
+    read_json_profile, get_profile_lock, list_json_profiles
+)
+from models.profile_cache import get_cached_profile, put_cached_profile, invalidate_cached_profile
+
+# Champs de configuration stockés dans leurs propres colonnes
+CONFIG_COLUMNS = ("tested", "improved", "note", "params", "screenshots", "last_modified")
+BOOLEAN_COLUMNS = ("tested", "improved")
+JSON_COLUMNS = ("params", "screenshots")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    name TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL DEFAULT 0,
+    extras TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS configs (
+    profile TEXT NOT NULL,
+    config_id TEXT NOT NULL,
+    tested INTEGER,
+    improved INTEGER,
+    note TEXT,
+    params TEXT,
+    screenshots TEXT,
+    last_modified TEXT,
+    extra TEXT,
+    has_note INTEGER NOT NULL DEFAULT 0,
+    has_screenshots INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (profile, config_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_configs_status
+    ON configs (profile, tested, improved, has_note, has_screenshots);
+"""
+
+# Une connexion par thread (les sessions Streamlit tournent dans des threads distincts)
+_local = threading.local()
+
+
+def get_connection():
+    """
+    Get the database connection of the current thread
+
+    Returns:
+        sqlite3.Connection: Connection in autocommit mode, WAL enabled
+    """
+    connection = getattr(_local, "connection", None)
+    if connection is None or _local.path != SQLITE_DB_PATH:
+        os.makedirs(os.path.dirname(SQLITE_DB_PATH), exist_ok=True)
+        connection = sqlite3.connect(SQLITE_DB_PATH, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        _local.connection = connection
+        _local.path = SQLITE_DB_PATH
+    return connection
+
+
+def _encode_field(field, value):
+    if value is None:
+        return None
+    if field in BOOLEAN_COLUMNS:
+        return int(bool(value))
+    if field in JSON_COLUMNS:
+        return json.dumps(value)
+    return value
+
+
+def _status_columns(fields):
+    """Derived flag columns for the note/screenshots fields being written"""
+    columns = {}
+    if "note" in fields:
+        columns["has_note"] = int(bool(fields["note"]))
+    if "screenshots" in fields:
+        columns["has_screenshots"] = int(bool(fields["screenshots"]))
+    return columns
+
+
+def _row_to_config(row):
+    tested, improved, note, params, screenshots, last_modified, extra = row
+    config = json.loads(extra) if extra else {}
+    if tested is not None:
+        config["tested"] = bool(tested)
+    if improved is not None:
+        config["improved"] = bool(improved)
+    if note is not None:
+        config["note"] = note
+    if params is not None:
+        config["params"] = json.loads(params)
+    if screenshots is not None:
+        config["screenshots"] = json.loads(screenshots)
+    if last_modified is not None:
+        config["last_modified"] = last_modified
+    return config
+
+
+def _insert_config(connection, profile_name, config_id, config):
+    columns = {field: _encode_field(field, config.get(field)) for field in CONFIG_COLUMNS}
+    columns.update(_status_columns(config))
+    extra = {field: value for field, value in config.items() if field not in CONFIG_COLUMNS}
+    columns["extra"] = json.dumps(extra) if extra else None
+
+    names = ", ".join(columns)
+    placeholders = ", ".join("?" for _ in columns)
+    connection.execute(
+        f"INSERT OR REPLACE INTO configs (profile, config_id, {names}) VALUES (?, ?, {placeholders})",
+        (profile_name, config_id, *columns.values())
+    )
+
+
+def _update_config(connection, profile_name, config_id, fields, removed):
+    """Update only the given fields of a configuration row (insert it if missing)"""
+    columns = {field: _encode_field(field, value) for field, value in fields.items()
+               if field in CONFIG_COLUMNS}
+    columns.update({field: None for field in removed if field in CONFIG_COLUMNS})
+    columns.update(_status_columns({**fields, **{field: None for field in removed}}))
+
+    extra_fields = {field: value for field, value in fields.items() if field not in CONFIG_COLUMNS}
+    extra_removed = [field for field in removed if field not in CONFIG_COLUMNS]
+    if extra_fields or extra_removed:
+        row = connection.execute(
+            "SELECT extra FROM configs WHERE profile = ? AND config_id = ?",
+            (profile_name, config_id)
+        ).fetchone()
+        extra = json.loads(row[0]) if row and row[0] else {}
+        extra.update(extra_fields)
+        for field in extra_removed:
+            extra.pop(field, None)
+        columns["extra"] = json.dumps(extra) if extra else None
+
+    if columns:
+        assignments = ", ".join(f"{name} = ?" for name in columns)
+        cursor = connection.execute(
+            f"UPDATE configs SET {assignments} WHERE profile = ? AND config_id = ?",
+            (*columns.values(), profile_name, config_id)
+        )
+        if cursor.rowcount:
+            return
+    _insert_config(connection, profile_name, config_id, fields)
+
+
+def _read_revision(connection, profile_name):
+    row = connection.execute(
+        "SELECT revision FROM profiles WHERE name = ?", (profile_name,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def get_revision(profile_name):
+    """
+    Get the revision number of a profile, incremented on every write
+
+    Args:
+        profile_name (str): Name of the profile
+
+    Returns:
+        int: Revision, or None if the profile does not exist
+    """
+    return _read_revision(get_connection(), profile_name)
+
+
+def read_profile(profile_name, cache=True):
+    """
+    Read a profile from the database
+
+    Args:
+        profile_name (str): Name of the profile
+        cache (bool, optional): Store the state read in the profile cache.
+            Default is True.
+
+    Returns:
+        dict: Profile data, or None if the profile does not exist
+    """
+    connection = get_connection()
+    with get_profile_lock(profile_name):
+        row = connection.execute(
+            "SELECT revision, extras FROM profiles WHERE name = ?", (profile_name,)
+        ).fetchone()
+        if row is None:
+            return None
+        revision, extras = row
+
+        data = {}
+        for config_id, *fields in connection.execute(
+            "SELECT config_id, tested, improved, note, params, screenshots, last_modified, extra "
+            "FROM configs WHERE profile = ?", (profile_name,)
+        ):
+            data[config_id] = _row_to_config(fields)
+        data.update(json.loads(extras))
+
+        if cache:
+            put_cached_profile(profile_name, revision, copy_profile(data))
+        return data
+
+
+def replace_profile(profile_name, data):
+    """
+    Replace all stored data of a profile
+
+    Args:
+        profile_name (str): Name of the profile
+        data (dict or ProfileData): Profile data
+    """
+    data = as_profile_dict(data)
+    connection = get_connection()
+    extras = {key: value for key, value in data.items() if not isinstance(value, dict)}
+
+    with get_profile_lock(profile_name):
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("INSERT OR IGNORE INTO profiles (name) VALUES (?)", (profile_name,))
+            connection.execute("DELETE FROM configs WHERE profile = ?", (profile_name,))
+            for config_id, config in data.items():
+                if isinstance(config, dict):
+                    _insert_config(connection, profile_name, config_id, config)
+            connection.execute(
+                "UPDATE profiles SET revision = revision + 1, extras = ? WHERE name = ?",
+                (json.dumps(extras), profile_name)
+            )
+            revision = _read_revision(connection, profile_name)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        put_cached_profile(profile_name, revision, copy_profile(data))
+
+
+def write_profile(profile_name, data):
+    """
+    Persist the changes between the last known state of a profile and data
+
+    Args:
+        profile_name (str): Name of the profile
+        data (dict or ProfileData): Profile data
+
+    Returns:
+        int: Number of changed keys
+    """
+    connection = get_connection()
+
+    with get_profile_lock(profile_name):
+        revision = _read_revision(connection, profile_name)
+        if revision is None:
+            replace_profile(profile_name, data)
+            return len(data)
+        baseline = get_cached_profile(profile_name, revision)
+        if baseline is None:
+            # Profil plus gros que le budget du cache: l'état relu sert de référence
+            baseline = read_profile(profile_name)
+
+        changes, values, conflicts = diff_to_persist(baseline, data)
+        if not changes:
+            return 0
+
+        extras = {key: value for key, value in baseline.items() if not isinstance(value, dict)}
+        for entry in changes:
+            value = values.get(entry["key"])
+            if entry.get("deleted") or isinstance(value, dict):
+                extras.pop(entry["key"], None)
+            else:
+                extras[entry["key"]] = value
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for entry in changes:
+                key = entry["key"]
+                value = values.get(key)
+                if entry.get("deleted") or not isinstance(value, dict):
+                    connection.execute(
+                        "DELETE FROM configs WHERE profile = ? AND config_id = ?",
+                        (profile_name, key)
+                    )
+                elif "value" in entry:
+                    _insert_config(connection, profile_name, key, value)
+                else:
+                    _update_config(connection, profile_name, key, entry["set"], entry.get("unset", []))
+            connection.execute(
+                "UPDATE profiles SET revision = revision + 1, extras = ? WHERE name = ?",
+                (json.dumps(extras), profile_name)
+            )
+            revision = _read_revision(connection, profile_name)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+        update_baseline(baseline, changes, values)
+        put_cached_profile(profile_name, revision, baseline)
+        report_conflicts(profile_name, data, conflicts)
+        return len(changes)
+
+
+def delete_profile(profile_name):
+    """
+    Delete all stored data of a profile
+
+    Args:
+        profile_name (str): Name of the profile
+    """
+    connection = get_connection()
+    with get_profile_lock(profile_name):
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM configs WHERE profile = ?", (profile_name,))
+            connection.execute("DELETE FROM profiles WHERE name = ?", (profile_name,))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        invalidate_cached_profile(profile_name)
+
+
+def list_profiles():
+    """
+    List the profiles stored in the database
+
+    Returns:
+        list: Profile names, sorted
+    """
+    return [row[0] for row in get_connection().execute("SELECT name FROM profiles ORDER BY name")]
+
+
+def read_profile_stats(profile_name):
+    """
+    Count configuration statuses of a profile with one aggregate query
+
+    Args:
+        profile_name (str): Name of the profile
+
+    Returns:
+        dict: Counts (total, tested, improved, with_notes, with_screenshots)
+    """
+    connection = get_connection()
+    total, tested, improved, with_notes, with_screenshots = connection.execute(
+        "SELECT COUNT(*), COALESCE(SUM(tested), 0), COALESCE(SUM(improved), 0), "
+        "COALESCE(SUM(has_note), 0), COALESCE(SUM(has_screenshots), 0) "
+        "FROM configs WHERE profile = ?", (profile_name,)
+    ).fetchone()
+
+    row = connection.execute(
+        "SELECT extras FROM profiles WHERE name = ?", (profile_name,)
+    ).fetchone()
+    extras = json.loads(row[0]) if row else {}
+
+    return {
+        "total": total + len(extras),
+        "tested": tested,
+        "improved": improved,
+        "with_notes": with_notes,
+        "with_screenshots": with_screenshots
+    }
+
+
+def migrate_json_profiles(overwrite=False):
+    """
+    Import the JSON profiles of PROFILES_DIR into the database
+
+    Args:
+        overwrite (bool, optional): Replace profiles already in the database.
+            Default is False.
+
+    Returns:
+        dict: Names of migrated, skipped and failed profiles
+    """
+    report = {"migrated": [], "skipped": [], "failed": []}
+    if not os.path.isdir(PROFILES_DIR):
+        return report
+
+    connection = get_connection()
+    for profile_name in list_json_profiles():
+        if not overwrite and _read_revision(connection, profile_name) is not None:
+            report["skipped"].append(profile_name)
+            continue
+
+        try:
+            data = read_json_profile(profile_name)
+            replace_profile(profile_name, data or {})
+            report["migrated"].append(profile_name)
+        except Exception as e:
+            print(f"ERROR migrating profile '{profile_name}': {e}")
+            report["failed"].append(profile_name)
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Importe les profils JSON existants dans la base SQLite."
+    )
+    parser.add_argument("--overwrite", action="store_true",
+                        help="remplacer les profils déjà présents dans la base")
+    args = parser.parse_args()
+
+    result = migrate_json_profiles(overwrite=args.overwrite)
+    print(f"Migrés: {len(result['migrated'])}, ignorés: {len(result['skipped'])}, "
+          f"échecs: {len(result['failed'])}")
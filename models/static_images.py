@@ -0,0 +1,224 @@
+"""
+Static screenshot serving for the Trading Dashboard Pro application.
+With SCREENSHOT_SERVING = "static", the images shown by the details view are
+published once as files under STATIC_DIR/screenshots and referenced by URL
+instead of being sent inside the page on every render. File names are the
+content hash, so a URL never changes meaning: the browser keeps the image
+in its cache and repeat views cost neither a server-side read nor a new
+transfer. The Tornado-based Streamlit server answers the ?v= URLs with a
+ten-year max-age; the Starlette-based releases only send Last-Modified,
+leaving the cache time to the browser.
+Images of the blob store are published as hard links to the stored files,
+so they take no space of their own; a copy is only written when linking is
+not possible (another file system, legacy inline screenshots). Published
+files are found again by name after a restart, and removed with their
+images by collect_unused_screenshots; remove_stale_static_images (python -m
+models.static_images) removes those left behind by images deleted from the
+blob store. Any published file can be removed: it is published again on
+the next view.
+Streamlit serves STATIC_DIR (the static folder next to the app script) at
+app/static/ when server.enableStaticServing is set (.streamlit/config.toml).
+"""
+import os
+import argparse
+import threading
+
+from config.settings import STATIC_DIR
+from models.blobs import blob_exists
+from utils.fileio import atomic_write_bytes
+
+STATIC_SCREENSHOTS_DIR = os.path.join(STATIC_DIR, "screenshots")
+
+# Chemin des fichiers de STATIC_DIR dans les URL de Streamlit
+STATIC_URL_PREFIX = "app/static"
+
+# Extensions servies avec leur type d'image par Streamlit (les autres le sont
+# en text/plain), reconnues par la signature du contenu
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+)
+
+# Extensions cherchées pour retrouver une image déjà publiée
+_EXTENSIONS = tuple(dict.fromkeys([".webp"] + [extension for _, extension in _SIGNATURES]))
+
+# Images publiées connues de ce processus: {(hash, variante): URL}
+_published = {}
+_lock = threading.Lock()
+
+
+def get_image_extension(content):
+    """
+    Get the file extension matching image content
+
+    Args:
+        content (bytes): Image data (the first bytes are enough)
+
+    Returns:
+        str: Extension served as an image by Streamlit, or None
+    """
+    if content[:4] == b"RIFF" and content[8:12] == b"WEBP":
+        return ".webp"
+    for signature, extension in _SIGNATURES:
+        if content.startswith(signature):
+            return extension
+    return None
+
+
+def get_static_image_path(content_hash, variant, extension):
+    """
+    Get the path of a published image
+
+    Args:
+        content_hash (str): Hash of the original image content
+        variant (str): Size in THUMBNAIL_SIZES, None for the original
+        extension (str): File extension
+
+    Returns:
+        str: Path under STATIC_SCREENSHOTS_DIR (two-character fan-out directory)
+    """
+    return os.path.join(STATIC_SCREENSHOTS_DIR, content_hash[:2],
+                        f"{content_hash}.{variant or 'original'}{extension}")
+
+
+def _find_published(content_hash, variant):
+    """Get the path of an image published earlier (by any process), or None"""
+    for extension in _EXTENSIONS:
+        path = get_static_image_path(content_hash, variant, extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _read_header(path):
+    """Read the first bytes of a file, enough to recognize the image format"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(16)
+    except OSError:
+        return None
+
+
+def _link(source, path):
+    """Publish a stored file as a hard link; returns False if linking is not possible"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        os.link(source, path)
+    except FileExistsError:
+        pass
+    except OSError:
+        return False
+    return True
+
+
+def get_static_image_url(content_hash, variant, read, source=None):
+    """
+    Publish an image as a static file, once, and get its URL
+
+    Args:
+        content_hash (str): Hash of the original image content
+        variant (str): Size in THUMBNAIL_SIZES, None for the original
+        read (callable): Returns the image bytes; only called when the
+            image is not published yet and cannot be linked
+        source (str, optional): Path of the image in the blob store (blob or
+            derivative), published as a hard link when it exists
+
+    Returns:
+        str: URL relative to the app, or None if the image format cannot be
+            served (the caller then sends the bytes)
+    """
+    key = (content_hash, variant)
+    url = _published.get(key)
+    if url is not None:
+        return url
+
+    path = _find_published(content_hash, variant)
+    if path is None:
+        if source is not None and not os.path.exists(source):
+            # Lecture qui crée la dérivée manquante dans le stockage
+            read()
+        header = _read_header(source) if source is not None else None
+        content = read() if header is None else None
+        extension = get_image_extension(header if content is None else content)
+        if extension is None:
+            return None
+        path = get_static_image_path(content_hash, variant, extension)
+        if content is not None or not _link(source, path):
+            # Copie reconstructible à partir du stockage des images: pas besoin de fsync
+            atomic_write_bytes(path, content if content is not None else read(), fsync=False)
+    url = (f"{STATIC_URL_PREFIX}/{os.path.relpath(path, STATIC_DIR).replace(os.sep, '/')}"
+           f"?v={content_hash[:16]}")
+    with _lock:
+        _published[key] = url
+    return url
+
+
+def _iter_published_files():
+    """Yield (content hash, path) of every published file"""
+    if not os.path.isdir(STATIC_SCREENSHOTS_DIR):
+        return
+    for fan_out in os.listdir(STATIC_SCREENSHOTS_DIR):
+        directory = os.path.join(STATIC_SCREENSHOTS_DIR, fan_out)
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            if not name.startswith('.'):
+                yield name.split('.', 1)[0], os.path.join(directory, name)
+
+
+def _remove_published(should_remove):
+    """Delete the published files whose content hash matches; returns their number"""
+    with _lock:
+        for key in [key for key in _published if should_remove(key[0])]:
+            del _published[key]
+    removed = 0
+    for content_hash, path in list(_iter_published_files()):
+        if should_remove(content_hash):
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def remove_unreferenced_static_images(referenced):
+    """
+    Delete the published images of screenshots that are not referenced anymore
+
+    Args:
+        referenced (set): Content hashes still referenced by profiles
+
+    Returns:
+        int: Number of deleted files
+    """
+    return _remove_published(lambda content_hash: content_hash not in referenced)
+
+
+def remove_stale_static_images():
+    """
+    Delete the published images whose original is not in the blob store
+
+    Copies of legacy inline screenshots are deleted as well; they are
+    published again when next viewed.
+
+    Returns:
+        int: Number of deleted files
+    """
+    exists = {}
+
+    def is_stale(content_hash):
+        if content_hash not in exists:
+            exists[content_hash] = blob_exists(content_hash)
+        return not exists[content_hash]
+
+    return _remove_published(is_stale)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Supprime les captures publiées dont l'image n'est plus stockée."
+    )
+    parser.parse_args()
+
+    removed = remove_stale_static_images()
+    print(f"Fichiers publiés supprimés: {removed} ({os.path.abspath(STATIC_SCREENSHOTS_DIR)})")
@@ -0,0 +1,164 @@
+"""
+Status index for the Trading Dashboard Pro application.
+Keeps the statuses of a profile as a compact asset × timeframe matrix of bit
+flags, so the asset grids read a whole block of cells in one lookup instead
+of building configuration IDs and walking nested dicts cell by cell.
+"""
+import numpy as np
+
+from config.settings import ASSET_CATEGORIES, TIMEFRAMES
+
+# Un bit par statut de configuration
+STATUS_TESTED = 1
+STATUS_IMPROVED = 2
+STATUS_NOTE = 4
+STATUS_SCREENSHOTS = 8
+
+_TIMEFRAME_COLUMNS = {tf: i for i, tf in enumerate(TIMEFRAMES)}
+_CATALOG_ASSETS = list(dict.fromkeys(
+    asset for category in ASSET_CATEGORIES.values() for asset in category["assets"]
+))
+
+
+def config_status(record):
+    """
+    Compute the status flags of a configuration
+
+    Args:
+        record (dict or ConfigRecord): Configuration fields, or None
+
+    Returns:
+        int: Combination of the STATUS_* flags
+    """
+    if not record:
+        return 0
+    flags = 0
+    if record.get('tested'):
+        flags |= STATUS_TESTED
+    if record.get('improved'):
+        flags |= STATUS_IMPROVED
+    if record.get('note'):
+        flags |= STATUS_NOTE
+    if record.get('screenshots'):
+        flags |= STATUS_SCREENSHOTS
+    return flags
+
+
+def split_config_id(config_id):
+    """
+    Split a configuration ID into asset and timeframe
+
+    Args:
+        config_id (str): Configuration ID
+
+    Returns:
+        tuple: (asset, timeframe), or None if the ID has no known timeframe
+    """
+    asset, _, timeframe = config_id.rpartition('_')
+    if not asset or timeframe not in _TIMEFRAME_COLUMNS:
+        return None
+    return asset, timeframe
+
+
+class StatusIndex:
+    """
+    Asset × timeframe matrix of status flags (uint8) for one profile
+
+    Rows cover the catalog assets from ASSET_CATEGORIES, plus any other
+    asset found in the profile; columns follow TIMEFRAMES.
+    """
+
+    def __init__(self):
+        self.rows = {asset: i for i, asset in enumerate(_CATALOG_ASSETS)}
+        self.matrix = np.zeros((len(self.rows), len(TIMEFRAMES)), dtype=np.uint8)
+
+    @classmethod
+    def build(cls, data):
+        """
+        Build the index of profile data
+
+        Args:
+            data (dict or ProfileData): Profile data
+
+        Returns:
+            StatusIndex: Index of every configuration of the profile
+        """
+        index = cls()
+        for config_id in data:
+            index.update(config_id, data[config_id])
+        return index
+
+    def copy(self):
+        """
+        Copy the index
+
+        Returns:
+            StatusIndex: Independent copy
+        """
+        copied = StatusIndex.__new__(StatusIndex)
+        copied.rows = dict(self.rows)
+        copied.matrix = self.matrix.copy()
+        return copied
+
+    def _row_of(self, asset):
+        row = self.rows.get(asset)
+        if row is None:
+            row = self.rows[asset] = len(self.rows)
+            if row >= len(self.matrix):
+                # Croissance par doublement pour les actifs hors catalogue
+                grown = np.zeros((max(8, 2 * len(self.matrix)), len(TIMEFRAMES)), dtype=np.uint8)
+                grown[:len(self.matrix)] = self.matrix
+                self.matrix = grown
+        return row
+
+    def update(self, config_id, record):
+        """
+        Refresh the cell of one configuration
+
+        Args:
+            config_id (str): Configuration ID (other keys are ignored)
+            record (dict or ConfigRecord): Configuration fields, or None if
+                the configuration was deleted
+        """
+        cell = split_config_id(config_id)
+        if cell is None or (record is not None and not hasattr(record, 'get')):
+            return
+        asset, timeframe = cell
+        flags = config_status(record)
+        if flags == 0 and asset not in self.rows:
+            return
+        row = self._row_of(asset)
+        self.matrix[row, _TIMEFRAME_COLUMNS[timeframe]] = flags
+
+    def get(self, asset, timeframe):
+        """
+        Get the status flags of one cell
+
+        Args:
+            asset (str): Asset name
+            timeframe (str): Timeframe
+
+        Returns:
+            int: Combination of the STATUS_* flags
+        """
+        row = self.rows.get(asset)
+        if row is None:
+            return 0
+        return int(self.matrix[row, _TIMEFRAME_COLUMNS[timeframe]])
+
+    def block(self, assets, timeframes=TIMEFRAMES):
+        """
+        Get the status flags of several assets at once
+
+        Args:
+            assets (list): Asset names (unknown assets read as zeros)
+            timeframes (list, optional): Timeframes. Default is TIMEFRAMES.
+
+        Returns:
+            numpy.ndarray: uint8 matrix, one row per asset and one column per timeframe
+        """
+        rows = np.array([self.rows.get(asset, -1) for asset in assets], dtype=np.intp)
+        columns = np.array([_TIMEFRAME_COLUMNS[tf] for tf in timeframes], dtype=np.intp)
+        flags = self.matrix[np.ix_(np.maximum(rows, 0), columns)]
+        flags[rows < 0] = 0
+        return flags
@@ -0,0 +1,902 @@
+"""
+Storage module for the Trading Dashboard Pro application.
+Persists profile data with the backend selected in config/settings.py:
+JSON files (a single snapshot per profile, or a snapshot plus an append-only
+journal of per-configuration changes periodically folded back into the
+snapshot), or a shared SQLite database (see models/sqlite_store.py).
+JSON profiles also keep a small status summary (<profile>.stats) updated on
+every write, so statistics never require loading the profile. Every write
+also marks the profile's catalog entry for a batched refresh (see
+models/catalog.py).
+
+Writes are safe across sessions and processes: each profile has an
+advisory file lock (<profile>.lock), and the configurations changed by a
+session are merged field by field with the stored state (three-way, against
+the state the session started from), so concurrent edits of different
+fields or configurations are all kept. Fields edited differently on both
+sides keep the saved value and are reported on the saved ProfileData
+(`conflicts`), so the interface can tell the user.
+"""
+import os
+import json
+import threading
+from datetime import datetime
+
+from models.auth import get_profile_path, get_flat_profile_path
+from models.sharding import iter_sharded_profiles, list_flat_profiles
+from models.catalog import update_catalog_entry, remove_catalog_entry, mark_catalog_stale
+from config.settings import (
+    STORAGE_BACKEND, PROFILE_STORAGE_MODE, PROFILE_LAYOUT, JOURNAL_COMPACT_THRESHOLD
+)
+from models.profile_cache import get_cached_profile, put_cached_profile, invalidate_cached_profile
+from models.status_index import (
+    config_status, STATUS_TESTED, STATUS_IMPROVED, STATUS_NOTE, STATUS_SCREENSHOTS
+)
+from utils.fileio import atomic_write_json, file_fingerprint
+from utils.filelock import FileLock
+
+# Verrous par profil (lecture, écriture et compaction)
+_locks = {}
+_locks_guard = threading.Lock()
+
+# Profils dont la compaction est en cours
+_compacting = set()
+
+# Compteur de snapshots complets par profil (invalide une compaction en cours)
+_generations = {}
+
+# Résumés de statuts connus: {profile: (fingerprint des fichiers, compteurs)}
+_stats = {}
+
+# Compteur de statistiques associé à chaque drapeau de statut
+STATS_FLAGS = (
+    (STATUS_TESTED, "tested"),
+    (STATUS_IMPROVED, "improved"),
+    (STATUS_NOTE, "with_notes"),
+    (STATUS_SCREENSHOTS, "with_screenshots"),
+)
+
+
+def get_profile_lock(profile_name):
+    """
+    Get the lock guarding the storage of a profile
+
+    Args:
+        profile_name (str): Name of the profile
+
+    Returns:
+        FileLock: Re-entrant lock of the profile, shared with other threads
+            and (through <profile>.lock) with other processes
+    """
+    with _locks_guard:
+        if profile_name not in _locks:
+            _locks[profile_name] = FileLock(lambda: get_lock_path(profile_name))
+        return _locks[profile_name]
+
+
+def get_lock_path(profile_name):
+    """
+    Get the lock file path for a profile
+
+    Args:
+        profile_name (str): Name of the profile
+
+    Returns:
+        str: Path of the advisory lock file (kept after the profile is deleted)
+    """
+    return os.path.splitext(get_profile_path(profile_name))[0] + ".lock"
+
+
+def get_journal_path(profile_name):
+    """
+    Get the journal file path for a profile
+
+    Args:
+        profile_name (str): Name of the profile
+
+    Returns:
+        str: Path of the append-only journal
+    """
+    return os.path.splitext(get_profile_path(profile_name))[0] + ".journal"
+
+
+def _get_compacting_path(profile_name):
+    return get_journal_path(profile_name) + ".compacting"
+
+
+def get_stats_path(profile_name):
+    """
+    Get the status summary file path for a profile
+
+    Args:
+        profile_name (str): Name of the profile
+
+    Returns:
+        str: Path of the summary (not a .json file, so it is never listed as a profile)
+    """
+    return os.path.splitext(get_profile_path(profile_name))[0] + ".stats"
+
+
+def _fingerprint(profile_name):
+    return (
+        file_fingerprint(get_profile_path(profile_name)),
+        file_fingerprint(_get_compacting_path(profile_name)),
+        file_fingerprint(get_journal_path(profile_name)),
+    )
+
+
+def _add_entry_stats(counts, value, sign):
+    counts["total"] += sign
+    if isinstance(value, dict):
+        flags = config_status(value)
+        for flag, key in STATS_FLAGS:
+            if flags & flag:
+                counts[key] += sign
+
+
+def count_statuses(data):
+    """
+    Count configuration statuses in profile data
+
+    Args:
+        data (dict): Plain profile data
+
+    Returns:
+        dict: Counts (total, tested, improved, with_notes, with_screenshots)
+    """
+    counts = dict.fromkeys(["total"] + [key for _, key in STATS_FLAGS], 0)
+    for value in data.values():
+        _add_entry_stats(counts, value, 1)
+    return counts
+
+
+def _stats_delta(counts, changes, baseline, values):
+    """Update counts in place for changes about to be applied over baseline"""
+    for entry in changes:
+        key = entry["key"]
+        if key in baseline:
+            _add_entry_stats(counts, baseline[key], -1)
+        if not entry.get("deleted"):
+            _add_entry_stats(counts, values[key], 1)
+
+
+def _fingerprint_key(fingerprint):
+    return [list(part) if part is not None else None for part in fingerprint]
+
+
+def _get_stats(profile_name, fingerprint):
+    """Get the recorded status counts of a profile if they match its files"""
+    entry = _stats.get(profile_name)
+    if entry is not None and entry[0] == fingerprint:
+        return dict(entry[1])
+
+    try:
+        with open(get_stats_path(profile_name), 'r', encoding='utf-8') as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if summary.get("fingerprint") != _fingerprint_key(fingerprint):
+        return None
+    _stats[profile_name] = (fingerprint, summary["counts"])
+    return dict(summary["counts"])
+
+
+def _store_stats(profile_name, counts):
+    """Record the status counts of the current files of a profile"""
+    fingerprint = _fingerprint(profile_name)
+    _stats[profile_name] = (fingerprint, counts)
+    try:
+        # Donnée dérivée, vérifiée par empreinte à la lecture: pas besoin de fsync
+        atomic_write_json(get_stats_path(profile_name), {
+            "fingerprint": _fingerprint_key(fingerprint),
+            "counts": counts
+        }, indent=None, fsync=False)
+    except OSError as e:
+        print(f"WARNING: Could not write status summary for profile '{profile_name}': {e}")
+
+
+def copy_profile(data):
+    """
+    Copy profile data down to the configuration fields
+
+    Strings (notes, image data) are immutable and shared with the source,
+    so this costs one small allocation per configuration.
+
+    Args:
+        data (dict): Profile data
+
+    Returns:
+        dict: Independent copy of the profile data
+    """
+    copied = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            copied[key] = {
+                field: field_value.copy() if isinstance(field_value, (dict, list)) else field_value
+                for field, field_value in value.items()
+            }
+        elif isinstance(value, list):
+            copied[key] = list(value)
+        else:
+            copied[key] = value
+    return copied
+
+
+def as_profile_dict(data):
+    """
+    Get profile data as plain nested dicts
+
+    Args:
+        data (dict or ProfileData): Profile data
+
+    Returns:
+        dict: Plain profile data (may share objects with data)
+    """
+    to_dict = getattr(data, "to_dict", None)
+    return to_dict() if to_dict is not None else data
+
+
+def diff_profile(old, new):
+    """
+    Compute the journal changes turning one profile state into another
+
+    Args:
+        old (dict): Previous profile data
+        new (dict): New profile data
+
+    Returns:
+        list: Change entries, one per modified key
+    """
+    changes = []
+
+    for key, value in new.items():
+        previous = old.get(key)
+        if previous is value:
+            continue
+
+        if isinstance(value, dict) and isinstance(previous, dict):
+            fields = {field: field_value for field, field_value in value.items()
+                      if field not in previous or previous[field] != field_value}
+            removed = [field for field in previous if field not in value]
+            if fields or removed:
+                entry = {"key": key, "set": fields}
+                if removed:
+                    entry["unset"] = removed
+                changes.append(entry)
+        elif key not in old or previous != value:
+            changes.append({"key": key, "value": value})
+
+    for key in old:
+        if key not in new:
+            changes.append({"key": key, "deleted": True})
+
+    return changes
+
+
+def diff_to_persist(baseline, data):
+    """
+    Compute the changes between the persisted state and data
+
+    When data tracks its dirty keys (ProfileData), only those keys are
+    compared, so the cost follows the number of touched configurations
+    rather than the size of the profile. When it also records their state
+    before the changes (`base`), each one is merged with the persisted
+    value (see merge_entry), so changes persisted meanwhile by other
+    sessions are kept.
+
+    Args:
+        baseline (dict): Last persisted profile data
+        data (dict or ProfileData): Profile data to persist
+
+    Returns:
+        tuple: (change entries, plain values of data by key, conflicts as
+            "key (fields)" strings for the fields also changed in the
+            persisted state, where the value of data was kept)
+    """
+    dirty = getattr(data, "dirty", None)
+    if dirty is None:
+        return diff_profile(baseline, data), data, []
+
+    values = data.to_dict(dirty)
+    # Trois voies: l'état dont la session est partie, le sien et celui stocké
+    base = getattr(data, "base", None) or {}
+    conflicts = []
+    for key in dirty:
+        if key not in base:
+            continue
+        merged, clashes = merge_entry(base[key], values.get(key), baseline.get(key))
+        if clashes:
+            conflicts.append(f"{key} ({', '.join(clashes)})")
+        if merged is None:
+            values.pop(key, None)
+        else:
+            values[key] = merged
+
+    previous = {key: baseline[key] for key in dirty if key in baseline}
+    return diff_profile(previous, values), values, conflicts
+
+
+def merge_entry(base, mine, theirs):
+    """
+    Three-way merge of one profile entry
+
+    Configurations are merged field by field (and parameter by parameter): a
+    field changed on one side only takes that side's value; a field changed
+    differently on both sides is a conflict, resolved in favor of mine (the
+    latest save). Lists (such as screenshots or '_custom_assets') keep the
+    additions and removals of both sides.
+
+    Args:
+        base: Value the saving session started from (None if absent)
+        mine: Value of the saving session (None if deleted)
+        theirs: Value currently persisted (None if absent)
+
+    Returns:
+        tuple: (merged value or None to delete, list of conflicting fields)
+    """
+    if theirs == base or mine == theirs:
+        return mine, []
+    if mine == base:
+        return theirs, []
+
+    if isinstance(mine, dict) and isinstance(theirs, dict):
+        base = base if isinstance(base, dict) else {}
+        merged = dict(theirs)
+        conflicts = []
+        for field in list(mine) + [field for field in base if field not in mine]:
+            if mine.get(field) == base.get(field):
+                continue
+            if field == 'last_modified':
+                merged[field] = max(mine.get(field) or "", theirs.get(field) or "")
+                continue
+            # Champs composés (params, screenshots) fusionnés à leur tour
+            value, clashes = merge_entry(base.get(field), mine.get(field), theirs.get(field))
+            conflicts.extend(field if clash == "*" else f"{field}.{clash}" for clash in clashes)
+            if value is None:
+                merged.pop(field, None)
+            else:
+                merged[field] = value
+        return merged, conflicts
+
+    if isinstance(mine, list) and isinstance(theirs, list):
+        base = base if isinstance(base, list) else []
+        removed = [item for item in base if item not in mine]
+        added = [item for item in mine if item not in base and item not in theirs]
+        return [item for item in theirs if item not in removed] + added, []
+
+    # Suppression d'un côté, modification de l'autre (ou types différents)
+    return mine, ["*"]
+
+
+def report_conflicts(profile_name, data, conflicts):
+    """
+    Report the conflicts of a save that was just persisted
+
+    Args:
+        profile_name (str): Name of the profile
+        data (dict or ProfileData): Saved profile data; a ProfileData gets
+            the conflicts added to its `conflicts` list
+        conflicts (list): Conflicts returned by diff_to_persist
+    """
+    if not conflicts:
+        return
+    print(f"WARNING: Concurrent edits of the same fields in profile '{profile_name}', "
+          f"latest save kept: {'; '.join(conflicts)}")
+    if hasattr(data, "conflicts"):
+        data.conflicts.extend(conflicts)
+
+
+def update_baseline(baseline, changes, values):
+    """
+    Bring the cached persisted state up to date after writing changes
+
+    Args:
+        baseline (dict): Last persisted profile data, updated in place
+        changes (list): Change entries just written
+        values (dict): Plain values of the written data by key
+    """
+    for entry in changes:
+        key = entry["key"]
+        if entry.get("deleted"):
+            baseline.pop(key, None)
+        else:
+            baseline[key] = copy_profile({key: values[key]})[key]
+
+
+def apply_changes(data, changes):
+    """
+    Apply journal change entries to profile data in place
+
+    Args:
+        data (dict): Profile data
+        changes (list): Change entries as produced by diff_profile
+
+    Returns:
+        dict: Updated profile data
+    """
+    for entry in changes:
+        key = entry["key"]
+        if entry.get("deleted"):
+            data.pop(key, None)
+        elif "value" in entry:
+            data[key] = entry["value"]
+        else:
+            record = data.get(key)
+            if not isinstance(record, dict):
+                record = data[key] = {}
+            record.update(entry.get("set", {}))
+            for field in entry.get("unset", []):
+                record.pop(field, None)
+    return data
+
+
+def _replay_journal(path, data):
+    """Replay a journal file over data, ignoring a torn trailing line"""
+    if not os.path.exists(path):
+        return 0
+
+    replayed = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                print(f"WARNING: Ignoring corrupted journal line in {path}")
+                continue
+            apply_changes(data, record.get("changes", []))
+            replayed += 1
+    return replayed
+
+
+def read_json_profile(profile_name, cache=True):
+    """
+    Read a profile from disk: last snapshot plus journal replay
+
+    Args:
+        profile_name (str): Name of the profile
+        cache (bool, optional): Store the state read in the profile cache.
+            Default is True.
+
+    Returns:
+        dict: Profile data, or None if the profile has no snapshot
+    """
+    profile_path = get_profile_path(profile_name)
+
+    with get_profile_lock(profile_name):
+        fingerprint = _fingerprint(profile_name)
+        if fingerprint[0] is None:
+            return None
+
+        with open(profile_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        replayed = _replay_journal(_get_compacting_path(profile_name), data)
+        replayed += _replay_journal(get_journal_path(profile_name), data)
+        if replayed:
+            print(f"Replayed {replayed} journal entries for profile '{profile_name}'")
+
+        if cache:
+            put_cached_profile(profile_name, fingerprint, copy_profile(data))
+        return data
+
+
+def _get_baseline(profile_name):
+    """Get the last persisted state, reloading it if the files changed"""
+    fingerprint = _fingerprint(profile_name)
+    baseline = get_cached_profile(profile_name, fingerprint)
+    if baseline is not None:
+        return baseline
+
+    data = read_json_profile(profile_name)
+    if data is None:
+        return None
+    # Profil plus gros que le budget du cache: l'état relu sert de référence
+    cached = get_cached_profile(profile_name, fingerprint)
+    return cached if cached is not None else data
+
+
+def write_snapshot(profile_name, data):
+    """
+    Write a full snapshot of a profile and drop its journal
+
+    Args:
+        profile_name (str): Name of the profile
+        data (dict or ProfileData): Profile data
+    """
+    data = as_profile_dict(data)
+    with get_profile_lock(profile_name):
+        atomic_write_json(get_profile_path(profile_name), data)
+        _generations[profile_name] = _generations.get(profile_name, 0) + 1
+        for path in (_get_compacting_path(profile_name), get_journal_path(profile_name)):
+            if os.path.exists(path):
+                os.remove(path)
+        put_cached_profile(profile_name, _fingerprint(profile_name), copy_profile(data))
+        _store_stats(profile_name, count_statuses(data))
+
+
+def write_merged_snapshot(profile_name, data):
+    """
+    Write a full snapshot of a profile, merging the changes of data into
+    the stored state
+
+    Args:
+        profile_name (str): Name of the profile
+        data (dict or ProfileData): Profile data; for a ProfileData only its
+            dirty keys are merged, other keys keep their stored value
+    """
+    with get_profile_lock(profile_name):
+        baseline = _get_baseline(profile_name) if hasattr(data, "dirty") else None
+        if baseline is None:
+            write_snapshot(profile_name, data)
+            return
+        changes, values, conflicts = diff_to_persist(baseline, data)
+        merged = copy_profile(baseline)
+        update_baseline(merged, changes, values)
+        write_snapshot(profile_name, merged)
+        report_conflicts(profile_name, data, conflicts)
+
+
+def append_journal(profile_name, data):
+    """
+    Persist the changes between the last persisted state and data as one
+    journal line
+
+    Args:
+        profile_name (str): Name of the profile
+        data (dict or ProfileData): Profile data
+
+    Returns:
+        int: Number of changed keys written to the journal
+    """
+    with get_profile_lock(profile_name):
+        baseline = _get_baseline(profile_name)
+        if baseline is None:
+            write_snapshot(profile_name, data)
+            return len(data)
+
+        changes, values, conflicts = diff_to_persist(baseline, data)
+        if not changes:
+            return 0
+
+        counts = _get_stats(profile_name, _fingerprint(profile_name))
+        if counts is None:
+            counts = count_statuses(baseline)
+        _stats_delta(counts, changes, baseline, values)
+
+        line = json.dumps({
+            "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "changes": changes
+        })
+        journal_path = get_journal_path(profile_name)
+        with open(journal_path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        update_baseline(baseline, changes, values)
+        put_cached_profile(profile_name, _fingerprint(profile_name), baseline)
+        _store_stats(profile_name, counts)
+        report_conflicts(profile_name, data, conflicts)
+
+        if os.path.getsize(journal_path) > JOURNAL_COMPACT_THRESHOLD:
+            schedule_compaction(profile_name)
+
+        return len(changes)
+
+
+def compact_journal(profile_name):
+    """
+    Fold the journal of a profile back into its snapshot
+
+    New changes keep being appended to a fresh journal while the snapshot
+    is written; replaying entries is idempotent, so a crash at any point
+    leaves a readable profile.
+
+    Args:
+        profile_name (str): Name of the profile
+
+    Returns:
+        bool: True if a compaction was performed
+    """
+    lock = get_profile_lock(profile_name)
+    profile_path = get_profile_path(profile_name)
+    journal_path = get_journal_path(profile_name)
+    compacting_path = _get_compacting_path(profile_name)
+    compacted_path = profile_path + ".compacted"
+
+    with lock:
+        if not os.path.exists(journal_path) or os.path.exists(compacting_path):
+            return False
+        baseline = _get_baseline(profile_name)
+        if baseline is None:
+            return False
+        os.replace(journal_path, compacting_path)
+        snapshot = copy_profile(baseline)
+        generation = _generations.get(profile_name, 0)
+        snapshot_fingerprint = file_fingerprint(profile_path)
+
+    atomic_write_json(compacted_path, snapshot)
+
+    with lock:
+        if (_generations.get(profile_name, 0) != generation
+                or file_fingerprint(profile_path) != snapshot_fingerprint
+                or not os.path.exists(compacting_path)):
+            # Un snapshot complet a été écrit entre-temps (par ce processus
+            # ou un autre): il fait foi
+            os.remove(compacted_path)
+            return False
+        baseline = _get_baseline(profile_name)
+        counts = _get_stats(profile_name, _fingerprint(profile_name))
+        os.replace(compacted_path, profile_path)
+        os.remove(compacting_path)
+        put_cached_profile(profile_name, _fingerprint(profile_name), baseline)
+        if counts is not None:
+            # Contenu inchangé: le résumé est seulement ré-associé aux nouveaux fichiers
+            _store_stats(profile_name, counts)
+
+    mark_catalog_stale(profile_name)
+    print(f"Compacted journal for profile '{profile_name}'")
+    return True
+
+
+def _run_compaction(profile_name):
+    try:
+        compact_journal(profile_name)
+    except Exception as e:
+        print(f"ERROR compacting journal for profile '{profile_name}': {e}")
+    finally:
+        with _locks_guard:
+            _compacting.discard(profile_name)
+
+
+def schedule_compaction(profile_name):
+    """
+    Start a background compaction of a profile journal if none is running
+
+    Args:
+        profile_name (str): Name of the profile
+
+    Returns:
+        threading.Thread: The compaction thread, or None if already running
+    """
+    with _locks_guard:
+        if profile_name in _compacting:
+            return None
+        _compacting.add(profile_name)
+
+    thread = threading.Thread(
+        target=_run_compaction, args=(profile_name,),
+        name=f"compact-{profile_name}", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def delete_json_profile(profile_name):
+    """
+    Remove the snapshot and journal files of a profile
+
+    Args:
+        profile_name (str): Name of the profile
+    """
+    with get_profile_lock(profile_name):
+        for path in (get_profile_path(profile_name), _get_compacting_path(profile_name),
+                     get_journal_path(profile_name), get_stats_path(profile_name)):
+            if os.path.exists(path):
+                os.remove(path)
+        invalidate_cached_profile(profile_name)
+        _stats.pop(profile_name, None)
+
+
+def get_profile_token(profile_name):
+    """
+    Get a cheap version token of the stored profile
+
+    Args:
+        profile_name (str): Name of the profile
+
+    Returns:
+        Token changing on every write (file fingerprints for JSON, revision
+        for SQLite), or None if the profile does not exist
+    """
+    if STORAGE_BACKEND == "sqlite":
+        from models import sqlite_store
+        return sqlite_store.get_revision(profile_name)
+    fingerprint = _fingerprint(profile_name)
+    return fingerprint if fingerprint[0] is not None else None
+
+
+def read_profile(profile_name, factory=None, cache=True):
+    """
+    Read a profile, from the shared cache when it is still current
+
+    Args:
+        profile_name (str): Name of the profile
+        factory (callable, optional): Builds the returned object from the
+            stored state without modifying it (the state may be the shared
+            cached one). Default is copy_profile.
+        cache (bool, optional): Store the state read in the cache on a miss
+            and mark a cached one as recently used. Default is True; reads
+            over every profile (analytics, summaries) pass False so they do
+            not evict the profiles of active sessions.
+
+    Returns:
+        Profile data owned by the caller, or None if the profile does not
+            exist
+    """
+    with get_profile_lock(profile_name):
+        token = get_profile_token(profile_name)
+        if token is None:
+            return None
+
+        cached = get_cached_profile(profile_name, token, touch=cache)
+        if cached is not None:
+            return factory(cached) if factory is not None else copy_profile(cached)
+
+        if STORAGE_BACKEND == "sqlite":
+            from models import sqlite_store
+            data = sqlite_store.read_profile(profile_name, cache=cache)
+        else:
+            data = read_json_profile(profile_name, cache=cache)
+        if data is None or factory is None:
+            return data
+        return factory(data)
+
+
+def write_profile(profile_name, data):
+    """
+    Persist profile data with the configured storage backend
+
+    Args:
+        profile_name (str): Name of the profile
+        data (dict or ProfileData): Profile data; for a ProfileData only the
+            dirty keys are compared and written
+
+    Returns:
+        bool: True if the profile is stored after writing
+    """
+    if STORAGE_BACKEND == "sqlite":
+        from models import sqlite_store
+        written = sqlite_store.write_profile(profile_name, data)
+        print(f"Updated {written} rows for profile '{profile_name}'")
+        mark_catalog_stale(profile_name)
+        return True
+
+    if PROFILE_STORAGE_MODE == "journal":
+        written = append_journal(profile_name, data)
+        print(f"Journaled {written} changed entries for profile '{profile_name}'")
+    else:
+        write_merged_snapshot(profile_name, data)
+
+    profile_path = get_profile_path(profile_name)
+    if not os.path.exists(profile_path):
+        return False
+    print(f"Profile file size: {os.path.getsize(profile_path)} bytes")
+    mark_catalog_stale(profile_name)
+    return True
+
+
+def get_profile_size(profile_name):
+    """
+    Get the stored size of a profile
+
+    Args:
+        profile_name (str): Name of the profile
+
+    Returns:
+        int: Size in bytes of the snapshot and journal files, or None with
+            the SQLite backend (profiles share one database)
+    """
+    if STORAGE_BACKEND == "sqlite":
+        return None
+    fingerprint = _fingerprint(profile_name)
+    return sum(part[1] for part in fingerprint if part is not None)
+
+
+def list_stored_profiles():
+    """
+    List the profiles present in the storage backend
+
+    Returns:
+        list: Profile names, sorted
+    """
+    if STORAGE_BACKEND == "sqlite":
+        from models import sqlite_store
+        return sqlite_store.list_profiles()
+    return list_json_profiles()
+
+
+def list_json_profiles():
+    """
+    List the profiles stored as JSON files, in the configured layout
+
+    Returns:
+        list: Profile names, sorted
+    """
+    profiles_dir = os.path.dirname(get_flat_profile_path("_"))
+    if PROFILE_LAYOUT == "flat":
+        return list_flat_profiles(profiles_dir)
+    return sorted(iter_sharded_profiles(profiles_dir))
+
+
+def _update_catalog(profile_name):
+    """Refresh the size and configuration count of a profile in the catalog"""
+    counts = read_profile_stats(profile_name)
+    update_catalog_entry(
+        profile_name,
+        size=get_profile_size(profile_name),
+        configs=counts["total"] if counts else 0
+    )
+
+
+def init_profile(profile_name, data=None, update_catalog=True, overwrite=True):
+    """
+    Create the storage of a new profile, replacing any leftover data
+
+    Args:
+        profile_name (str): Name of the profile
+        data (dict, optional): Initial profile data. Default is empty.
+        update_catalog (bool, optional): Refresh the catalog entry. Callers
+            creating many profiles pass False and update the catalog once.
+        overwrite (bool, optional): Replace the data of an existing profile.
+            Default is True.
+
+    Raises:
+        FileExistsError: If overwrite is False and the profile is stored
+    """
+    data = data or {}
+    with get_profile_lock(profile_name):
+        if not overwrite and get_profile_token(profile_name) is not None:
+            raise FileExistsError(f"Profile '{profile_name}' already exists")
+        if STORAGE_BACKEND == "sqlite":
+            from models import sqlite_store
+            sqlite_store.replace_profile(profile_name, data)
+        else:
+            write_snapshot(profile_name, data)
+    if update_catalog:
+        _update_catalog(profile_name)
+
+
+def delete_profile_files(profile_name):
+    """
+    Remove all stored data of a profile
+
+    Args:
+        profile_name (str): Name of the profile
+    """
+    if STORAGE_BACKEND == "sqlite":
+        from models import sqlite_store
+        sqlite_store.delete_profile(profile_name)
+    else:
+        delete_json_profile(profile_name)
+    remove_catalog_entry(profile_name)
+
+
+def read_profile_stats(profile_name):
+    """
+    Get status counts of a profile without loading it
+
+    Args:
+        profile_name (str): Name of the profile
+
+    Returns:
+        dict: Counts (total, tested, improved, with_notes, with_screenshots),
+            or None if the profile does not exist
+    """
+    if STORAGE_BACKEND == "sqlite":
+        from models import sqlite_store
+        return sqlite_store.read_profile_stats(profile_name)
+
+    with get_profile_lock(profile_name):
+        fingerprint = _fingerprint(profile_name)
+        if fingerprint[0] is None:
+            return None
+        counts = _get_stats(profile_name, fingerprint)
+        if counts is None:
+            # Résumé absent ou périmé (fichiers modifiés hors de l'application): recompte complet
+            counts = read_profile(profile_name, factory=count_statuses, cache=False)
+            _store_stats(profile_name, counts)
+        return counts
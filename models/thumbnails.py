@@ -0,0 +1,157 @@
+"""
+Screenshot derivatives for the Trading Dashboard Pro application.
+Every stored screenshot gets WebP images at fixed sizes (THUMBNAIL_SIZES: a
+thumbnail and a medium preview), stored next to the original blob as
+<hash>.<variant>.webp. Views display them instead of the full image, which
+is only read on demand. Derivatives are made on upload, on first access for
+older screenshots, or for all of them at once by backfill_derivatives
+(python -m models.thumbnails).
+"""
+import os
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from PIL import Image
+
+from config.settings import THUMBNAIL_SIZES, THUMBNAIL_QUALITY, STATS_MAX_WORKERS
+from models.blobs import get_blob_path, read_blob, iter_blobs
+from utils.fileio import atomic_write_bytes
+
+DERIVATIVE_EXTENSION = ".webp"
+
+
+def get_derivative_path(blob_hash, variant):
+    """
+    Get the file path of a derivative image
+
+    Args:
+        blob_hash (str): Hex SHA-256 digest of the original image
+        variant (str): Name of the size in THUMBNAIL_SIZES
+
+    Returns:
+        str: Path next to the original blob
+    """
+    return f"{get_blob_path(blob_hash)}.{variant}{DERIVATIVE_EXTENSION}"
+
+
+def make_derivatives(payload, variants=None):
+    """
+    Encode the derivative images of an image
+
+    Args:
+        payload (bytes): Original image content
+        variants (iterable, optional): Sizes to make. Default is all.
+
+    Returns:
+        dict: {variant: WebP bytes}
+
+    Raises:
+        OSError: If the payload is not a readable image
+    """
+    with Image.open(BytesIO(payload)) as image:
+        image.load()
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+        derivatives = {}
+        for variant in variants or THUMBNAIL_SIZES:
+            resized = image.copy()
+            # Réduction seulement, proportions conservées
+            resized.thumbnail(THUMBNAIL_SIZES[variant], Image.LANCZOS)
+            buffered = BytesIO()
+            resized.save(buffered, format="WEBP", quality=THUMBNAIL_QUALITY, method=4)
+            derivatives[variant] = buffered.getvalue()
+    return derivatives
+
+
+def ensure_derivatives(blob_hash, payload=None):
+    """
+    Make and store the missing derivative images of a blob
+
+    Args:
+        blob_hash (str): Hex SHA-256 digest of the original image
+        payload (bytes, optional): Original content, when already in memory
+
+    Returns:
+        int: Number of derivatives written (0 if none was missing or the
+            blob is not an image)
+    """
+    missing = [v for v in THUMBNAIL_SIZES if not os.path.exists(get_derivative_path(blob_hash, v))]
+    if not missing:
+        return 0
+    try:
+        derivatives = make_derivatives(payload if payload is not None else read_blob(blob_hash), missing)
+    except OSError as e:
+        print(f"WARNING: Could not make derivatives of blob {blob_hash}: {e}")
+        return 0
+    return store_derivatives(blob_hash, derivatives)
+
+
+def store_derivatives(blob_hash, derivatives):
+    """
+    Store derivative images made by make_derivatives
+
+    Args:
+        blob_hash (str): Hex SHA-256 digest of the original image
+        derivatives (dict): {variant: WebP bytes}
+
+    Returns:
+        int: Number of derivatives written
+    """
+    for variant, content in derivatives.items():
+        # Reconstructible à partir de l'original: pas besoin de fsync
+        atomic_write_bytes(get_derivative_path(blob_hash, variant), content, fsync=False)
+    return len(derivatives)
+
+
+def read_derivative(blob_hash, variant):
+    """
+    Read a derivative image, making it first if needed
+
+    Args:
+        blob_hash (str): Hex SHA-256 digest of the original image
+        variant (str): Name of the size in THUMBNAIL_SIZES
+
+    Returns:
+        bytes: WebP content, or None if the blob is not a readable image
+    """
+    path = get_derivative_path(blob_hash, variant)
+    if not os.path.exists(path):
+        ensure_derivatives(blob_hash)
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def backfill_derivatives(max_workers=STATS_MAX_WORKERS):
+    """
+    Make the missing derivatives of every stored image, in a worker pool
+
+    Args:
+        max_workers (int, optional): Number of images processed concurrently
+
+    Returns:
+        dict: Numbers of blobs checked and of derivatives written
+    """
+    blob_hashes = list(iter_blobs())
+    written = 0
+    # Pillow libère le GIL pendant le décodage, le redimensionnement et l'encodage
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="thumbnails") as pool:
+        for count in pool.map(ensure_derivatives, blob_hashes):
+            written += count
+    print(f"Backfilled {written} derivatives for {len(blob_hashes)} blobs")
+    return {"blobs": len(blob_hashes), "written": written}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Génère les miniatures et aperçus manquants des captures d'écran."
+    )
+    parser.add_argument("--workers", type=int, default=STATS_MAX_WORKERS,
+                        help="nombre d'images traitées en parallèle")
+    args = parser.parse_args()
+
+    result = backfill_derivatives(max_workers=args.workers)
+    print(f"Images vérifiées: {result['blobs']}, dérivées créées: {result['written']}")
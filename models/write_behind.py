@@ -0,0 +1,214 @@
+"""
+Write-behind persistence for the Trading Dashboard Pro application.
+Profile saves requested by the views are queued and coalesced per profile; a
+background thread writes each dirty profile once it has been idle for a short
+debounce delay, so a burst of clicks costs a single disk write.
+"""
+import time
+import atexit
+import threading
+
+from config.settings import WRITE_BEHIND_DELAY, WRITE_BEHIND_MAX_DELAY
+from models.storage import copy_profile, write_profile, merge_entry
+
+# Profils en attente d'écriture: {profile: (data, first_queued_at, last_queued_at)}
+_pending = {}
+
+# Profils en cours d'écriture par le thread de fond
+_in_flight = set()
+
+_condition = threading.Condition()
+_thread = None
+
+# Compteurs d'activité
+_stats = {"queued": 0, "written": 0, "failed": 0}
+
+
+def _is_due(entry, now):
+    _, first_queued_at, last_queued_at = entry
+    return (now - last_queued_at >= WRITE_BEHIND_DELAY
+            or now - first_queued_at >= WRITE_BEHIND_MAX_DELAY)
+
+
+def _write(profile_name, data):
+    try:
+        write_profile(profile_name, data)
+        _stats["written"] += 1
+        return True
+    except Exception as e:
+        print(f"ERROR writing profile '{profile_name}' in background: {e}")
+        _stats["failed"] += 1
+        return False
+
+
+def _coalesce(snapshot, previous):
+    """
+    Carry the unsaved changes of an older queued state over to a newer one
+
+    Both may come from different sessions: keys changed by both are merged
+    field by field (see merge_entry), the newer state winning conflicts,
+    which are reported on it.
+    """
+    if not (hasattr(snapshot, "base") and hasattr(previous, "base")):
+        return
+    base = dict(snapshot.base)
+    for key in previous.dirty:
+        older = previous.to_dict([key]).get(key)
+        if key in snapshot.dirty:
+            value, clashes = merge_entry(base.get(key), snapshot.to_dict([key]).get(key), older)
+            if clashes:
+                snapshot.conflicts.append(f"{key} ({', '.join(clashes)})")
+        else:
+            value = older
+        if value is not None:
+            snapshot[key] = value
+        elif key in snapshot:
+            del snapshot[key]
+    # L'état de départ le plus ancien sert de base à la fusion avec le stockage
+    snapshot.base = {**base, **previous.base}
+
+
+def _run():
+    """Background loop: write every profile whose debounce delay has elapsed"""
+    while True:
+        with _condition:
+            now = time.monotonic()
+            waiting = {name: entry for name, entry in _pending.items() if name not in _in_flight}
+            due = [name for name, entry in waiting.items() if _is_due(entry, now)]
+            if not due:
+                if waiting:
+                    next_due = min(
+                        min(last + WRITE_BEHIND_DELAY, first + WRITE_BEHIND_MAX_DELAY)
+                        for _, first, last in waiting.values()
+                    )
+                    _condition.wait(max(0.0, next_due - now))
+                else:
+                    _condition.wait()
+                continue
+
+            batch = [(name, _pending.pop(name)) for name in due]
+            _in_flight.update(due)
+
+        for profile_name, entry in batch:
+            if not _write(profile_name, entry[0]):
+                # Réessayer plus tard, sauf si une version plus récente attend déjà
+                with _condition:
+                    newer = _pending.get(profile_name)
+                    if newer is None:
+                        _pending[profile_name] = (entry[0], entry[1], time.monotonic())
+                    elif hasattr(newer[0], "base"):
+                        # L'état en attente est partagé (get_pending_profile): fusion
+                        # dans une copie, qui le remplace
+                        merged = newer[0].copy()
+                        _coalesce(merged, entry[0])
+                        _pending[profile_name] = (merged, newer[1], newer[2])
+
+        with _condition:
+            _in_flight.difference_update(due)
+            _condition.notify_all()
+
+
+def _ensure_thread():
+    global _thread
+    if _thread is None or not _thread.is_alive():
+        _thread = threading.Thread(target=_run, name="profile-write-behind", daemon=True)
+        _thread.start()
+
+
+def queue_profile_save(profile_name, data):
+    """
+    Queue a profile save; repeated saves of the same profile are coalesced
+
+    Args:
+        profile_name (str): Name of the profile
+        data (dict or ProfileData): Profile data (copied, the caller may keep
+            modifying it). The dirty keys of a ProfileData are handed over to
+            the queue and cleared on the caller's object; they are merged
+            with the changes of a save still queued for the profile.
+
+    Returns:
+        bool: True once the save is queued
+    """
+    if hasattr(data, "mark_clean"):
+        snapshot = data.copy()
+        data.mark_clean()
+    else:
+        snapshot = copy_profile(data)
+    now = time.monotonic()
+
+    with _condition:
+        first_queued_at = now
+        if profile_name in _pending:
+            previous, first_queued_at, _ = _pending[profile_name]
+            # Les modifications des sauvegardes fusionnées restent à écrire
+            _coalesce(snapshot, previous)
+        _pending[profile_name] = (snapshot, first_queued_at, now)
+        _stats["queued"] += 1
+        _ensure_thread()
+        _condition.notify_all()
+    return True
+
+
+def get_pending_profile(profile_name):
+    """
+    Get the queued, not yet written state of a profile
+
+    Args:
+        profile_name (str): Name of the profile
+
+    Returns:
+        dict: Queued profile data (shared, must not be modified), or None
+    """
+    with _condition:
+        entry = _pending.get(profile_name)
+        return entry[0] if entry is not None else None
+
+
+def flush_profile_writes(profile_name=None, timeout=None):
+    """
+    Write queued profiles now and wait for background writes in progress
+
+    Acts as a barrier: when it returns True, every save queued before the
+    call is on disk.
+
+    Args:
+        profile_name (str, optional): Profile to flush. Default is all profiles.
+        timeout (float, optional): Maximum time to wait for background writes
+
+    Returns:
+        bool: True if nothing is left pending or in progress
+    """
+    with _condition:
+        # Attendre la fin des écritures en cours pour ne pas les dépasser
+        if profile_name is not None:
+            settled = _condition.wait_for(lambda: profile_name not in _in_flight, timeout)
+        else:
+            settled = _condition.wait_for(lambda: not _in_flight, timeout)
+        if not settled:
+            return False
+
+        names = [profile_name] if profile_name is not None else list(_pending)
+        batch = [(name, _pending.pop(name)) for name in names if name in _pending]
+        _in_flight.update(name for name, _ in batch)
+
+    try:
+        success = all([_write(name, entry[0]) for name, entry in batch])
+    finally:
+        with _condition:
+            _in_flight.difference_update(name for name, _ in batch)
+            _condition.notify_all()
+    return success
+
+
+def get_write_behind_stats():
+    """
+    Get write-behind counters
+
+    Returns:
+        dict: Queued, written and failed saves, plus current pending profiles
+    """
+    with _condition:
+        return dict(_stats, pending=len(_pending), in_flight=len(_in_flight))
+
+
+atexit.register(flush_profile_writes)
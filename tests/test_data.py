@@ -6,13 +6,88 @@ import json
 import os
 import tempfile
 import shutil
+import sys
+import time
+import importlib
+import io
+import threading
 from unittest.mock import patch
 
 # Importation du module à tester
 from trading_dashboard_pro.models.data import (
-    get_config_id, is_tested, is_improved, has_note, has_screenshots,
-    toggle_tested, toggle_improved, get_params, save_params
+    get_config_id, is_tested, is_improved, has_note, has_screenshots, delete_screenshot,
+    toggle_tested, toggle_improved, get_params, save_params,
+    load_profile_data, save_profile_data, save_note, save_screenshot,
+    get_screenshots, get_profile_stats, queue_profile_save, flush_profile_writes,
+    ProfileData, export_profile_data, export_profile_to_file,
+    import_profile_stream, import_profile_file, get_status_flags, apply_bulk, select_configs
 )
+from trading_dashboard_pro.models.profile_stats import iter_profile_stats, collect_profile_stats
+from trading_dashboard_pro.models.coverage import CoverageCube
+from trading_dashboard_pro.models.params import (
+    parse_param_column, ParamTable, param_percentiles, param_histogram, param_outliers
+)
+from trading_dashboard_pro.models.provisioning import parse_provisioning_csv, provision_from_csv
+from trading_dashboard_pro.models.image_service import (
+    submit_upload, get_image_service_stats, shutdown_image_service
+)
+
+def _module_of(func):
+    """Retourne le module réellement utilisé par une fonction importée"""
+    return sys.modules[func.__module__]
+
+TEST_PROFILE = {
+    "BTC/USD_1h": {
+        "tested": True,
+        "note": "Note",
+        "params": {"ADX Length": "14"},
+        "screenshots": [{"date": "", "description": "", "blob": "abc", "size": 1}]
+    },
+    "ETH/USD_4h": {"improved": True, "note": ""},
+    "_custom_assets": ["PEPE/USD"]
+}
+
+def copy_of(data):
+    """Copie profonde de données de test"""
+    return json.loads(json.dumps(data))
+
+class ProfileStorageTestCase(unittest.TestCase):
+    """Base des tests qui stockent des profils dans un dossier temporaire"""
+    
+    # Profils retirés du cache après chaque test
+    PROFILES = ("alice", "bob")
+    # Redirige aussi CONFIG_FILE; les profils sont alors dans tmp_dir/profiles
+    WITH_CONFIG = False
+    # Mode de stockage imposé aux profils JSON (None: celui de la configuration)
+    STORAGE_MODE = "journal"
+    
+    def setUp(self):
+        """Redirige le dossier des profils vers un dossier temporaire"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.storage = _module_of(load_profile_data.__globals__['read_profile'])
+        self.auth = _module_of(load_profile_data.__globals__['get_profile_path'])
+        self.catalog = _module_of(self.storage.update_catalog_entry)
+        self.profiles_dir = os.path.join(self.tmp_dir, "profiles") if self.WITH_CONFIG else self.tmp_dir
+        self.config_file = os.path.join(self.tmp_dir, "app_config.json")
+        self.start_patch(patch.object(self.auth, "PROFILES_DIR", self.profiles_dir))
+        if self.WITH_CONFIG:
+            self.start_patch(patch.object(self.auth, "CONFIG_FILE", self.config_file))
+        if self.STORAGE_MODE:
+            self.start_patch(patch.object(self.storage, "PROFILE_STORAGE_MODE", self.STORAGE_MODE))
+    
+    def start_patch(self, patcher):
+        """Démarre un patch, arrêté après le nettoyage du test"""
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        flush_profile_writes()
+        self.catalog.flush_catalog()
+        for name in self.PROFILES:
+            self.storage.invalidate_cached_profile(name)
+        self.storage._stats.clear()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
 
 class TestDataFunctions(unittest.TestCase):
     """Tests unitaires pour les fonctions du module data.py"""
@@ -175,5 +250,1608 @@ class TestDataFunctions(unittest.TestCase):
         updated_data = save_params("XRP", "1d", new_params, self.test_data.copy())
         self.assertEqual(updated_data["XRP_1d"]["params"], new_params)
 
+class TestStatusIndex(unittest.TestCase):
+    """Tests de l'index des statuts actif × unité de temps"""
+    
+    def test_flags_match_cell_functions(self):
+        """Les drapeaux de l'index correspondent aux fonctions par cellule"""
+        from trading_dashboard_pro.models.status_index import (
+            STATUS_TESTED, STATUS_IMPROVED, STATUS_NOTE, STATUS_SCREENSHOTS
+        )
+        assets, timeframes = ["BTC/USD", "ETH/USD", "INCONNU"], ["1h", "4h"]
+        flags = get_status_flags(assets, timeframes, TEST_PROFILE)
+        self.assertEqual(flags.dtype.name, "uint8")
+        self.assertEqual(flags.shape, (3, 2))
+        self.assertEqual(flags[0, 0], STATUS_TESTED | STATUS_NOTE | STATUS_SCREENSHOTS)
+        self.assertEqual(flags[1, 1], STATUS_IMPROVED)
+        for row, asset in enumerate(assets):
+            for column, tf in enumerate(timeframes):
+                self.assertEqual(bool(flags[row, column] & STATUS_TESTED), is_tested(asset, tf, TEST_PROFILE))
+                self.assertEqual(bool(flags[row, column] & STATUS_NOTE), has_note(asset, tf, TEST_PROFILE))
+    
+    def test_mutations_update_index_incrementally(self):
+        """Les modifications mettent l'index à jour sans le reconstruire"""
+        data = ProfileData.from_dict(copy_of(TEST_PROFILE))
+        index = data.status_index
+        toggle_tested("BTC/USD", "1h", data)
+        toggle_improved("PEPE/USD", "1d", data)
+        save_note("ETH/USD", "4h", "Note", data)
+        
+        self.assertIs(data.status_index, index)
+        rebuilt = ProfileData.from_dict(data.to_dict()).status_index
+        assets = ["BTC/USD", "ETH/USD", "PEPE/USD"]
+        self.assertEqual(index.block(assets).tolist(), rebuilt.block(assets).tolist())
+        self.assertEqual(index.get("BTC/USD", "1h") & 1, 0)
+        
+        copied = data.copy()
+        toggle_tested("ETH/USD", "4h", copied)
+        self.assertNotEqual(copied.status_index.get("ETH/USD", "4h"), index.get("ETH/USD", "4h"))
+
+class TestJournaledStorage(ProfileStorageTestCase):
+    """Tests du stockage journalisé des profils"""
+    
+    def setUp(self):
+        """Crée un profil vide"""
+        super().setUp()
+        self.storage.write_snapshot("alice", {})
+    
+    def _read_snapshot(self):
+        with open(self.storage.get_profile_path("alice"), 'r') as f:
+            return json.load(f)
+    
+    def test_mutations_are_appended_to_journal(self):
+        """Une modification n'ajoute qu'une ligne au journal, sans réécrire le snapshot"""
+        data = load_profile_data("alice")
+        data, _ = toggle_tested("BTC", "1h", data)
+        save_note("BTC", "1h", "Note", data)
+        self.assertTrue(save_profile_data("alice", data))
+        
+        data, _ = toggle_improved("ETH", "4h", data)
+        self.assertTrue(save_profile_data("alice", data))
+        
+        self.assertEqual(self._read_snapshot(), {})
+        with open(self.storage.get_journal_path("alice"), 'r') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 2)
+        self.assertEqual([c["key"] for c in lines[1]["changes"]], ["ETH_4h"])
+        
+        self.storage.invalidate_cached_profile("alice")
+        reloaded = load_profile_data("alice")
+        self.assertTrue(is_tested("BTC", "1h", reloaded))
+        self.assertTrue(has_note("BTC", "1h", reloaded))
+        self.assertTrue(is_improved("ETH", "4h", reloaded))
+    
+    def test_compaction_folds_journal_into_snapshot(self):
+        """La compaction replie le journal dans le snapshot"""
+        data = load_profile_data("alice")
+        data, _ = toggle_tested("BTC", "1h", data)
+        save_profile_data("alice", data)
+        
+        self.assertTrue(self.storage.compact_journal("alice"))
+        self.assertFalse(os.path.exists(self.storage.get_journal_path("alice")))
+        self.assertTrue(self._read_snapshot()["BTC_1h"]["tested"])
+        self.assertEqual(load_profile_data("alice"), data)
+
+class TestStatsSummary(ProfileStorageTestCase):
+    """Tests du résumé de statuts maintenu à chaque écriture"""
+    
+    def setUp(self):
+        """Crée le profil de test"""
+        super().setUp()
+        self.storage.write_snapshot("alice", copy_of(TEST_PROFILE))
+    
+    def _stats_without_loading(self):
+        self.storage._stats.clear()
+        self.storage.invalidate_cached_profile("alice")
+        with patch.object(self.storage, "read_json_profile", side_effect=AssertionError("profile loaded")):
+            return get_profile_stats("alice")
+    
+    def test_stats_read_from_summary(self):
+        """Les statistiques sont lues dans le résumé, sans charger le profil"""
+        stats = self._stats_without_loading()
+        self.assertEqual(stats["total_configs"], 3)
+        self.assertEqual(stats["configs_tested"], 1)
+        self.assertEqual(stats["configs_with_screenshots"], 1)
+    
+    def test_summary_follows_journaled_writes(self):
+        """Le résumé est mis à jour à chaque écriture et reste exact"""
+        data = load_profile_data("alice")
+        toggle_tested("BTC/USD", "1h", data)
+        toggle_tested("SOL/USD", "1d", data)
+        save_note("ETH/USD", "4h", "Note", data)
+        self.assertTrue(save_profile_data("alice", data))
+        del data["ETH/USD_4h"]
+        self.assertTrue(save_profile_data("alice", data))
+        
+        stats = self._stats_without_loading()
+        expected = self.storage.count_statuses(data.to_dict())
+        self.assertEqual(
+            (stats["total_configs"], stats["configs_tested"], stats["configs_with_notes"]),
+            (expected["total"], expected["tested"], expected["with_notes"])
+        )
+        self.assertEqual((stats["configs_tested"], stats["configs_with_notes"]), (1, 1))
+    
+    def test_stale_summary_triggers_recount(self):
+        """Un profil modifié hors de l'application est recompté"""
+        get_profile_stats("alice")
+        time.sleep(0.01)
+        with open(self.storage.get_profile_path("alice"), 'w') as f:
+            json.dump({"BTC/USD_1h": {"tested": True}, "ETH/USD_1h": {"tested": True, "note": "x"}}, f)
+        
+        stats = get_profile_stats("alice")
+        self.assertEqual((stats["total_configs"], stats["configs_tested"]), (2, 2))
+
+class TestParallelStats(unittest.TestCase):
+    """Tests du calcul parallèle des statistiques de plusieurs profils"""
+    
+    def test_stats_of_every_profile(self):
+        """Chaque profil reçoit ses statistiques, quel que soit l'ordre de fin"""
+        delays = {"alice": 0.05, "bob": 0.0, "carol": 0.02}
+        
+        def slow_stats(profile_name):
+            time.sleep(delays[profile_name])
+            return {"total_configs": len(profile_name)}
+        
+        results = list(iter_profile_stats(list(delays), max_workers=3, stats_func=slow_stats))
+        self.assertEqual(results[0][0], "bob")
+        self.assertEqual({name: stats for name, stats, _ in results},
+                         {name: {"total_configs": len(name)} for name in delays})
+    
+    def test_timeout_and_errors_do_not_block(self):
+        """Un profil trop lent ou en erreur n'empêche pas les autres d'aboutir"""
+        release = threading.Event()
+        
+        def stats(profile_name):
+            if profile_name == "slow":
+                release.wait(5)
+            if profile_name == "broken":
+                raise ValueError("profil corrompu")
+            return {"total_configs": 1}
+        
+        start = time.monotonic()
+        try:
+            results = {name: (stats, error) for name, stats, error in iter_profile_stats(
+                ["slow", "broken", "ok"], max_workers=2, timeout=0.2, stats_func=stats
+            )}
+        finally:
+            release.set()
+        
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(results["ok"], ({"total_configs": 1}, None))
+        self.assertIsNone(results["slow"][0])
+        self.assertIn("Délai", results["slow"][1])
+        self.assertEqual(results["broken"], (None, "profil corrompu"))
+    
+    def test_hung_worker_is_replaced(self):
+        """Un calcul bloqué libère sa place: les profils en attente ne subissent pas son retard"""
+        release = threading.Event()
+        
+        def stats(profile_name):
+            if profile_name == "hung":
+                release.wait(5)
+            return {"total_configs": 1}
+        
+        start = time.monotonic()
+        try:
+            results = {name: error for name, _, error in iter_profile_stats(
+                ["hung", "a", "b", "c"], max_workers=1, timeout=0.2, stats_func=stats
+            )}
+        finally:
+            release.set()
+        
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertIn("Délai", results["hung"])
+        self.assertEqual({name: results[name] for name in "abc"}, dict.fromkeys("abc"))
+    
+    def test_collect_keeps_profile_order(self):
+        """Le résultat groupé suit l'ordre des profils demandés"""
+        results = collect_profile_stats(["b", "a"], stats_func=lambda name: {"name": name})
+        self.assertEqual(list(results), ["b", "a"])
+        self.assertEqual(results["a"], {"name": "a"})
+
+class TestCoverageCube(ProfileStorageTestCase):
+    """Tests du cube de couverture profils × actifs × unités de temps"""
+    
+    def setUp(self):
+        """Crée deux profils et leur cube de couverture"""
+        super().setUp()
+        self.storage.write_snapshot("alice", {
+            "BTC/USD_1h": {"tested": True}, "BTC/USD_4h": {"tested": True}, "EUR/USD_1h": {"improved": True}
+        })
+        self.storage.write_snapshot("bob", {"BTC/USD_1h": {"tested": True}})
+        self.cube = CoverageCube.build(["alice", "bob"])
+    
+    def test_cube_counts(self):
+        """Le cube compte les profils par cellule et par unité de temps"""
+        status = _module_of(CoverageCube).STATUS_TESTED
+        counts = self.cube.cell_counts(status)
+        btc = self.cube.assets.index("BTC/USD")
+        self.assertEqual(counts[btc, self.cube.timeframes.index("1h")], 2)
+        self.assertEqual(counts[btc, self.cube.timeframes.index("4h")], 1)
+        self.assertEqual(int(counts.sum()), 3)
+        self.assertNotIn(("BTC/USD", "1h"), self.cube.uncovered_cells(status))
+        self.assertIn(("EUR/USD", "1h"), self.cube.uncovered_cells(status))
+    
+    def test_category_coverage_and_ranking(self):
+        """Couverture par catégorie et classement des profils par unité de temps"""
+        names, percentages = self.cube.category_coverage()
+        crypto = _module_of(CoverageCube).ASSET_CATEGORIES["crypto"]
+        row = names.index(crypto["name"])
+        column = self.cube.timeframes.index("1h")
+        self.assertAlmostEqual(percentages[row, column], 100.0 * 2 / (2 * len(crypto["assets"])))
+        
+        top = self.cube.top_profiles()
+        self.assertEqual(top["1h"], [("alice", 1), ("bob", 1)])
+        self.assertEqual(top["4h"], [("alice", 1)])
+        self.assertEqual(top["1d"], [])
+
+    def test_build_does_not_fill_profile_cache(self):
+        """Les analyses sur tous les profils n'entrent pas dans le cache des sessions"""
+        profile_cache = _module_of(self.storage.get_cached_profile)
+        profile_cache.clear_profile_cache()
+        CoverageCube.build(["alice", "bob"])
+        ParamTable.build(["alice", "bob"])
+        self.assertEqual(profile_cache.get_profile_cache_stats()["entries"], 0)
+
+        # Un profil déjà en cache est lu sans devenir le plus récent
+        load_profile_data("alice")
+        load_profile_data("bob")
+        CoverageCube.build(["alice"])
+        self.assertEqual(list(profile_cache._cache._entries), ["alice", "bob"])
+
+class TestParamColumns(unittest.TestCase):
+    """Tests du schéma typé et de l'analyse en colonnes des paramètres"""
+    
+    def test_parse_by_type(self):
+        """Chaque type est converti en bloc, NaN pour les valeurs non conformes"""
+        ints = parse_param_column("int", ["14", " 3 ", "2.5", "abc", ""])
+        self.assertEqual(ints[:2].tolist(), [14.0, 3.0])
+        self.assertTrue(all(v != v for v in ints[2:]))
+        self.assertEqual(parse_param_column("float", ["0,5", "1.25"]).tolist(), [0.5, 1.25])
+        colors = parse_param_column("color", ["#00FF00", "#ff0000", "#GG0000", "#1234567"])
+        self.assertEqual(colors[:2].tolist(), [0x00FF00, 0xFF0000])
+        self.assertTrue(all(v != v for v in colors[2:]))
+        self.assertEqual(parse_param_column("bool", ["Yes", "No"]).tolist(), [1.0, 0.0])
+    
+    def test_distribution_analytics(self):
+        """Percentiles, histogramme et valeurs atypiques par actif et unité de temps"""
+        rows = [(f"p{i}", "BTC/USD", "1h", {"ADX Length": str(14 + i % 3)}) for i in range(9)]
+        rows.append(("outlier", "BTC/USD", "1h", {"ADX Length": "200"}))
+        rows.append(("other", "ETH/USD", "4h", {"ADX Length": "x", "Lookback Window": "50"}))
+        table = ParamTable.from_rows(rows)
+        
+        percentiles = param_percentiles(table, "ADX Length", percentiles=(50,))
+        self.assertEqual(percentiles.loc[("BTC/USD", "1h"), "count"], 10)
+        self.assertEqual(percentiles.loc[("BTC/USD", "1h"), "p50"], 15.0)
+        self.assertNotIn(("ETH/USD", "4h"), percentiles.index)
+        
+        counts, _ = param_histogram(table, "ADX Length", bins=4, asset="BTC/USD")
+        self.assertEqual(counts.tolist(), [9, 0, 0, 1])
+        
+        outliers = param_outliers(table, "ADX Length")
+        self.assertEqual(outliers["profile"].tolist(), ["outlier"])
+    
+    def test_import_reports_mistyped_params(self):
+        """L'import signale les valeurs non conformes au schéma, sans les rejeter"""
+        validate = _module_of(import_profile_stream).validate_config_record
+        record, messages = validate("BTC/USD_1h", {"params": {"ADX Length": "quatorze"}})
+        self.assertEqual(record["params"]["ADX Length"], "quatorze")
+        self.assertTrue(any("ADX Length" in m for m in messages))
+
+class TestProfileCatalog(ProfileStorageTestCase):
+    """Tests du catalogue des profils maintenu à chaque écriture"""
+    
+    PROFILES = ("alice", "bob", "\u00e9lise")
+    WITH_CONFIG = True
+    
+    def setUp(self):
+        """Part d'une configuration sans profil"""
+        super().setUp()
+        self.app_config = {"profiles": []}
+    
+    def test_catalog_follows_profile_lifecycle(self):
+        """Création, sauvegarde et suppression mettent le catalogue à jour"""
+        self.auth.create_profile("alice", self.app_config, is_super_admin=True)
+        self.auth.create_profile("bob", self.app_config)
+        data = load_profile_data("alice")
+        toggle_tested("BTC/USD", "1h", data)
+        toggle_tested("ETH/USD", "1h", data)
+        self.assertTrue(save_profile_data("alice", data))
+        self.catalog.record_login("bob")
+        self.auth.delete_profile("bob", self.app_config)
+        self.auth.create_profile("bob", self.app_config)
+        
+        with patch.object(self.storage, "read_json_profile", side_effect=AssertionError("profile loaded")):
+            profiles = {p["name"]: p for p in self.auth.list_profiles()}
+        self.assertEqual(list(profiles), ["alice", "bob"])
+        self.assertEqual(profiles["alice"]["configs"], 2)
+        self.assertTrue(profiles["alice"]["is_super_admin"])
+        self.assertIsNotNone(profiles["alice"]["created_at"])
+        self.assertEqual(profiles["alice"]["size"], self.storage.get_profile_size("alice"))
+        self.assertIsNone(profiles["bob"]["last_login"])
+    
+    def test_rebuild_after_drift(self):
+        """La reconstruction retrouve les profils et conserve les métadonnées"""
+        self.auth.create_profile("alice", self.app_config)
+        self.catalog.record_login("alice")
+        last_login = self.catalog.read_catalog()["alice"]["last_login"]
+        os.makedirs(os.path.dirname(self.auth.get_profile_path("bob")), exist_ok=True)
+        with open(self.auth.get_profile_path("bob"), 'w') as f:
+            json.dump({"BTC/USD_1h": {"tested": True}}, f)
+        
+        entries = self.catalog.rebuild_catalog()
+        self.assertEqual(sorted(entries), ["alice", "bob"])
+        self.assertEqual(entries["bob"]["configs"], 1)
+        self.assertEqual(entries["alice"]["last_login"], last_login)
+        
+        os.remove(self.auth.get_catalog_path())
+        self.assertEqual(sorted(self.catalog.read_catalog()), ["alice", "bob"])
+    
+    def test_writes_refresh_catalog_in_batches(self):
+        """Les sauvegardes ne réécrivent pas le catalogue: il est rafraîchi par lots"""
+        self.auth.create_profile("alice", self.app_config)
+        self.auth.create_profile("bob", self.app_config)
+        catalog_path = self.auth.get_catalog_path()
+        with patch.object(self.catalog, "_store_entries", side_effect=AssertionError("catalog written")):
+            for name in ("alice", "bob"):
+                data = load_profile_data(name)
+                toggle_tested("BTC/USD", "1h", data)
+                self.assertTrue(save_profile_data(name, data))
+        with open(catalog_path) as f:
+            self.assertEqual(json.load(f)["profiles"]["alice"]["configs"], 0)
+        
+        # Un profil supprimé entre-temps n'est pas réintroduit
+        self.auth.delete_profile("bob", self.app_config)
+        self.assertEqual(self.catalog.read_catalog()["alice"]["configs"], 1)
+        self.assertNotIn("bob", self.catalog.read_catalog())
+        
+        # Lot complet: une seule écriture
+        with patch.object(self.catalog, "CATALOG_REFRESH_BATCH", 1):
+            data = load_profile_data("alice")
+            toggle_tested("ETH/USD", "1h", data)
+            self.assertTrue(save_profile_data("alice", data))
+        with open(catalog_path) as f:
+            self.assertEqual(json.load(f)["profiles"]["alice"]["configs"], 2)
+    
+    def test_equivalent_name_does_not_replace_profile(self):
+        """Un nom équivalent (NFD) à un profil existant est refusé sans toucher à ses données"""
+        nfc, nfd = "\u00e9lise", "e\u0301lise"
+        self.assertTrue(self.auth.create_profile(nfc, self.app_config)[0])
+        data = load_profile_data(nfc)
+        toggle_tested("BTC/USD", "1h", data)
+        self.assertTrue(save_profile_data(nfc, data))
+        
+        success, _, _ = self.auth.create_profile(nfd, self.app_config)
+        self.assertFalse(success)
+        self.assertEqual(list(self.auth.setup_config()["profiles"]), [nfc])
+        self.storage.invalidate_cached_profile(nfc)
+        self.assertTrue(is_tested("BTC/USD", "1h", load_profile_data(nfc)))
+    
+    def test_create_does_not_overwrite_stored_data(self):
+        """Un profil déjà stocké (créé ailleurs entre-temps) n'est pas écrasé"""
+        self.storage.write_snapshot("alice", {"BTC/USD_1h": {"tested": True}})
+        
+        success, _, app_config = self.auth.create_profile("alice", self.app_config)
+        self.assertFalse(success)
+        self.assertNotIn("alice", app_config["profiles"])
+        self.storage.invalidate_cached_profile("alice")
+        self.assertTrue(is_tested("BTC/USD", "1h", load_profile_data("alice")))
+    
+    def test_profile_changes_keep_other_processes_profiles(self):
+        """Créer ou supprimer un profil ne perd pas ceux ajoutés entre-temps ailleurs"""
+        stale_config = self.auth.setup_config()
+        self.auth.create_profile("alice", stale_config)
+        # Profil ajouté par un autre processus, absent de la configuration de la session
+        self.auth.add_profiles_to_config(["bob"])
+        
+        success, _, app_config = self.auth.create_profile("carol", stale_config)
+        self.assertTrue(success)
+        self.assertEqual(list(app_config["profiles"]), ["alice", "bob", "carol"])
+        success, _, app_config = self.auth.delete_profile("alice", stale_config)
+        self.assertTrue(success)
+        self.assertEqual(list(self.auth.setup_config()["profiles"]), ["bob", "carol"])
+
+class TestProfileRegistry(unittest.TestCase):
+    """Tests du registre indexé des profils"""
+    
+    def setUp(self):
+        """Prépare un registre de profils"""
+        self.auth = _module_of(load_profile_data.__globals__['get_profile_path'])
+        self.registry = self.auth.ProfileRegistry(["admin", "bob", "Alice", "alan", "Élodie"])
+    
+    def test_behaves_like_the_list(self):
+        """Appartenance, ordre d'ajout, indexation et comparaison avec une liste"""
+        registry = self.registry
+        self.assertIn("bob", registry)
+        self.assertEqual(registry[0], "admin")
+        registry.append("carl")
+        registry.append("bob")
+        registry.remove("admin")
+        self.assertEqual(registry, ["bob", "Alice", "alan", "Élodie", "carl"])
+        self.assertEqual(registry[0], "bob")
+        with self.assertRaises(ValueError):
+            registry.remove("admin")
+    
+    def test_equivalent_names_are_duplicates(self):
+        """Les noms de même forme normalisée (NFC) désignent le même profil"""
+        registry = self.registry
+        self.assertIn("E\u0301lodie", registry)
+        self.assertFalse(registry.add("E\u0301lodie"))
+        registry.extend(["E\u0301lodie", "dan"])
+        self.assertEqual(len(registry), 6)
+        registry.remove("E\u0301lodie")
+        self.assertNotIn("Élodie", registry)
+    
+    def test_prefix_search_is_paginated(self):
+        """Recherche par préfixe sans casse ni accents composés, page par page"""
+        registry = self.registry
+        self.assertEqual(registry.search("al"), (["alan", "Alice"], 2))
+        self.assertEqual(registry.search("", offset=1, limit=2), (["alan", "Alice"], 5))
+        self.assertEqual(registry.search("e\u0301"), (["Élodie"], 1))
+        
+        # L'index trié suit les modifications
+        registry.add("Alba")
+        registry.remove("alan")
+        self.assertEqual(registry.search("AL"), (["Alba", "Alice"], 2))
+        self.assertEqual(registry.search("zz"), ([], 0))
+    
+    def test_config_round_trip(self):
+        """La configuration enregistrée garde une simple liste de profils"""
+        tmp_dir = tempfile.mkdtemp()
+        config_file = os.path.join(tmp_dir, "app_config.json")
+        try:
+            with patch.object(self.auth, "CONFIG_FILE", config_file), \
+                    patch.object(self.auth, "PROFILES_DIR", os.path.join(tmp_dir, "profiles")):
+                app_config = {"profiles": ["admin"], "theme": {}}
+                self.assertIsInstance(self.auth.get_profile_list(app_config), self.auth.ProfileRegistry)
+                self.auth.get_profile_list(app_config).add("bob")
+                self.auth.save_app_config(app_config)
+                with open(config_file) as f:
+                    self.assertEqual(json.load(f)["profiles"], ["admin", "bob"])
+                self.assertIn("bob", self.auth.setup_config()["profiles"])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+class TestConfigService(unittest.TestCase):
+    """Tests de la configuration servie depuis la mémoire"""
+    
+    def setUp(self):
+        """Crée un fichier de configuration temporaire"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "app_config.json")
+        auth = _module_of(load_profile_data.__globals__['get_profile_path'])
+        self.module = _module_of(auth.ConfigService)
+        self.services = []
+    
+    def tearDown(self):
+        """Arrête les surveillances et nettoie"""
+        for service in self.services:
+            if service._observer is not None:
+                service._observer.stop()
+        shutil.rmtree(self.tmp_dir)
+    
+    def make_service(self):
+        service = self.module.ConfigService(lambda: self.path, {"profiles": [], "theme": "clair"})
+        self.services.append(service)
+        return service
+    
+    def write_externally(self, config):
+        """Modifie le fichier comme un autre processus (écriture atomique)"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(config, f)
+        os.replace(tmp_path, self.path)
+    
+    def wait_for(self, service, key, value):
+        for _ in range(300):
+            if service.get().get(key) == value:
+                return True
+            time.sleep(0.01)
+        return False
+    
+    def test_no_file_access_in_steady_state(self):
+        """Le fichier est créé puis lu une seule fois; nos écritures ne sont pas relues"""
+        service = self.make_service()
+        config = service.get()
+        self.assertEqual(config["theme"], "clair")
+        self.assertTrue(os.path.exists(self.path))
+        
+        config["theme"] = "sombre"
+        service.save(config)
+        # L'événement de notre propre écriture ne coûte qu'une vérification
+        time.sleep(0.2)
+        self.assertIs(service.get(), config)
+        with patch.object(self.module, "file_fingerprint", side_effect=AssertionError("file access")), \
+                patch.object(self.module, "CONFIG_POLL_INTERVAL", 3600):
+            for _ in range(100):
+                self.assertIs(service.get(), config)
+        self.assertEqual(service.get_stats()["reads"], 0)
+    
+    def test_external_change_with_watcher(self):
+        """Une modification externe est détectée par la surveillance du dossier"""
+        if self.module.Observer is None:
+            self.skipTest("watchdog indisponible")
+        service = self.make_service()
+        service.get()
+        self.assertEqual(service.get_stats()["watcher"], "watchdog")
+        self.write_externally({"profiles": ["bob"], "theme": "externe"})
+        self.assertTrue(self.wait_for(service, "theme", "externe"))
+        self.assertEqual(service.get()["profiles"], ["bob"])
+    
+    def test_external_change_with_polling(self):
+        """Sans watchdog, la date de modification est vérifiée périodiquement"""
+        with patch.object(self.module, "CONFIG_WATCHER", False), \
+                patch.object(self.module, "CONFIG_POLL_INTERVAL", 0.05):
+            service = self.make_service()
+            service.get()
+            self.assertEqual(service.get_stats()["watcher"], "mtime")
+            self.write_externally({"profiles": [], "theme": "externe"})
+            self.assertTrue(self.wait_for(service, "theme", "externe"))
+    
+    def test_update_keeps_external_changes(self):
+        """Une mise à jour part de la dernière version du fichier"""
+        with patch.object(self.module, "CONFIG_WATCHER", False), \
+                patch.object(self.module, "CONFIG_POLL_INTERVAL", 3600):
+            service = self.make_service()
+            before = service.get()
+            self.write_externally({"profiles": ["bob"], "theme": "externe"})
+            updated = service.update(lambda config: config["profiles"].append("carl"))
+        self.assertEqual(updated["profiles"], ["bob", "carl"])
+        self.assertEqual(before["profiles"], [])
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {"profiles": ["bob", "carl"], "theme": "externe"})
+
+class TestBulkProvisioning(ProfileStorageTestCase):
+    """Tests de la création de profils en masse depuis un CSV"""
+    
+    CSV = (
+        "name;asset;timeframe;ADX Length\n"
+        "alice;;;\n"
+        "bob;BTC/USD;1h;20\n"
+        "bob;MYCOIN;4h;\n"
+        "carol;BTC/USD;2h;\n"
+        "dave;BTC/USD;1h;abc\n"
+        + "e" * 65 + ";;;\n"
+    )
+    
+    WITH_CONFIG = True
+    
+    def setUp(self):
+        """Part d'une configuration avec les profils admin et alice"""
+        super().setUp()
+        with open(self.config_file, 'w') as f:
+            json.dump({"profiles": ["admin", "alice"]}, f)
+        self.catalog.rebuild_catalog()
+    
+    def test_rows_are_validated(self):
+        """Les lignes invalides sont rejetées avec leur numéro de ligne"""
+        profiles, errors = parse_provisioning_csv(self.CSV)
+        self.assertEqual(list(profiles), ["alice", "bob"])
+        self.assertEqual([line for line, _ in errors], [5, 6, 7])
+        self.assertEqual(profiles["bob"]["BTC/USD_1h"]["params"]["ADX Length"], "20")
+        self.assertEqual(profiles["bob"]["BTC/USD_1h"]["params"]["ADX Level"], "25")
+        self.assertEqual(profiles["bob"]["_custom_assets"], ["MYCOIN"])
+        
+        _, errors = parse_provisioning_csv("name,Inconnu\nalice,1\n")
+        self.assertEqual(errors, [(1, "Colonnes inconnues: Inconnu")])
+    
+    def test_single_config_commit(self):
+        """Profils créés en parallèle, configuration et catalogue écrits une fois"""
+        atomic_writes = []
+        config_service = _module_of(self.auth.ConfigService)
+        write = config_service.atomic_write_json
+        with patch.object(config_service, "atomic_write_json",
+                          side_effect=lambda *a, **k: (atomic_writes.append(a[0]), write(*a, **k))):
+            with patch.object(self.catalog, "_store_entries", wraps=self.catalog._store_entries) as store:
+                report = provision_from_csv(io.BytesIO(self.CSV.encode("utf-8-sig")), max_workers=4)
+        
+        self.assertEqual(report["created"], ["bob"])
+        self.assertEqual(report["skipped"], ["alice"])
+        self.assertEqual(atomic_writes, [self.config_file])
+        self.assertEqual(store.call_count, 1)
+        with open(self.config_file) as f:
+            self.assertEqual(json.load(f)["profiles"], ["admin", "alice", "bob"])
+        self.assertEqual(report["app_config"]["profiles"], ["admin", "alice", "bob"])
+        self.assertEqual(self.catalog.read_catalog()["bob"]["configs"], 3)
+        self.assertTrue(load_profile_data("bob")["MYCOIN_4h"]["params"])
+    
+    def test_stored_profiles_are_not_overwritten(self):
+        """Un profil stocké mais absent de la configuration n'est pas écrasé"""
+        self.storage.write_snapshot("bob", {"ETH/USD_4h": {"tested": True}})
+        report = provision_from_csv(self.CSV)
+        self.assertEqual(report["created"], [])
+        self.assertEqual(report["skipped"], ["alice", "bob"])
+        
+        # Profil apparu entre la vérification et l'écriture: échec signalé
+        provisioning = _module_of(provision_from_csv)
+        with patch.object(provisioning, "list_stored_profiles", return_value=[]):
+            report = provision_from_csv(self.CSV)
+        self.assertEqual(report["failed"], [("bob", "Le profil existe déjà")])
+        self.assertNotIn("bob", report["app_config"]["profiles"])
+        self.storage.invalidate_cached_profile("bob")
+        self.assertEqual(load_profile_data("bob"), {"ETH/USD_4h": {"tested": True}})
+
+class TestShardedLayout(ProfileStorageTestCase):
+    """Tests de la disposition des profils en sous-dossiers et de sa migration"""
+    
+    PROFILES = ("alice", "Bob é", "../evil")
+    
+    def setUp(self):
+        """Redirige le dossier des profils vers un dossier temporaire"""
+        super().setUp()
+        self.sharding = _module_of(self.auth.get_sharded_relpath)
+    
+    def test_paths_are_sharded_and_safe(self):
+        """Deux niveaux de sous-dossiers et des noms de fichiers sans danger"""
+        path = self.auth.get_profile_path("../evil")
+        relative = os.path.relpath(path, self.tmp_dir)
+        self.assertEqual(len(relative.split(os.sep)), 3)
+        self.assertEqual(os.path.basename(path), "%2E%2E%2Fevil.json")
+        self.assertEqual(self.sharding.decode_profile_name("%2E%2E%2Fevil"), "../evil")
+        
+        # Casse distincte même sur un système insensible à la casse
+        self.assertNotEqual(os.path.basename(self.auth.get_profile_path("Alice")).lower(),
+                            os.path.basename(self.auth.get_profile_path("alice")).lower())
+        # Formes Unicode équivalentes: un seul fichier
+        self.assertEqual(self.auth.get_profile_path("e\u0301"), self.auth.get_profile_path("\u00e9"))
+    
+    def test_migration_of_flat_profiles(self):
+        """Les profils à plat sont déplacés avec leur journal, en parallèle"""
+        for name in ("alice", "Bob é"):
+            with open(self.auth.get_flat_profile_path(name), 'w') as f:
+                json.dump({"BTC/USD_1h": {"tested": True}}, f)
+        with open(os.path.join(self.tmp_dir, "alice.journal"), 'w') as f:
+            f.write(json.dumps({"changes": [{"key": "ETH/USD_4h", "value": {"improved": True}}]}) + "\n")
+        
+        report = self.sharding.migrate_flat_profiles(max_workers=2)
+        self.assertEqual(sorted(report["migrated"]), ["Bob é", "alice"])
+        self.assertEqual(self.storage.list_stored_profiles(), ["Bob é", "alice"])
+        self.assertEqual(self.sharding.list_flat_profiles(self.tmp_dir), [])
+        data = load_profile_data("alice")
+        self.assertTrue(is_tested("BTC/USD", "1h", data))
+        self.assertTrue(is_improved("ETH/USD", "4h", data))
+        
+        with open(self.auth.get_flat_profile_path("alice"), 'w') as f:
+            json.dump({}, f)
+        report = self.sharding.migrate_flat_profiles()
+        self.assertEqual(report["skipped"], ["alice"])
+        self.assertTrue(is_tested("BTC/USD", "1h", load_profile_data("alice")))
+
+class TestBulkMutations(ProfileStorageTestCase):
+    """Tests des modifications groupées enregistrées en une seule écriture"""
+    
+    def setUp(self):
+        """Crée le profil de test"""
+        super().setUp()
+        self.storage.write_snapshot("alice", copy_of(TEST_PROFILE))
+    
+    def test_row_marked_in_one_write(self):
+        """Une ligne entière est marquée avec une seule écriture du journal"""
+        data_module = _module_of(apply_bulk)
+        timeframes = ["1h", "4h", "1d"]
+        with patch.object(data_module, "write_profile", wraps=data_module.write_profile) as write:
+            data, changed, success = apply_bulk("alice", select_configs(["BTC/USD"], timeframes), {"tested": True})
+        self.assertTrue(success)
+        self.assertEqual(changed, 2)
+        self.assertEqual(write.call_count, 1)
+        
+        self.storage.invalidate_cached_profile("alice")
+        stored = load_profile_data("alice")
+        self.assertTrue(all(is_tested("BTC/USD", tf, stored) for tf in timeframes))
+        self.assertEqual(stored["BTC/USD_1h"]["note"], "Note")
+    
+    def test_params_and_notes(self):
+        """Paramètres fusionnés et notes effacées sur une sélection"""
+        data = load_profile_data("alice")
+        data, changed, success = apply_bulk(
+            "alice", [("BTC/USD", "1h"), "ETH/USD_4h"],
+            {"params": {"ADX Length": 20}, "clear_note": True}, data
+        )
+        self.assertTrue(success)
+        self.assertEqual(changed, 2)
+        self.assertEqual(get_params("ETH/USD", "4h", data)["ADX Length"], "20")
+        self.assertEqual(get_params("ETH/USD", "4h", data)["ADX Level"], "25")
+        self.assertFalse(has_note("BTC/USD", "1h", data))
+        
+        _, changed, _ = apply_bulk("alice", ["ETH/USD_4h"], {"params": {"ADX Length": "20"}}, data)
+        self.assertEqual(changed, 0)
+        with self.assertRaises(ValueError):
+            apply_bulk("alice", ["ETH/USD_4h"], {"params": {"Inconnu": "1"}}, data)
+        with self.assertRaises(ValueError):
+            apply_bulk("alice", ["ETH/USD_4h"], {"delete": True}, data)
+
+class TestConcurrentWrites(ProfileStorageTestCase):
+    """Tests des écritures concurrentes d'un même profil par plusieurs sessions"""
+    
+    WRITERS = 6
+    SAVES = 10
+    
+    def setUp(self):
+        """Crée le profil de test"""
+        super().setUp()
+        self.storage.write_snapshot("alice", copy_of(TEST_PROFILE))
+    
+    def reload(self):
+        """Relit le profil depuis le disque"""
+        self.storage.invalidate_cached_profile("alice")
+        return load_profile_data("alice")
+    
+    def test_merge_entry(self):
+        """Fusion à trois voies champ par champ, la dernière sauvegarde gagne les conflits"""
+        merge_entry = self.storage.merge_entry
+        base = {"tested": True, "note": "a", "params": {"x": "1", "y": "2"}}
+        mine = {"tested": True, "note": "b", "params": {"x": "1", "y": "3"}}
+        theirs = {"tested": False, "note": "a", "params": {"x": "5", "y": "2"}}
+        self.assertEqual(merge_entry(base, mine, theirs), (
+            {"tested": False, "note": "b", "params": {"x": "5", "y": "3"}}, []
+        ))
+        merged, conflicts = merge_entry(base, mine, dict(theirs, note="c"))
+        self.assertEqual(merged["note"], "b")
+        self.assertEqual(conflicts, ["note"])
+        self.assertEqual(merge_entry(["A", "B"], ["B", "C"], ["A", "B", "D"]), (["B", "D", "C"], []))
+        self.assertEqual(merge_entry(None, None, {"tested": True}), ({"tested": True}, []))
+    
+    def test_sessions_editing_same_config(self):
+        """Deux sessions modifiant des champs différents d'une configuration"""
+        for mode in ("journal", "snapshot"):
+            with self.subTest(mode=mode), patch.object(self.storage, "PROFILE_STORAGE_MODE", mode):
+                first = load_profile_data("alice")
+                second = load_profile_data("alice")
+                
+                first.update_config("BTC/USD_1h", note=f"Note {mode}")
+                second.update_config("BTC/USD_1h", improved=True)
+                second["ETH/USD_4h"] = {"tested": True}
+                self.assertTrue(save_profile_data("alice", first))
+                self.assertTrue(save_profile_data("alice", second))
+                self.assertEqual(second.pop_conflicts(), [])
+                
+                stored = self.reload()
+                self.assertEqual(stored["BTC/USD_1h"]["note"], f"Note {mode}")
+                self.assertTrue(stored["BTC/USD_1h"]["improved"])
+                self.assertTrue(stored["BTC/USD_1h"]["tested"])
+                self.assertEqual(stored["ETH/USD_4h"], {"tested": True})
+                save_profile_data("alice", copy_of(TEST_PROFILE))
+    
+    def test_conflicts_reported_to_saving_session(self):
+        """Un champ modifié par deux sessions est signalé à celle dont la valeur est gardée"""
+        for mode in ("journal", "snapshot"):
+            with self.subTest(mode=mode), patch.object(self.storage, "PROFILE_STORAGE_MODE", mode):
+                first = load_profile_data("alice")
+                second = load_profile_data("alice")
+                first.update_config("BTC/USD_1h", note="Première")
+                second.update_config("BTC/USD_1h", note="Seconde")
+                self.assertTrue(save_profile_data("alice", first))
+                queue_profile_save("alice", second)
+                self.assertTrue(flush_profile_writes("alice"))
+                
+                self.assertEqual(first.pop_conflicts(), [])
+                self.assertEqual(second.pop_conflicts(), ["BTC/USD_1h (note)"])
+                self.assertEqual(second.pop_conflicts(), [])
+                self.assertEqual(self.reload()["BTC/USD_1h"]["note"], "Seconde")
+                save_profile_data("alice", copy_of(TEST_PROFILE))
+    
+    def test_queued_saves_of_two_sessions(self):
+        """Les sauvegardes différées de deux sessions sont fusionnées dans la file"""
+        first = load_profile_data("alice")
+        second = load_profile_data("alice")
+        first.update_config("BTC/USD_1h", params={"ADX Length": "20"})
+        second.update_config("BTC/USD_1h", note="Autre")
+        queue_profile_save("alice", first)
+        queue_profile_save("alice", second)
+        self.assertTrue(flush_profile_writes("alice"))
+        
+        stored = self.reload()
+        self.assertEqual(stored["BTC/USD_1h"]["params"], {"ADX Length": "20"})
+        self.assertEqual(stored["BTC/USD_1h"]["note"], "Autre")
+    
+    def run_writer(self, writer):
+        """Session qui enregistre ses propres modifications, une par sauvegarde"""
+        for i in range(self.SAVES):
+            data = load_profile_data("alice")
+            data.update_config(f"W{writer}/USD_{i}", tested=True, note=f"{writer}-{i}")
+            params = dict(data["BTC/USD_1h"]["params"])
+            params[f"P{writer}"] = str(i)
+            data.update_config("BTC/USD_1h", params=params)
+            if not save_profile_data("alice", data):
+                raise RuntimeError("save failed")
+    
+    def check_no_lost_update(self):
+        """Vérifie que chaque sauvegarde de chaque session est stockée"""
+        stored = self.reload()
+        for writer in range(self.WRITERS):
+            for i in range(self.SAVES):
+                self.assertEqual(stored[f"W{writer}/USD_{i}"]["note"], f"{writer}-{i}")
+            self.assertEqual(stored["BTC/USD_1h"]["params"][f"P{writer}"], str(self.SAVES - 1))
+        self.assertEqual(stored["BTC/USD_1h"]["params"]["ADX Length"], "14")
+        self.assertEqual(len(stored), self.WRITERS * self.SAVES + 3)
+        self.assertEqual(self.storage.read_profile_stats("alice")["total"], len(stored))
+    
+    def test_concurrent_writer_threads(self):
+        """N sessions concurrentes (threads): aucune modification perdue"""
+        errors = []
+        
+        def writer(index):
+            try:
+                self.run_writer(index)
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=writer, args=(w,)) for w in range(self.WRITERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.check_no_lost_update()
+    
+    def test_concurrent_writer_processes(self):
+        """N processus concurrents, synchronisés par le verrou de fichier"""
+        import multiprocessing
+        try:
+            context = multiprocessing.get_context("fork")
+        except ValueError:
+            self.skipTest("fork indisponible")
+        processes = [context.Process(target=self.run_writer, args=(w,)) for w in range(self.WRITERS)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+        self.assertEqual([process.exitcode for process in processes], [0] * self.WRITERS)
+        self.check_no_lost_update()
+
+class TestProfileCache(ProfileStorageTestCase):
+    """Tests du cache de profils partagé entre les sessions"""
+    
+    STORAGE_MODE = None
+    
+    def setUp(self):
+        """Crée le profil de test"""
+        super().setUp()
+        self.profile_cache = _module_of(self.storage.get_cached_profile)
+        self.storage.write_snapshot("alice", copy_of(TEST_PROFILE))
+    
+    def test_sessions_get_independent_copies(self):
+        """Deux sessions partagent le cache sans se corrompre"""
+        before = self.profile_cache.get_profile_cache_stats()["hits"]
+        first = load_profile_data("alice")
+        second = load_profile_data("alice")
+        self.assertEqual(self.profile_cache.get_profile_cache_stats()["hits"] - before, 2)
+        
+        toggle_tested("BTC/USD", "1h", first)
+        first["_custom_assets"].append("DOGE/USD")
+        self.assertTrue(is_tested("BTC/USD", "1h", second))
+        self.assertEqual(load_profile_data("alice"), TEST_PROFILE)
+    
+    def test_external_change_invalidates_entry(self):
+        """Une modification du fichier hors de l'application invalide le cache"""
+        load_profile_data("alice")
+        path = self.storage.get_profile_path("alice")
+        with open(path, 'w') as f:
+            json.dump({"XRP/USD_1d": {"tested": True}}, f)
+        os.utime(path, ns=(0, 0))
+        self.assertEqual(load_profile_data("alice"), {"XRP/USD_1d": {"tested": True}})
+
+class TestProfileData(ProfileStorageTestCase):
+    """Tests du suivi des modifications de ProfileData"""
+    
+    def setUp(self):
+        """Crée le profil de test"""
+        super().setUp()
+        self.storage.write_snapshot("alice", copy_of(TEST_PROFILE))
+    
+    def test_revision_and_dirty_keys(self):
+        """Chaque modification incrémente la révision et marque la configuration"""
+        data = load_profile_data("alice")
+        self.assertIsInstance(data, ProfileData)
+        self.assertEqual((data.revision, data.dirty), (0, set()))
+        
+        toggle_tested("ETH/USD", "4h", data)
+        save_note("ETH/USD", "4h", "Nouvelle note", data)
+        self.assertEqual(data.revision, 2)
+        self.assertEqual(data.dirty, {"ETH/USD_4h"})
+        self.assertEqual(data["ETH/USD_4h"]["note"], "Nouvelle note")
+        self.assertNotIn("tested", ProfileData.from_dict(TEST_PROFILE)["ETH/USD_4h"])
+    
+    def test_copies_share_records_until_modified(self):
+        """Les copies partagent les enregistrements jusqu'à leur modification"""
+        data = load_profile_data("alice")
+        copied = data.copy()
+        self.assertIs(copied["ETH/USD_4h"], data["ETH/USD_4h"])
+        
+        toggle_tested("ETH/USD", "4h", copied)
+        self.assertFalse(is_tested("ETH/USD", "4h", data))
+        self.assertTrue(is_tested("ETH/USD", "4h", copied))
+        self.assertIs(copied["BTC/USD_1h"], data["BTC/USD_1h"])
+    
+    def test_save_writes_only_dirty_configs(self):
+        """La sauvegarde n'écrit que les configurations modifiées"""
+        data = load_profile_data("alice")
+        toggle_improved("BTC/USD", "1h", data)
+        self.assertTrue(save_profile_data("alice", data))
+        self.assertEqual(data.dirty, set())
+        self.assertTrue(save_profile_data("alice", data))
+        
+        with open(self.storage.get_journal_path("alice"), 'r') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 1)
+        self.assertEqual([c["key"] for c in lines[0]["changes"]], ["BTC/USD_1h"])
+        self.assertEqual(set(lines[0]["changes"][0]["set"]), {"improved", "last_modified"})
+        
+        self.storage.invalidate_cached_profile("alice")
+        self.assertEqual(load_profile_data("alice"), data)
+
+class TestWriteBehind(ProfileStorageTestCase):
+    """Tests de l'écriture différée des profils"""
+    
+    STORAGE_MODE = None
+    
+    def setUp(self):
+        """Crée un profil vide et compte les écritures"""
+        super().setUp()
+        self.write_behind = _module_of(queue_profile_save)
+        self.writes = []
+        
+        def counting_write(profile_name, data):
+            self.writes.append(profile_name)
+            return self.storage.write_profile(profile_name, data)
+        
+        self.start_patch(patch.object(self.write_behind, "write_profile", counting_write))
+        self.storage.write_snapshot("alice", {})
+    
+    def test_burst_of_saves_is_one_write(self):
+        """Une rafale de sauvegardes ne produit qu'une écriture"""
+        data = load_profile_data("alice")
+        for timeframe in ["1m", "5m", "15m", "30m", "1h", "4h", "1d", "1w", "1M"]:
+            data, _ = toggle_tested("BTC/USD", timeframe, data)
+            queue_profile_save("alice", data)
+        
+        # Les sessions voient l'état en attente avant même l'écriture
+        self.assertTrue(is_tested("BTC/USD", "1M", load_profile_data("alice")))
+        
+        self.assertTrue(flush_profile_writes("alice"))
+        self.assertEqual(self.writes, ["alice"])
+        self.storage.invalidate_cached_profile("alice")
+        self.assertEqual(load_profile_data("alice"), data)
+    
+    def test_background_write_after_debounce(self):
+        """Le thread de fond écrit le profil après le délai d'inactivité"""
+        with patch.object(self.write_behind, "WRITE_BEHIND_DELAY", 0.01):
+            data, _ = toggle_tested("BTC/USD", "1h", load_profile_data("alice"))
+            queue_profile_save("alice", data)
+            for _ in range(200):
+                if self.writes and not self.write_behind.get_write_behind_stats()["in_flight"]:
+                    break
+                time.sleep(0.01)
+        self.assertEqual(self.writes, ["alice"])
+        self.assertTrue(flush_profile_writes("alice"))
+        self.assertEqual(self.writes, ["alice"])
+    
+    def test_failed_write_does_not_modify_shared_pending_state(self):
+        """Un échec d'écriture fusionne ses modifications sans toucher à l'état partagé en attente"""
+        release = threading.Event()
+        
+        def failing_write(profile_name, data):
+            release.wait(5)
+            raise IOError("disque plein")
+        
+        def wait_for(condition):
+            for _ in range(500):
+                if condition(self.write_behind.get_write_behind_stats()):
+                    return
+                time.sleep(0.01)
+        
+        failed = self.write_behind.get_write_behind_stats()["failed"]
+        with patch.object(self.write_behind, "write_profile", failing_write), \
+                patch.object(self.write_behind, "WRITE_BEHIND_DELAY", 0.01):
+            first, _ = toggle_tested("BTC/USD", "1h", load_profile_data("alice"))
+            queue_profile_save("alice", first)
+            wait_for(lambda stats: stats["in_flight"])
+            second, _ = toggle_tested("ETH/USD", "1h", load_profile_data("alice"))
+            queue_profile_save("alice", second)
+            shared = self.write_behind.get_pending_profile("alice")
+            release.set()
+            wait_for(lambda stats: stats["failed"] > failed)
+        
+        self.assertNotIn("BTC/USD_1h", shared)
+        self.assertTrue(flush_profile_writes("alice"))
+        self.storage.invalidate_cached_profile("alice")
+        data = load_profile_data("alice")
+        self.assertTrue(is_tested("BTC/USD", "1h", data))
+        self.assertTrue(is_tested("ETH/USD", "1h", data))
+
+class TestScreenshotBlobStore(unittest.TestCase):
+    """Tests du stockage des captures d'écran par empreinte"""
+    
+    def setUp(self):
+        """Redirige le stockage des images vers un dossier temporaire"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.blobs = _module_of(save_screenshot.__globals__['put_blob'])
+        self.patch = patch.object(self.blobs, "BLOB_STORE_DIR", self.tmp_dir)
+        self.patch.start()
+        
+        from io import BytesIO
+        from PIL import Image
+        buffered = BytesIO()
+        Image.new("RGB", (4, 3), "red").save(buffered, format="PNG")
+        self.png = buffered.getvalue()
+    
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        self.patch.stop()
+        shutil.rmtree(self.tmp_dir)
+    
+    def test_profile_holds_only_reference(self):
+        """Le profil ne contient que l'empreinte, la taille et les dimensions"""
+        data = save_screenshot("BTC", "1h", self.png, "Capture", {})
+        record = data["BTC_1h"]["screenshots"][0]
+        self.assertNotIn("image_data", record)
+        self.assertEqual(record["size"], len(self.png))
+        self.assertEqual((record["width"], record["height"]), (4, 3))
+        
+        handle = get_screenshots("BTC", "1h", data)[0]
+        self.assertEqual(handle.read_bytes(), self.png)
+    
+    def test_identical_uploads_are_stored_once(self):
+        """Deux envois identiques ne créent qu'un seul fichier"""
+        data = save_screenshot("BTC", "1h", self.png, "A", {})
+        data = save_screenshot("ETH", "4h", self.png, "B", data)
+        stored = [f for _, _, files in os.walk(self.tmp_dir) for f in files if '.' not in f]
+        self.assertEqual(len(stored), 1)
+    
+    def test_legacy_inline_screenshots_still_readable(self):
+        """Les anciennes captures encodées en base64 restent lisibles"""
+        import base64
+        data = {"BTC_1h": {"screenshots": [
+            {"date": "", "description": "", "image_data": base64.b64encode(self.png).decode()}
+        ]}}
+        self.assertEqual(get_screenshots("BTC", "1h", data)[0].read_bytes(), self.png)
+
+class TestScreenshotDerivatives(unittest.TestCase):
+    """Tests des miniatures et aperçus des captures d'écran"""
+    
+    def setUp(self):
+        """Redirige le stockage des images vers un dossier temporaire"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.blobs = _module_of(save_screenshot.__globals__['put_blob'])
+        self.thumbnails = _module_of(save_screenshot.__globals__['ensure_derivatives'])
+        self.patch = patch.object(self.blobs, "BLOB_STORE_DIR", self.tmp_dir)
+        self.patch.start()
+        
+        from io import BytesIO
+        from PIL import Image
+        buffered = BytesIO()
+        Image.new("RGB", (2000, 1000), "blue").save(buffered, format="PNG")
+        self.png = buffered.getvalue()
+    
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        self.patch.stop()
+        shutil.rmtree(self.tmp_dir)
+    
+    def _size_of(self, payload):
+        from io import BytesIO
+        from PIL import Image
+        with Image.open(BytesIO(payload)) as image:
+            return image.format, image.size
+    
+    def test_upload_makes_derivatives(self):
+        """L'envoi crée la miniature et l'aperçu WebP, aux proportions de l'original"""
+        data = save_screenshot("BTC", "1h", self.png, "Capture", {})
+        handle = get_screenshots("BTC", "1h", data)[0]
+        for variant in self.thumbnails.THUMBNAIL_SIZES:
+            self.assertTrue(os.path.exists(self.thumbnails.get_derivative_path(handle.blob_hash, variant)))
+        
+        self.assertEqual(self._size_of(handle.read_thumbnail("thumb")), ("WEBP", (320, 160)))
+        self.assertEqual(self._size_of(handle.read_thumbnail("preview")), ("WEBP", (1024, 512)))
+        self.assertEqual(handle.read_bytes(), self.png)
+    
+    def test_backfill_and_collection(self):
+        """Le rattrapage complète les anciennes captures; le nettoyage suit l'original"""
+        blob_hash = self.blobs.put_blob(self.png)
+        orphan = self.blobs.put_blob(b"pas une image")
+        
+        self.assertEqual(self.thumbnails.backfill_derivatives(max_workers=2),
+                         {"blobs": 2, "written": 2})
+        self.assertEqual(self.thumbnails.backfill_derivatives(max_workers=2)["written"], 0)
+        self.assertIsNone(self.thumbnails.read_derivative(orphan, "thumb"))
+        
+        self.assertEqual(self.blobs.remove_unreferenced_blobs({blob_hash}), 1)
+        self.assertEqual(self.blobs.remove_unreferenced_blobs(set()), 3)
+        self.assertEqual(list(self.blobs.iter_blobs()), [])
+    
+    def test_derivative_made_on_first_display(self):
+        """Une capture importée sans miniature en obtient une au premier affichage"""
+        import base64
+        data = {"BTC_1h": {"screenshots": [
+            {"date": "", "description": "", "image_data": base64.b64encode(self.png).decode()}
+        ]}}
+        inline = get_screenshots("BTC", "1h", data)[0]
+        self.assertEqual(self._size_of(inline.read_thumbnail())[1], (320, 160))
+        
+        _module_of(save_screenshot)._externalize_screenshots(data)
+        handle = get_screenshots("BTC", "1h", data)[0]
+        path = self.thumbnails.get_derivative_path(handle.blob_hash, "thumb")
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(self._size_of(handle.read_thumbnail())[1], (320, 160))
+        self.assertTrue(os.path.exists(path))
+
+class TestImageEncoding(unittest.TestCase):
+    """Tests de la politique d'encodage des captures envoyées"""
+    
+    def _encode(self, image, image_format, **save_args):
+        from io import BytesIO
+        buffered = BytesIO()
+        image.save(buffered, format=image_format, **save_args)
+        return buffered.getvalue()
+    
+    def _chart(self, size=(800, 400)):
+        from PIL import Image, ImageDraw
+        image = Image.new("RGB", size, (19, 23, 34))
+        draw = ImageDraw.Draw(image)
+        for x in range(0, size[0], 20):
+            draw.rectangle([x, 100 + x % 120, x + 10, 250], fill=(38, 166, 154) if x % 40 else (239, 83, 80))
+        return image
+    
+    def test_chart_kept_lossless(self):
+        """Un graphique PNG est stocké sans perte, en WebP, sans métadonnées"""
+        from io import BytesIO
+        from PIL import Image, PngImagePlugin
+        imaging = _module_of(save_screenshot.__globals__['encode_screenshot'])
+        info = PngImagePlugin.PngInfo()
+        info.add_text("Author", "quelqu'un")
+        chart = self._chart()
+        payload, image_format = imaging.encode_screenshot(self._encode(chart, "PNG", pnginfo=info))
+        
+        self.assertEqual(image_format, "WEBP")
+        with Image.open(BytesIO(payload)) as stored:
+            self.assertEqual(stored.format, "WEBP")
+            self.assertNotIn("Author", stored.info)
+            self.assertEqual(stored.convert("RGB").tobytes(), chart.tobytes())
+    
+    def test_jpeg_and_photos_stay_lossy(self):
+        """Une source JPEG ou une photo est stockée en JPEG, orientation EXIF appliquée"""
+        import numpy as np
+        from io import BytesIO
+        from PIL import Image
+        imaging = _module_of(save_screenshot.__globals__['encode_screenshot'])
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotation de 90°
+        source = self._encode(self._chart(), "JPEG", quality=92, exif=exif)
+        payload, image_format = imaging.encode_screenshot(source)
+        self.assertEqual(image_format, "JPEG")
+        with Image.open(BytesIO(payload)) as stored:
+            self.assertEqual(stored.size, (400, 800))
+            self.assertFalse(stored.getexif())
+        
+        noise = np.random.default_rng(0).integers(0, 256, (300, 300, 3), dtype=np.uint8)
+        _, image_format = imaging.encode_screenshot(self._encode(Image.fromarray(noise), "PNG"))
+        self.assertEqual(image_format, "JPEG")
+    
+    def test_size_caps(self):
+        """Les images trop grandes sont réduites et tiennent dans le budget d'octets"""
+        import numpy as np
+        from io import BytesIO
+        from PIL import Image
+        imaging = _module_of(save_screenshot.__globals__['encode_screenshot'])
+        payload, _ = imaging.encode_screenshot(self._encode(self._chart((4000, 2000)), "PNG"),
+                                               {"max_dimension": 1000})
+        with Image.open(BytesIO(payload)) as stored:
+            self.assertEqual(stored.size, (1000, 500))
+        
+        noise = np.random.default_rng(1).integers(0, 256, (1500, 1500, 3), dtype=np.uint8)
+        payload, _ = imaging.encode_screenshot(self._encode(Image.fromarray(noise), "PNG"),
+                                               {"max_bytes": 100 * 1024})
+        self.assertLessEqual(len(payload), 100 * 1024)
+
+class TestImageService(unittest.TestCase):
+    """Tests du traitement des captures envoyées dans des processus séparés"""
+    
+    def setUp(self):
+        """Redirige le stockage des images vers un dossier temporaire"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.blobs = _module_of(save_screenshot.__globals__['put_blob'])
+        self.thumbnails = _module_of(save_screenshot.__globals__['ensure_derivatives'])
+        self.patch = patch.object(self.blobs, "BLOB_STORE_DIR", self.tmp_dir)
+        self.patch.start()
+        
+        from io import BytesIO
+        from PIL import Image
+        buffered = BytesIO()
+        Image.new("RGB", (1200, 600), "navy").save(buffered, format="PNG")
+        self.png = buffered.getvalue()
+    
+    def tearDown(self):
+        """Arrêt des processus et nettoyage après chaque test"""
+        shutdown_image_service()
+        self.patch.stop()
+        shutil.rmtree(self.tmp_dir)
+    
+    def test_upload_processed_in_background(self):
+        """L'image encodée et ses miniatures sont stockées avant la fin du futur"""
+        before = get_image_service_stats()
+        futures = [submit_upload(self.png) for _ in range(3)]
+        self.assertGreater(get_image_service_stats()["queue_depth"], 0)
+        image_bytes = futures[0].result(timeout=60)
+        self.assertTrue(all(f.result(timeout=60) == image_bytes for f in futures))
+        
+        blob_hash = self.blobs.get_blob_hash(image_bytes)
+        self.assertTrue(self.blobs.blob_exists(blob_hash))
+        for variant in self.thumbnails.THUMBNAIL_SIZES:
+            self.assertTrue(os.path.exists(self.thumbnails.get_derivative_path(blob_hash, variant)))
+        
+        data = save_screenshot("BTC", "1h", image_bytes, "Capture", {})
+        self.assertEqual(data["BTC_1h"]["screenshots"][0]["blob"], blob_hash)
+        
+        stats = get_image_service_stats()
+        self.assertEqual(stats["completed"] - before["completed"], 3)
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertIsNotNone(stats["latency_p95_ms"])
+    
+    def test_failed_upload(self):
+        """Un fichier illisible fait échouer le futur sans bloquer le service"""
+        before = get_image_service_stats()
+        with self.assertRaises(OSError):
+            submit_upload(b"pas une image").result(timeout=60)
+        self.assertEqual(get_image_service_stats()["failed"] - before["failed"], 1)
+        self.assertTrue(submit_upload(self.png).result(timeout=60))
+
+class TestImageCache(unittest.TestCase):
+    """Tests du cache partagé des images prêtes à afficher"""
+    
+    def setUp(self):
+        """Redirige le stockage des images et remplace le cache par un cache vide"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.blobs = _module_of(save_screenshot.__globals__['put_blob'])
+        self.image_cache = _module_of(save_screenshot.__globals__['get_cached_image'])
+        self.cache = self.image_cache.ByteBudgetLRU(1024 * 1024)
+        self.patches = [
+            patch.object(self.blobs, "BLOB_STORE_DIR", self.tmp_dir),
+            patch.object(self.image_cache, "_cache", self.cache),
+        ]
+        for p in self.patches:
+            p.start()
+        
+        from io import BytesIO
+        from PIL import Image
+        self.pngs = []
+        for color in ("red", "green", "blue"):
+            buffered = BytesIO()
+            Image.new("RGB", (800, 400), color).save(buffered, format="PNG")
+            self.pngs.append(buffered.getvalue())
+    
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        for p in reversed(self.patches):
+            p.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+    
+    def test_images_read_once(self):
+        """Une image déjà affichée est servie par le cache, même pour l'ancien format"""
+        import base64
+        data = save_screenshot("BTC", "1h", self.pngs[0], "A", {})
+        data["ETH_4h"] = {"screenshots": [
+            {"date": "", "description": "", "image_data": base64.b64encode(self.pngs[1]).decode()}
+        ]}
+        for _ in range(3):
+            thumb = get_screenshots("BTC", "1h", data)[0].read_image("thumb")
+            original = get_screenshots("BTC", "1h", data)[0].read_image()
+            inline = get_screenshots("ETH", "4h", data)[0].read_image("thumb")
+        self.assertEqual(original, self.pngs[0])
+        self.assertEqual(self.cache.stats()["misses"], 3)
+        self.assertEqual(self.cache.stats()["hits"], 6)
+        
+        # Servie sans relire le stockage
+        shutil.rmtree(self.tmp_dir)
+        self.assertEqual(get_screenshots("BTC", "1h", data)[0].read_image("thumb"), thumb)
+        self.assertEqual(get_screenshots("ETH", "4h", data)[0].read_image("thumb"), inline)
+    
+    def test_invalidation_and_budget(self):
+        """Suppression et remplacement d'une capture vident ses entrées; le budget est respecté"""
+        data = save_screenshot("BTC", "1h", self.pngs[0], "A", {})
+        handle = get_screenshots("BTC", "1h", data)[0]
+        handle.read_image("thumb")
+        handle.read_image()
+        self.assertEqual(self.cache.stats()["entries"], 2)
+        
+        data, success = delete_screenshot("BTC", "1h", 0, data)
+        self.assertTrue(success)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+        
+        for png in self.pngs:
+            data = save_screenshot("BTC", "1h", png, "", data)
+            get_screenshots("BTC", "1h", data)[-1].read_image("preview")
+        self.assertEqual(self.cache.stats()["entries"], 2)  # MAX_SCREENSHOTS: la plus ancienne sort
+        
+        self.cache.max_bytes = self.cache.total_bytes + 1
+        get_screenshots("BTC", "1h", data)[0].read_image("thumb")
+        self.assertGreater(self.cache.stats()["evictions"], 0)
+        self.assertLessEqual(self.cache.total_bytes, self.cache.max_bytes)
+
+class TestStaticImages(unittest.TestCase):
+    """Tests de la publication des captures comme fichiers statiques"""
+    
+    def setUp(self):
+        """Redirige le stockage et la publication des images vers un dossier temporaire"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.static_dir = os.path.join(self.tmp_dir, "static")
+        self.blobs = _module_of(save_screenshot.__globals__['put_blob'])
+        self.static_images = _module_of(save_screenshot.__globals__['get_static_image_url'])
+        self.patches = [
+            patch.object(self.blobs, "BLOB_STORE_DIR", os.path.join(self.tmp_dir, "_blobs")),
+            patch.object(self.static_images, "STATIC_DIR", self.static_dir),
+            patch.object(self.static_images, "STATIC_SCREENSHOTS_DIR", os.path.join(self.static_dir, "screenshots")),
+            patch.object(self.static_images, "_published", {}),
+        ]
+        for p in self.patches:
+            p.start()
+        
+        from io import BytesIO
+        from PIL import Image
+        buffered = BytesIO()
+        Image.new("RGB", (800, 400), "orange").save(buffered, format="JPEG")
+        self.jpeg = buffered.getvalue()
+    
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        for p in reversed(self.patches):
+            p.stop()
+        shutil.rmtree(self.tmp_dir)
+    
+    def test_published_once_under_content_name(self):
+        """L'image est écrite une seule fois, sous un nom tiré de son contenu"""
+        data = save_screenshot("BTC", "1h", self.jpeg, "Capture", {})
+        handle = get_screenshots("BTC", "1h", data)[0]
+        for variant, extension in (("thumb", ".webp"), (None, ".jpg")):
+            url = handle.get_image_url(variant)
+            name = f"{handle.blob_hash}.{variant or 'original'}{extension}"
+            self.assertEqual(url, f"app/static/screenshots/{handle.blob_hash[:2]}/{name}?v={handle.blob_hash[:16]}")
+            path = os.path.join(self.static_dir, url[len("app/static/"):].split("?")[0])
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), handle.read_image(variant))
+            # Lien vers le fichier stocké, pas une copie
+            stored = self.blobs.get_blob_path(handle.blob_hash)
+            self.assertTrue(os.path.samefile(path, f"{stored}.thumb.webp" if variant else stored))
+        
+        def read():
+            raise AssertionError("image relue")
+        self.assertEqual(self.static_images.get_static_image_url(handle.blob_hash, "thumb", read),
+                         handle.get_image_url("thumb"))
+        # Après un redémarrage, les fichiers publiés sont retrouvés sans relire l'image
+        self.static_images._published.clear()
+        self.assertEqual(self.static_images.get_static_image_url(handle.blob_hash, None, read),
+                         handle.get_image_url(None))
+        self.assertIsNone(self.static_images.get_static_image_url("0" * 64, None, lambda: b"BM pas servi"))
+    
+    def test_unreferenced_files_removed(self):
+        """Les fichiers publiés d'images qui ne sont plus référencées sont supprimés"""
+        kept = get_screenshots("BTC", "1h", save_screenshot("BTC", "1h", self.jpeg, "", {}))[0]
+        kept.get_image_url("thumb")
+        self.static_images.get_static_image_url("f" * 64, None, lambda: self.jpeg)
+        
+        self.assertEqual(self.static_images.remove_unreferenced_static_images({kept.blob_hash}), 1)
+        self.assertEqual(list(self.static_images._published), [(kept.blob_hash, "thumb")])
+    
+    def test_stale_files_removed(self):
+        """Les fichiers publiés dont l'image n'est plus stockée sont supprimés"""
+        handle = get_screenshots("BTC", "1h", save_screenshot("BTC", "1h", self.jpeg, "", {}))[0]
+        handle.get_image_url("thumb")
+        handle.get_image_url(None)
+        self.assertEqual(self.static_images.remove_stale_static_images(), 0)
+        
+        self.assertEqual(self.blobs.remove_unreferenced_blobs(set()), 3)
+        self.assertEqual(self.static_images.remove_stale_static_images(), 2)
+        self.assertEqual(self.static_images._published, {})
+
+class TestStreamingExport(ProfileStorageTestCase):
+    """Tests de l'export par morceaux des profils"""
+    
+    STORAGE_MODE = None
+    
+    def setUp(self):
+        """Redirige aussi les images vers le dossier temporaire"""
+        super().setUp()
+        blobs = _module_of(save_screenshot.__globals__['put_blob'])
+        self.start_patch(patch.object(blobs, "BLOB_STORE_DIR", os.path.join(self.tmp_dir, "_blobs")))
+        
+        from io import BytesIO
+        from PIL import Image
+        buffered = BytesIO()
+        Image.new("RGB", (4, 3), "red").save(buffered, format="PNG")
+        self.png = buffered.getvalue()
+        
+        data = save_screenshot("BTC/USD", "1h", self.png, "Capture", copy_of(TEST_PROFILE))
+        data["BTC/USD_1h"]["screenshots"].pop(0)
+        self.storage.write_snapshot("alice", data)
+        self.blob_hash = data["BTC/USD_1h"]["screenshots"][0]["blob"]
+    
+    def _export(self, **options):
+        path, filename, _ = export_profile_to_file("alice", directory=self.tmp_dir, **options)
+        return path, filename
+    
+    def test_chunks_match_plain_export(self):
+        """Les morceaux concaténés forment le même JSON que l'export complet"""
+        import base64
+        exported = export_profile_data("alice")
+        data = json.loads(exported)
+        self.assertEqual(exported, json.dumps(data, indent=4))
+        self.assertEqual(data["ETH/USD_4h"], TEST_PROFILE["ETH/USD_4h"])
+        self.assertEqual(base64.b64decode(data["BTC/USD_1h"]["screenshots"][0]["image_data"]), self.png)
+    
+    def test_gzip_without_screenshots(self):
+        """L'export compressé peut exclure les captures d'écran"""
+        import gzip
+        path, filename = self._export(compress=True, screenshots="omit")
+        self.assertTrue(filename.endswith(".json.gz"))
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            exported = json.load(f)
+        self.assertNotIn("screenshots", exported["BTC/USD_1h"])
+        self.assertEqual(exported["_custom_assets"], ["PEPE/USD"])
+    
+    def test_external_screenshots_in_zip(self):
+        """Les images sont livrées à part dans l'archive zip"""
+        import zipfile
+        path, filename = self._export(screenshots="external")
+        self.assertTrue(filename.endswith(".zip"))
+        with zipfile.ZipFile(path) as archive:
+            exported = json.loads(archive.read("alice.json"))
+            self.assertEqual(exported["BTC/USD_1h"]["screenshots"][0]["blob"], self.blob_hash)
+            self.assertEqual(archive.read(f"blobs/{self.blob_hash}"), self.png)
+
+class TestIncrementalImport(ProfileStorageTestCase):
+    """Tests de l'import incrémental avec validation par entrée"""
+    
+    def setUp(self):
+        """Redirige aussi les images vers le dossier temporaire et crée un profil"""
+        super().setUp()
+        blobs = _module_of(save_screenshot.__globals__['put_blob'])
+        self.start_patch(patch.object(blobs, "BLOB_STORE_DIR", os.path.join(self.tmp_dir, "_blobs")))
+        self.storage.write_snapshot("alice", {"ETH/USD_4h": {"tested": True}})
+    
+    def _stream(self, data):
+        from io import BytesIO
+        return BytesIO(json.dumps(data).encode('utf-8'))
+    
+    def test_invalid_entries_are_reported_and_skipped(self):
+        """Les entrées invalides sont rejetées sans bloquer les autres"""
+        report = import_profile_stream("alice", self._stream({
+            "BTC/USD_1h": {"tested": True, "params": {"ADX Length": 20, "Inconnu": "1"}},
+            "SOL/USD_2h": {"tested": True},
+            "XRP/USD_1d": {"tested": "oui"},
+            "_custom_assets": ["PEPE/USD"]
+        }), merge=True)
+        
+        self.assertIsNone(report["error"])
+        self.assertEqual((report["imported"], report["rejected"]), (2, 2))
+        statuses = {entry["key"]: entry["status"] for entry in report["entries"]}
+        self.assertEqual(statuses, {"BTC/USD_1h": "adjusted", "SOL/USD_2h": "rejected", "XRP/USD_1d": "rejected"})
+        
+        data = load_profile_data("alice")
+        self.assertEqual(get_params("BTC/USD", "1h", data)["ADX Length"], "20")
+        self.assertNotIn("Inconnu", get_params("BTC/USD", "1h", data))
+        self.assertTrue(is_tested("ETH/USD", "4h", data))
+        self.assertNotIn("XRP/USD_1d", data)
+    
+    def test_entries_are_written_in_batches(self):
+        """Les entrées sont écrites par lots, sans attendre la fin du fichier"""
+        entries = {f"BTC/USD_{tf}": {"tested": True} for tf in ("1m", "5m", "15m", "30m", "1h")}
+        report = import_profile_stream("alice", self._stream(entries), batch_size=2)
+        self.assertEqual(report["imported"], 5)
+        
+        with open(self.storage.get_journal_path("alice"), 'r') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual([len(line["changes"]) for line in lines], [2, 2, 2])
+        self.assertEqual(set(load_profile_data("alice")), set(entries))
+    
+    def test_truncated_file_keeps_existing_data(self):
+        """Un fichier tronqué laisse le profil inchangé en remplacement"""
+        from io import BytesIO
+        truncated = b'{"BTC/USD_1h": {"tested": true}, "ETH/USD_1d": {"tes'
+        report = import_profile_stream("alice", BytesIO(truncated), merge=False, batch_size=1)
+        
+        self.assertIsNotNone(report["error"])
+        self.assertEqual(report["imported"], 0)
+        self.assertEqual(load_profile_data("alice"), {"ETH/USD_4h": {"tested": True}})
+        
+        # En fusion, les entrées lues avant l'erreur restent importées
+        report = import_profile_stream("alice", BytesIO(truncated), merge=True)
+        self.assertEqual(report["imported"], 1)
+        data = load_profile_data("alice")
+        self.assertTrue(is_tested("BTC/USD", "1h", data))
+        self.assertTrue(is_tested("ETH/USD", "4h", data))
+    
+    def test_imported_entries_replace_stored_ones(self):
+        """Une entrée importée remplace la configuration stockée, sans fusion des champs"""
+        self.storage.write_snapshot("alice", {"ETH/USD_4h": {"tested": True, "note": "ancienne"}})
+        report = import_profile_stream("alice", self._stream({"ETH/USD_4h": {"improved": True}}), merge=True)
+        
+        self.assertIsNone(report["error"])
+        self.assertEqual(load_profile_data("alice"), {"ETH/USD_4h": {"improved": True}})
+    
+    def test_zip_export_round_trip(self):
+        """Une archive exportée avec images séparées se réimporte telle quelle"""
+        from io import BytesIO
+        from PIL import Image
+        buffered = BytesIO()
+        Image.new("RGB", (4, 3), "blue").save(buffered, format="PNG")
+        data = save_screenshot("BTC/USD", "1h", buffered.getvalue(), "Capture", load_profile_data("alice"))
+        save_profile_data("alice", data)
+        
+        path, _, _ = export_profile_to_file("alice", screenshots="external", directory=self.tmp_dir)
+        shutil.rmtree(os.path.join(self.tmp_dir, "_blobs"))
+        with open(path, 'rb') as f:
+            report = import_profile_file("bob", f)
+        
+        self.assertIsNone(report["error"])
+        handle = get_screenshots("BTC/USD", "1h", load_profile_data("bob"))[0]
+        self.assertEqual(handle.read_bytes(), buffered.getvalue())
+
+class TestSqliteStorage(ProfileStorageTestCase):
+    """Tests du backend de stockage SQLite"""
+    
+    STORAGE_MODE = None
+    
+    def setUp(self):
+        """Utilise une base SQLite et un dossier de profils temporaires"""
+        super().setUp()
+        self.sqlite_store = importlib.import_module(
+            self.storage.__name__.rsplit('.', 1)[0] + '.sqlite_store'
+        )
+        self.start_patch(patch.object(self.storage, "STORAGE_BACKEND", "sqlite"))
+        self.start_patch(patch.object(self.sqlite_store, "SQLITE_DB_PATH", os.path.join(self.tmp_dir, "test.db")))
+        self.start_patch(patch.object(self.sqlite_store, "PROFILES_DIR", self.tmp_dir))
+    
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        self.catalog.flush_catalog()
+        # Fermer la connexion de la base temporaire sans en ouvrir une nouvelle:
+        # après l'arrêt des patchs, get_connection ouvrirait la vraie base
+        connection = getattr(self.sqlite_store._local, "connection", None)
+        if connection is not None:
+            connection.close()
+        self.sqlite_store._local.connection = None
+        super().tearDown()
+    
+    def test_round_trip_and_stats(self):
+        """Les données relues et les statistiques correspondent aux données écrites"""
+        self.sqlite_store.replace_profile("alice", copy_of(TEST_PROFILE))
+        data = load_profile_data("alice")
+        self.assertEqual(data, TEST_PROFILE)
+        
+        stats = get_profile_stats("alice")
+        self.assertEqual(stats["total_configs"], 3)
+        self.assertEqual(stats["configs_tested"], 1)
+        self.assertEqual(stats["configs_improved"], 1)
+        self.assertEqual(stats["configs_with_notes"], 1)
+        self.assertEqual(stats["configs_with_screenshots"], 1)
+    
+    def test_toggle_is_single_row_update(self):
+        """Basculer un statut ne produit qu'un UPDATE d'une ligne"""
+        self.sqlite_store.replace_profile("alice", copy_of(TEST_PROFILE))
+        data = load_profile_data("alice")
+        data, _ = toggle_tested("ETH/USD", "4h", data)
+        
+        statements = []
+        self.sqlite_store.get_connection().set_trace_callback(statements.append)
+        self.assertTrue(save_profile_data("alice", data))
+        self.sqlite_store.get_connection().set_trace_callback(None)
+        
+        config_updates = [s for s in statements if s.startswith("UPDATE configs")]
+        self.assertEqual(len(config_updates), 1)
+        self.assertIn("tested", config_updates[0])
+        self.assertNotIn("params", config_updates[0])
+        
+        self.storage.invalidate_cached_profile("alice")
+        self.assertTrue(is_tested("ETH/USD", "4h", load_profile_data("alice")))
+    
+    def test_migrate_json_profiles(self):
+        """La migration importe les profils JSON existants"""
+        self.storage.write_snapshot("bob", copy_of(TEST_PROFILE))
+        report = self.sqlite_store.migrate_json_profiles()
+        self.assertEqual(report["migrated"], ["bob"])
+        self.assertEqual(self.sqlite_store.read_profile("bob"), TEST_PROFILE)
+        
+        report = self.sqlite_store.migrate_json_profiles()
+        self.assertEqual(report["skipped"], ["bob"])
+
 if __name__ == '__main__':
     unittest.main()
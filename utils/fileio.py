@@ -0,0 +1,63 @@
+"""
+File helpers for the Trading Dashboard Pro application.
+"""
+import os
+import json
+import tempfile
+
+
+def atomic_write_bytes(path, payload, fsync=True):
+    """
+    Write bytes to a file atomically (temporary file + rename)
+
+    Args:
+        path (str): Destination path
+        payload (bytes): Content to write
+        fsync (bool, optional): Flush the content to disk before the rename.
+            Default is True; derived data that can be rebuilt may skip it.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".part")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_json(path, data, indent=4, fsync=True):
+    """
+    Serialize data to JSON and write it atomically
+
+    Args:
+        path (str): Destination path
+        data: JSON-serializable data
+        indent (int, optional): JSON indentation. Default is 4.
+        fsync (bool, optional): See atomic_write_bytes. Default is True.
+    """
+    atomic_write_bytes(path, json.dumps(data, indent=indent).encode('utf-8'), fsync=fsync)
+
+
+def file_fingerprint(path):
+    """
+    Get a cheap change fingerprint for a file
+
+    Args:
+        path (str): File path
+
+    Returns:
+        tuple: (mtime_ns, size), or None if the file does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
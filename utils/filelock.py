@@ -0,0 +1,89 @@
+"""
+Advisory file locks shared between processes.
+"""
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _lock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    f.seek(0)
+    while True:
+        try:
+            # LK_LOCK réessaie pendant 10 secondes puis échoue: on recommence
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+
+def _unlock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class FileLock:
+    """
+    Re-entrant lock held by one thread of one process at a time
+
+    Threads of the process are serialized by an RLock; the outermost
+    acquisition also takes an exclusive advisory lock on a lock file, so
+    other processes using the same file wait as well.
+    """
+
+    def __init__(self, path_func):
+        """
+        Args:
+            path_func (callable): Returns the lock file path, evaluated at
+                each outermost acquisition
+        """
+        self._path_func = path_func
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self):
+        self._lock.acquire()
+        if self._depth == 0:
+            try:
+                path = self._path_func()
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                f = open(path, 'a+b')
+                try:
+                    _lock(f)
+                except BaseException:
+                    f.close()
+                    raise
+                self._file = f
+            except BaseException:
+                self._lock.release()
+                raise
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            f, self._file = self._file, None
+            try:
+                _unlock(f)
+            finally:
+                f.close()
+        self._lock.release()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc_info):
+        self.release()
@@ -0,0 +1,104 @@
+"""
+Incremental parsing of large JSON objects.
+"""
+import json
+import codecs
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _Buffer:
+    """Text read from a stream, with a read position"""
+
+    def __init__(self, fileobj, chunk_size):
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+
+    def fill(self):
+        """Read more text, dropping the consumed part; False at end of stream"""
+        if self.eof:
+            return False
+        # Lire au moins autant que le texte en attente: une valeur très longue
+        # est ainsi relue un nombre logarithmique de fois
+        size = max(self.chunk_size, len(self.text) - self.pos)
+        chunk = self.fileobj.read(size)
+        if isinstance(chunk, bytes):
+            chunk = self._decoder.decode(chunk, final=not chunk)
+        if not chunk:
+            self.eof = True
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def skip_whitespace(self):
+        """Move past whitespace and return the next character ('' at the end)"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text) or not self.fill():
+                return self.text[self.pos:self.pos + 1]
+
+    def expect(self, characters):
+        """Consume one of the given characters after optional whitespace"""
+        character = self.skip_whitespace()
+        if not character or character not in characters:
+            found = repr(character) if character else "end of data"
+            raise ValueError(f"Expected one of {characters!r}, found {found}")
+        self.pos += 1
+        return character
+
+    def decode_value(self):
+        """Decode the JSON value at the read position"""
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError as e:
+                # Seule une erreur en fin de tampon peut venir d'une valeur incomplète
+                truncated = e.msg.startswith("Unterminated string") or e.pos >= len(self.text) - 8
+                if not truncated or not self.fill():
+                    raise
+                continue
+            # Une valeur qui touche la fin du tampon peut être tronquée (nombre)
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_object_items(fileobj, chunk_size=1 << 20):
+    """
+    Iterate over the members of a top-level JSON object without loading it
+
+    Only the member being decoded is held in memory, so a multi-hundred-MB
+    document is read with a footprint bounded by its largest member.
+
+    Args:
+        fileobj: Binary (UTF-8) or text file object
+        chunk_size (int, optional): Number of bytes or characters per read
+
+    Yields:
+        tuple: (key, value) for each member, in document order
+
+    Raises:
+        ValueError: If the document is not a well-formed JSON object
+    """
+    buffer = _Buffer(fileobj, chunk_size)
+    buffer.expect("{")
+    if buffer.skip_whitespace() == "}":
+        buffer.pos += 1
+        return
+
+    while True:
+        key = buffer.decode_value()
+        if not isinstance(key, str):
+            raise ValueError(f"Expected a string key, found {key!r}")
+        buffer.expect(":")
+        yield key, buffer.decode_value()
+        if buffer.expect(",}") == "}":
+            return
@@ -0,0 +1,120 @@
+"""
+Thread-safe LRU cache bounded by a byte budget.
+"""
+import threading
+from collections import OrderedDict
+
+
+class ByteBudgetLRU:
+    """
+    Least-recently-used cache whose entries carry an estimated size in bytes
+
+    Entries are evicted, oldest use first, as soon as the total size exceeds
+    the budget. An entry larger than the whole budget is not stored.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None, validate=None, touch=True):
+        """
+        Get an entry and mark it as recently used
+
+        Args:
+            key: Entry key
+            default: Value returned on a miss
+            validate (callable, optional): Predicate on the cached value; a
+                stale entry is dropped and counted as a miss
+            touch (bool, optional): Mark the entry as recently used. Default
+                is True.
+
+        Returns:
+            The cached value, or default
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            if validate is not None and not validate(self._entries[key][0]):
+                self.total_bytes -= self._entries.pop(key)[1]
+                self.invalidations += 1
+                self.misses += 1
+                return default
+            if touch:
+                self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key, value, size):
+        """
+        Store an entry, evicting the least recently used ones if needed
+
+        Args:
+            key: Entry key
+            value: Value to cache
+            size (int): Estimated size of the value in bytes
+        """
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+
+    def pop(self, key):
+        """
+        Remove an entry
+
+        Args:
+            key: Entry key
+
+        Returns:
+            The removed value, or None
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            value, size = self._entries.pop(key)
+            self.total_bytes -= size
+            self.invalidations += 1
+            return value
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        """
+        Get usage counters
+
+        Returns:
+            dict: Hits, misses, evictions, invalidations, entries and bytes
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
@@ -3,12 +3,24 @@ Admin views for the Trading Dashboard Pro application.
 Contains UI components for managing profiles and viewing statistics
 when logged in as a Super Admin.
 """
+import time
 import streamlit as st
 import pandas as pd
+import plotly.express as px
 from models.auth import get_profile_list, delete_profile
-from models.data import get_profile_stats, load_profile_data, export_profile_data, import_profile_data, save_profile_data
-from config.settings import ASSET_CATEGORIES, TIMEFRAMES
+from models.data import load_profile_data, import_profile_file, format_import_report
+from models.profile_cache import get_profile_cache_stats
+from models.image_cache import get_image_cache_stats
+from models.image_service import get_image_service_stats
+from models.catalog import read_catalog
+from models.provisioning import provision_from_csv
+from models.profile_stats import iter_profile_stats, collect_profile_stats
+from models.coverage import CoverageCube
+from models.params import ParamTable, NUMERIC_KINDS, param_percentiles, param_histogram, param_outliers
+from models.status_index import STATUS_TESTED, STATUS_IMPROVED
+from config.settings import ASSET_CATEGORIES, TIMEFRAMES, PARAM_SCHEMA
 from views.assets import generate_asset_table
+from views.export import show_export_controls
 
 def show_profile_management(app_config):
     """
@@ -29,6 +41,10 @@ def show_profile_management(app_config):
             st.warning("Aucun profil trouvé.")
             return app_config
         
+        # Statistiques calculées en parallèle avant l'affichage
+        all_stats = collect_profile_stats(profiles)
+        catalog = read_catalog()
+        
         # Display all profiles with stats and delete buttons
         for profile in profiles:
             col1, col2, col3 = st.columns([3, 6, 1])
@@ -36,13 +52,18 @@ def show_profile_management(app_config):
             # Profile name
             with col1:
                 st.markdown(f"**{profile}**")
+                last_login = catalog.get(profile, {}).get("last_login")
+                st.caption(f"Dernière connexion: {last_login or 'jamais'}")
             
             # Profile stats
             with col2:
-                stats = get_profile_stats(profile)
-                st.write(f"Configs: {stats['total_configs']} | "
-                         f"Testées: {stats['configs_tested']} | "
-                         f"Améliorées: {stats['configs_improved']}")
+                stats = all_stats[profile]
+                if stats is None:
+                    st.write("Statistiques indisponibles")
+                else:
+                    st.write(f"Configs: {stats['total_configs']} | "
+                             f"Testées: {stats['configs_tested']} | "
+                             f"Améliorées: {stats['configs_improved']}")
             
             # Delete button (can't delete default profile)
             with col3:
@@ -58,6 +79,34 @@ def show_profile_management(app_config):
         
         return app_config
 
+def show_bulk_provisioning():
+    """Display the bulk profile creation from a CSV file"""
+    with st.expander("Créer des profils en masse (CSV)"):
+        st.caption(
+            "Colonne 'name' obligatoire; colonnes 'asset', 'timeframe' et noms de "
+            "paramètres facultatives pour initialiser des configurations."
+        )
+        uploaded_file = st.file_uploader("Fichier CSV des profils", type=["csv"], key="provisioning_csv")
+        dry_run = st.checkbox("Vérifier seulement (ne rien créer)", key="provisioning_dry_run")
+        
+        if uploaded_file is not None and st.button("Créer les profils", key="provisioning_btn"):
+            report = provision_from_csv(uploaded_file, dry_run=dry_run)
+            if report["app_config"] is not None:
+                st.session_state.app_config = report["app_config"]
+            
+            if dry_run:
+                st.info(f"{len(report['valid'])} profils valides, {len(report['errors'])} lignes rejetées.")
+            else:
+                st.success(f"{len(report['created'])} profils créés, "
+                           f"{len(report['skipped'])} déjà existants.")
+            if report["failed"]:
+                st.error("Échec de création: " + ", ".join(
+                    f"{profile_name} ({message})" for profile_name, message in report["failed"]
+                ))
+            if report["errors"]:
+                st.dataframe(pd.DataFrame(report["errors"], columns=["Ligne", "Erreur"]),
+                             use_container_width=True, hide_index=True)
+
 def show_profile_viewer(app_config):
     """
     Display profile viewer to select which profile to view
@@ -82,6 +131,30 @@ def show_profile_viewer(app_config):
     
     return None
 
+def _stats_row(profile, stats):
+    """
+    Build the dashboard table row of a profile
+    
+    Args:
+        profile (str): Profile name
+        stats (dict): Profile statistics, or None if they could not be computed
+        
+    Returns:
+        dict: Row of the statistics table
+    """
+    if stats is None:
+        stats = {}
+    return {
+        "Profil": profile,
+        "Total": stats.get("total_configs"),
+        "Testés": stats.get("configs_tested"),
+        "Améliorés": stats.get("configs_improved"),
+        "Notes": stats.get("configs_with_notes"),
+        "Screenshots": stats.get("configs_with_screenshots"),
+        "% Testé": stats.get("percent_tested"),
+        "% Amélioré": stats.get("percent_improved")
+    }
+
 def show_profile_stats_dashboard():
     """Display statistics dashboard for all profiles"""
     st.subheader("Statistiques Globales")
@@ -90,20 +163,26 @@ def show_profile_stats_dashboard():
     app_config = st.session_state.app_config
     profiles = get_profile_list(app_config)
     
-    # Collect stats for all profiles
-    stats_data = []
-    for profile in profiles:
-        stats = get_profile_stats(profile)
-        stats_data.append({
-            "Profil": profile,
-            "Total": stats["total_configs"],
-            "Testés": stats["configs_tested"],
-            "Améliorés": stats["configs_improved"],
-            "Notes": stats["configs_with_notes"],
-            "Screenshots": stats["configs_with_screenshots"],
-            "% Testé": stats["percent_tested"],
-            "% Amélioré": stats["percent_improved"]
-        })
+    # Collect stats for all profiles, in parallel; rows appear as they finish
+    table = st.empty()
+    progress = st.progress(0.0) if profiles else None
+    rows = {}
+    failures = []
+    last_refresh = 0.0
+    for profile, stats, error in iter_profile_stats(profiles):
+        rows[profile] = _stats_row(profile, stats)
+        if error:
+            failures.append(f"{profile}: {error}")
+        # Rafraîchissement limité pour ne pas saturer le navigateur
+        if time.monotonic() - last_refresh >= 0.25 or len(rows) == len(profiles):
+            last_refresh = time.monotonic()
+            progress.progress(len(rows) / len(profiles), text=f"{len(rows)} / {len(profiles)} profils")
+            table.dataframe(pd.DataFrame(list(rows.values())), use_container_width=True)
+    if progress is not None:
+        progress.empty()
+    
+    # Ordre d'origine des profils pour le tableau final
+    stats_data = [rows[profile] for profile in profiles if profile in rows]
     
     # Display as a table
     if stats_data:
@@ -112,6 +191,8 @@ def show_profile_stats_dashboard():
         
         # Define styler function for percentage columns
         def style_percentage(val):
+            if pd.isna(val):
+                return ''
             color = 'red' if val < 25 else 'orange' if val < 50 else 'green'
             return f'color: {color}; font-weight: bold'
         
@@ -119,12 +200,151 @@ def show_profile_stats_dashboard():
         styled_df = df.style.format({
             "% Testé": "{:.1f}%",
             "% Amélioré": "{:.1f}%"
-        }).map(style_percentage, subset=["% Testé", "% Amélioré"])
+        }, na_rep="—").map(style_percentage, subset=["% Testé", "% Amélioré"])
         
         # Display the table
-        st.dataframe(styled_df, use_container_width=True)
+        table.dataframe(styled_df, use_container_width=True)
     else:
         st.info("Aucune donnée statistique disponible.")
+    
+    if failures:
+        st.warning("Statistiques indisponibles pour: " + " ; ".join(failures))
+    
+    # Compteurs des caches partagés (pour dimensionner PROFILE_CACHE_MAX_BYTES et IMAGE_CACHE_MAX_BYTES)
+    cache_stats = get_profile_cache_stats()
+    st.caption(
+        f"Cache des profils: {cache_stats['hits']} hits / {cache_stats['misses']} misses, "
+        f"{cache_stats['evictions']} évictions, {cache_stats['entries']} profils, "
+        f"{cache_stats['bytes'] / 1024 / 1024:.1f} / {cache_stats['max_bytes'] / 1024 / 1024:.0f} Mo"
+    )
+    
+    image_cache_stats = get_image_cache_stats()
+    st.caption(
+        f"Cache des images: {image_cache_stats['hits']} hits / {image_cache_stats['misses']} misses, "
+        f"{image_cache_stats['evictions']} évictions, {image_cache_stats['entries']} images, "
+        f"{image_cache_stats['bytes'] / 1024 / 1024:.1f} / {image_cache_stats['max_bytes'] / 1024 / 1024:.0f} Mo"
+    )
+    
+    # File de traitement des captures envoyées (pour dimensionner IMAGE_WORKERS)
+    image_stats = get_image_service_stats()
+    latency = (f"{image_stats['latency_avg_ms']:.0f} ms en moyenne, {image_stats['latency_p95_ms']:.0f} ms au 95e centile"
+               if image_stats['latency_avg_ms'] is not None else "aucune mesure")
+    st.caption(
+        f"Traitement des images: {image_stats['queue_depth']} en attente, "
+        f"{image_stats['completed']} traitées, {image_stats['failed']} échecs, "
+        f"{image_stats['workers']} processus, latence {latency}"
+    )
+
+def show_coverage_analytics():
+    """Display the coverage heatmaps of all profiles"""
+    st.subheader("Couverture des configurations")
+    
+    status_label = st.radio(
+        "Statut:", ["Testé", "Amélioré"], horizontal=True, key="coverage_status"
+    )
+    status = STATUS_TESTED if status_label == "Testé" else STATUS_IMPROVED
+    
+    # Le cube est conservé en session: le recalcul relit tous les profils
+    if st.button("Calculer la couverture", key="coverage_build"):
+        with st.spinner("Lecture des profils..."):
+            st.session_state.coverage_cube = CoverageCube.build(
+                get_profile_list(st.session_state.app_config)
+            )
+    cube = st.session_state.get("coverage_cube")
+    
+    if cube is None:
+        st.info("Cliquez sur « Calculer la couverture » pour analyser tous les profils.")
+        return
+    if not cube.profiles:
+        st.info("Aucun profil à analyser.")
+        return
+    if cube.errors:
+        st.warning("Profils ignorés: " + " ; ".join(f"{p}: {e}" for p, e in cube.errors.items()))
+    
+    # Couverture par catégorie d'actifs
+    names, percentages = cube.category_coverage(status)
+    fig = px.imshow(
+        percentages, x=cube.timeframes, y=names, zmin=0, zmax=100,
+        color_continuous_scale="RdYlGn", text_auto=".0f", aspect="auto",
+        labels={"x": "Unité de temps", "y": "Catégorie", "color": "% couvert"}
+    )
+    fig.update_layout(title=f"% {status_label} par catégorie ({len(cube.profiles)} profils)")
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Nombre de profils par cellule actif × unité de temps
+    counts = cube.cell_counts(status)
+    fig = px.imshow(
+        counts, x=cube.timeframes, y=cube.assets, color_continuous_scale="Blues", aspect="auto",
+        labels={"x": "Unité de temps", "y": "Actif", "color": "Profils"}
+    )
+    fig.update_layout(title="Profils par cellule", height=max(400, 14 * len(cube.assets)))
+    st.plotly_chart(fig, use_container_width=True)
+    
+    uncovered = cube.uncovered_cells(status)
+    with st.expander(f"Cellules sans aucun profil ({len(uncovered)})"):
+        st.dataframe(pd.DataFrame(uncovered, columns=["Actif", "Unité de temps"]),
+                     use_container_width=True)
+    
+    # Meilleurs profils par unité de temps
+    st.markdown("**Meilleurs profils par unité de temps**")
+    top = cube.top_profiles(status)
+    st.dataframe(pd.DataFrame({
+        tf: pd.Series([f"{profile} ({count})" for profile, count in ranking], dtype=object)
+        for tf, ranking in top.items()
+    }).fillna(""), use_container_width=True)
+
+def show_param_analytics():
+    """Display the distribution of the strategy parameters across all profiles"""
+    st.subheader("Distribution des paramètres")
+    
+    # La table est conservée en session: le recalcul relit tous les profils
+    if st.button("Analyser les paramètres", key="params_build"):
+        with st.spinner("Lecture des profils..."):
+            st.session_state.param_table = ParamTable.build(
+                get_profile_list(st.session_state.app_config)
+            )
+    table = st.session_state.get("param_table")
+    
+    if table is None:
+        st.info("Cliquez sur « Analyser les paramètres » pour analyser tous les profils.")
+        return
+    if not len(table):
+        st.info("Aucune configuration avec des paramètres enregistrés.")
+        return
+    if table.errors:
+        st.warning("Profils ignorés: " + " ; ".join(f"{p}: {e}" for p, e in table.errors.items()))
+    
+    numeric = [name for name, kind in PARAM_SCHEMA.items() if kind in NUMERIC_KINDS]
+    name = st.selectbox("Paramètre:", numeric, key="params_name")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        asset = st.selectbox("Actif:", ["Tous"] + sorted(set(table.assets)), key="params_asset")
+    with col2:
+        timeframe = st.selectbox("Unité de temps:", ["Toutes"] + TIMEFRAMES, key="params_timeframe")
+    
+    counts, edges = param_histogram(
+        table, name,
+        asset=None if asset == "Tous" else asset,
+        timeframe=None if timeframe == "Toutes" else timeframe
+    )
+    fig = px.bar(
+        x=(edges[:-1] + edges[1:]) / 2, y=counts,
+        labels={"x": name, "y": "Configurations"}
+    )
+    fig.update_traces(width=edges[1] - edges[0])
+    fig.update_layout(title=f"Histogramme de « {name} » ({int(counts.sum())} valeurs)")
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("**Percentiles par actif et unité de temps**")
+    st.dataframe(param_percentiles(table, name), use_container_width=True)
+    
+    outliers = param_outliers(table, name)
+    st.markdown(f"**Valeurs atypiques ({len(outliers)})**")
+    st.dataframe(outliers.rename(columns={
+        "profile": "Profil", "asset": "Actif", "timeframe": "Unité de temps",
+        "value": "Valeur", "low": "Borne basse", "high": "Borne haute"
+    }), use_container_width=True)
 
 def show_profile_data_view(profile_name):
     """
@@ -209,8 +429,14 @@ def show_profile_data_view(profile_name):
                 with columns[i+1]:
                     st.markdown(f"### {tf}")
             
+            # Statuts de tout le tableau en une seule lecture de l'index
+            from models.data import get_status_flags
+            from models.status_index import STATUS_TESTED, STATUS_IMPROVED
+            from views.assets import STATUS_TEXT
+            statuses = get_status_flags(assets, timeframes, profile_data)
+            
             # Generate rows of the table
-            for asset in assets:
+            for asset, flags_row in zip(assets, statuses.tolist()):
                 cols = st.columns(col_widths)
                 
                 # Asset name column
@@ -218,38 +444,12 @@ def show_profile_data_view(profile_name):
                     st.markdown(f"**{asset}**")
                 
                 # Timeframe columns
-                for i, tf in enumerate(timeframes):
+                for i, (tf, flags) in enumerate(zip(timeframes, flags_row)):
                     with cols[i+1]:
-                        # Build status indicators
-                        from models.data import is_tested, is_improved, has_note, has_screenshots
-                        
-                        status_parts = []
+                        status_text = STATUS_TEXT[flags] or "◯"
                         
-                        if is_tested(asset, tf, profile_data):
-                            status_parts.append("✓")
-                        
-                        if is_improved(asset, tf, profile_data):
-                            status_parts.append("⭐")
-                        
-                        if has_note(asset, tf, profile_data):
-                            status_parts.append("📝")
-                        
-                        if has_screenshots(asset, tf, profile_data):
-                            status_parts.append("📊")
-                        
-                        status_text = " ".join(status_parts) if status_parts else "◯"
-                        
-                        # Determine button style based on status
-                        if "✓" in status_text and "⭐" in status_text:
-                            button_style = "primary"
-                        elif "✓" in status_text:
-                            button_style = "primary"
-                        elif "⭐" in status_text:
-                            button_style = "primary"
-                        elif len(status_parts) > 0:
-                            button_style = "secondary"
-                        else:
-                            button_style = "secondary"
+                        # Mettre en avant les configurations testées ou améliorées
+                        button_style = "primary" if flags & (STATUS_TESTED | STATUS_IMPROVED) else "secondary"
                         
                         # Button to select this configuration
                         if st.button(
@@ -271,15 +471,7 @@ def show_profile_data_view(profile_name):
         
         # Export profile data button
         st.markdown("### Exporter les données")
-        if st.button("Exporter le profil", key="profile_export_btn", use_container_width=True):
-            data_str = export_profile_data(profile_name)
-            
-            # Create download link
-            import base64
-            b64 = base64.b64encode(data_str.encode()).decode()
-            download_filename = f"{profile_name}_export.json"
-            href = f'<a href="data:file/json;base64,{b64}" download="{download_filename}">Télécharger {download_filename}</a>'
-            st.markdown(href, unsafe_allow_html=True)
+        show_export_controls(profile_name, key="profile_export")
     
     with col2:
         # Panneau de droite : détails de la configuration sélectionnée
@@ -287,25 +479,21 @@ def show_profile_data_view(profile_name):
             # Vue détaillée d'une configuration
             from views.details import show_details_view
             
-            # Créer une copie des données du profil pour cette vue
-            admin_view_data = profile_data.copy() if profile_data else {}
+            # Créer une copie des données du profil pour cette vue (copie à l'écriture)
+            admin_view_data = profile_data.copy()
             
-            # Utiliser les variables admin spécifiques sans modifier les variables de session partagées
+            # Utiliser les variables admin spécifiques sans modifier les variables de session partagées;
+            # la vue détaillée sauvegarde elle-même dans le profil consulté si la révision change
             updated_data = show_details_view(
                 st.session_state.admin_selected_asset, 
                 st.session_state.admin_selected_timeframe,
-                data_override=admin_view_data  # Utiliser une copie des données pour cette vue
+                data_override=admin_view_data,  # Utiliser une copie des données pour cette vue
+                profile_name=profile_name
             )
             
-            # Toujours sauvegarder les données même si elles ne semblent pas modifiées
-            # Cela assure que les modifications sont persistantes
-            if updated_data:
-                print(f"Saving admin view updates to profile: {profile_name}")
-                save_result = save_profile_data(profile_name, updated_data)
-                if save_result:
-                    st.success("Modifications sauvegardées avec succès")
-                else:
-                    st.error("Erreur lors de la sauvegarde des modifications")
+            if updated_data.revision != profile_data.revision:
+                print(f"Saved admin view updates to profile: {profile_name}")
+                st.success("Modifications sauvegardées avec succès")
         else:
             st.info("Sélectionnez une configuration en cliquant sur une cellule du tableau pour voir les détails.")
     
@@ -330,29 +518,33 @@ def show_import_export_panel():
     
     # Import section
     with st.expander("Importer des données"):
-        uploaded_file = st.file_uploader("Choisir un fichier JSON", type=["json"])
+        uploaded_file = st.file_uploader("Choisir un fichier d'export", type=["json", "gz", "zip"])
         merge_option = st.checkbox("Fusionner avec les données existantes", value=True)
         
         if uploaded_file is not None and st.button("Importer", key="import_data_btn"):
-            json_data = uploaded_file.read().decode("utf-8")
-            success, message = import_profile_data(target_profile, json_data, merge=merge_option)
+            # Lecture incrémentale: la mémoire ne dépend pas de la taille du fichier
+            report = import_profile_file(target_profile, uploaded_file, merge=merge_option)
+            success, message = format_import_report(target_profile, report)
             
             if success:
                 st.success(message)
             else:
                 st.error(message)
+            
+            # Détail des entrées rejetées ou corrigées
+            if report["entries"]:
+                st.dataframe(pd.DataFrame([
+                    {
+                        "Entrée": entry["key"],
+                        "Statut": "Rejetée" if entry["status"] == "rejected" else "Corrigée",
+                        "Détails": "; ".join(entry["messages"])
+                    }
+                    for entry in report["entries"]
+                ]), use_container_width=True)
     
     # Export section
     with st.expander("Exporter des données"):
-        if st.button("Exporter les données du profil", key="export_profile_data_btn"):
-            data_str = export_profile_data(target_profile)
-            
-            # Create download link
-            import base64
-            b64 = base64.b64encode(data_str.encode()).decode()
-            download_filename = f"{target_profile}_export.json"
-            href = f'<a href="data:file/json;base64,{b64}" download="{download_filename}">Télécharger {download_filename}</a>'
-            st.markdown(href, unsafe_allow_html=True)
+        show_export_controls(target_profile, key="export_profile_data")
 
 def show_admin_view():
     """
@@ -363,29 +555,37 @@ def show_admin_view():
     """
     st.title("Tableau de Bord Super Admin")
     
-    # Toujours recharger la configuration depuis le disque pour voir les nouveaux profils
+    # Configuration servie depuis la mémoire, rechargée dès que son fichier change
     from models.auth import setup_config
     st.session_state.app_config = setup_config()
     print("Configuration rechargée pour le tableau de bord admin")
     
     # Create tabs for different admin sections
-    tabs = st.tabs(["📊 Tableau de bord", "👥 Gestion des profils", "🔄 Import/Export"])
+    tabs = st.tabs(["📊 Tableau de bord", "🗺️ Couverture", "📈 Paramètres", "👥 Gestion des profils", "🔄 Import/Export"])
     
     with tabs[0]:  # Dashboard tab
         show_profile_stats_dashboard()
     
-    with tabs[1]:  # Profile management tab
+    with tabs[1]:  # Coverage tab
+        show_coverage_analytics()
+    
+    with tabs[2]:  # Parameters tab
+        show_param_analytics()
+    
+    with tabs[3]:  # Profile management tab
         # Update app_config with any changes
         updated_config = show_profile_management(st.session_state.app_config)
         if updated_config != st.session_state.app_config:
             st.session_state.app_config = updated_config
         
+        show_bulk_provisioning()
+        
         # Profile viewer
         selected_profile = show_profile_viewer(st.session_state.app_config)
         if selected_profile:
             return True, selected_profile
     
-    with tabs[2]:  # Import/Export tab
+    with tabs[4]:  # Import/Export tab
         show_import_export_panel()
     
     return False, None
@@ -6,8 +6,16 @@ import streamlit as st
 import pandas as pd
 from config.settings import ASSET_CATEGORIES, TIMEFRAMES
 from models.data import (
-    is_tested, is_improved, has_note, has_screenshots, toggle_tested, toggle_improved,
-    save_profile_data, get_custom_assets, add_custom_asset, remove_custom_asset
+    is_tested, is_improved, toggle_tested, toggle_improved, get_status_flags,
+    queue_profile_save, get_custom_assets, add_custom_asset, remove_custom_asset,
+    get_params, select_configs, apply_bulk
+)
+from models.status_index import STATUS_TESTED, STATUS_IMPROVED, STATUS_NOTE, STATUS_SCREENSHOTS
+
+# Texte d'une cellule pour chaque combinaison de drapeaux de statut
+STATUS_SYMBOLS = ((STATUS_TESTED, "✓"), (STATUS_IMPROVED, "⭐"), (STATUS_NOTE, "📝"), (STATUS_SCREENSHOTS, "📊"))
+STATUS_TEXT = tuple(
+    " ".join(symbol for flag, symbol in STATUS_SYMBOLS if flags & flag) for flags in range(16)
 )
 
 def show_asset_category_selector():
@@ -138,27 +146,14 @@ def generate_asset_table(assets, timeframes, profile_data):
     Returns:
         tuple: (DataFrame, styled DataFrame)
     """
+    # Statuts de tout le tableau en une seule lecture de l'index
+    statuses = get_status_flags(assets, timeframes, profile_data)
+    
     # Create dataframe
     data = []
-    for asset in assets:
+    for asset, flags_row in zip(assets, statuses.tolist()):
         row = {'Asset': asset}
-        for tf in timeframes:
-            # Build status indicators
-            status_parts = []
-            
-            if is_tested(asset, tf, profile_data):
-                status_parts.append("✓")
-            
-            if is_improved(asset, tf, profile_data):
-                status_parts.append("⭐")
-            
-            if has_note(asset, tf, profile_data):
-                status_parts.append("📝")
-            
-            if has_screenshots(asset, tf, profile_data):
-                status_parts.append("📊")
-            
-            row[tf] = " ".join(status_parts) if status_parts else ""
+        row.update(zip(timeframes, (STATUS_TEXT[flags] for flags in flags_row)))
         data.append(row)
     
     df = pd.DataFrame(data)
@@ -180,6 +175,70 @@ def generate_asset_table(assets, timeframes, profile_data):
     
     return df, styled_df
 
+def _apply_grid_action(config_ids, ops):
+    """
+    Apply a bulk action of the grid to the current profile and refresh the page
+    
+    Args:
+        config_ids (list): Configuration IDs to change
+        ops (dict): Operations, see apply_bulk
+    """
+    data, changed, success = apply_bulk(
+        st.session_state.current_profile, config_ids, ops, st.session_state.profile_data
+    )
+    st.session_state.profile_data = data
+    if not success:
+        st.session_state.bulk_message = ("error", "Erreur lors de l'enregistrement des modifications")
+    else:
+        st.session_state.bulk_message = ("success", f"{changed} configuration(s) modifiée(s)")
+    st.rerun()
+
+# Actions groupées proposées pour une sélection de cellules
+BULK_ACTIONS = {
+    "Marquer testé": {"tested": True},
+    "Marquer non testé": {"tested": False},
+    "Marquer amélioré": {"improved": True},
+    "Marquer non amélioré": {"improved": False},
+    "Effacer les notes": {"clear_note": True},
+}
+
+def show_bulk_actions(assets, timeframes):
+    """
+    Display the bulk actions applying to a selection of assets and timeframes
+    
+    Args:
+        assets (list): Assets of the table
+        timeframes (list): Timeframes of the table
+    """
+    # Résultat de la dernière action (affiché après le rafraîchissement)
+    message = st.session_state.pop("bulk_message", None)
+    if message:
+        getattr(st, message[0])(message[1])
+    
+    with st.expander("Actions groupées"):
+        col1, col2 = st.columns(2)
+        with col1:
+            selected_assets = st.multiselect("Actifs", assets, key="bulk_assets")
+        with col2:
+            selected_timeframes = st.multiselect("Unités de temps", timeframes, key="bulk_timeframes")
+        
+        actions = list(BULK_ACTIONS)
+        # Les paramètres de la configuration affichée peuvent être copiés sur la sélection
+        source = (st.session_state.get("selected_asset"), st.session_state.get("selected_timeframe"))
+        if all(source):
+            copy_label = f"Copier les paramètres de {source[0]} {source[1]}"
+            actions.append(copy_label)
+        action = st.selectbox("Action", actions, key="bulk_action")
+        
+        config_ids = select_configs(selected_assets, selected_timeframes)
+        if st.button(f"Appliquer à {len(config_ids)} configuration(s)", key="bulk_apply",
+                     disabled=not config_ids):
+            if action in BULK_ACTIONS:
+                ops = BULK_ACTIONS[action]
+            else:
+                ops = {"params": get_params(source[0], source[1], st.session_state.profile_data)}
+            _apply_grid_action(config_ids, ops)
+
 def generate_interactive_asset_table(assets, timeframes, profile_data):
     """
     Generate an interactive table with clickable cells
@@ -189,10 +248,14 @@ def generate_interactive_asset_table(assets, timeframes, profile_data):
         timeframes (list): List of timeframes
         profile_data (dict): User profile data
     """
-    # Create layout with asset names in leftmost column
-    col_widths = [2] + [1] * len(timeframes)
+    # Create layout with asset names in leftmost column, row actions in the last one
+    col_widths = [2] + [1] * len(timeframes) + [1]
     columns = st.columns(col_widths)
     
+    # Statuts de tout le tableau en une seule lecture de l'index
+    statuses = get_status_flags(assets, timeframes, profile_data)
+    tested = (statuses & STATUS_TESTED) != 0
+    
     # Header row
     with columns[0]:
         st.markdown("### Actif")
@@ -200,46 +263,39 @@ def generate_interactive_asset_table(assets, timeframes, profile_data):
     for i, tf in enumerate(timeframes):
         with columns[i+1]:
             st.markdown(f"### {tf}")
+            # Marquer (ou démarquer) toute la colonne comme testée
+            column_tested = bool(tested[:, i].all())
+            if st.button("✗ tout" if column_tested else "✓ tout", key=f"column_{tf}",
+                         help=f"{'Démarquer' if column_tested else 'Marquer'} {tf} pour tous les actifs",
+                         use_container_width=True):
+                _apply_grid_action(select_configs(assets, [tf]), {"tested": not column_tested})
+    
+    with columns[-1]:
+        st.markdown("### Ligne")
     
     # Generate rows of the table
-    for asset in assets:
+    for row, (asset, flags_row) in enumerate(zip(assets, statuses.tolist())):
         cols = st.columns(col_widths)
         
         # Asset name column
         with cols[0]:
             st.markdown(f"**{asset}**")
         
+        # Marquer (ou démarquer) toute la ligne comme testée
+        with cols[-1]:
+            row_tested = bool(tested[row].all())
+            if st.button("✗ tout" if row_tested else "✓ tout", key=f"row_{asset}",
+                         help=f"{'Démarquer' if row_tested else 'Marquer'} {asset} sur toutes les unités de temps",
+                         use_container_width=True):
+                _apply_grid_action(select_configs([asset], timeframes), {"tested": not row_tested})
+        
         # Timeframe columns
-        for i, tf in enumerate(timeframes):
+        for i, (tf, flags) in enumerate(zip(timeframes, flags_row)):
             with cols[i+1]:
-                # Build status indicators
-                status_parts = []
-                
-                if is_tested(asset, tf, profile_data):
-                    status_parts.append("✓")
-                
-                if is_improved(asset, tf, profile_data):
-                    status_parts.append("⭐")
-                
-                if has_note(asset, tf, profile_data):
-                    status_parts.append("📝")
-                
-                if has_screenshots(asset, tf, profile_data):
-                    status_parts.append("📊")
-                
-                status_text = " ".join(status_parts) if status_parts else "◯"
+                status_text = STATUS_TEXT[flags] or "◯"
                 
-                # Determine button style based on status
-                if "✓" in status_text and "⭐" in status_text:
-                    button_style = "primary"
-                elif "✓" in status_text:
-                    button_style = "primary"
-                elif "⭐" in status_text:
-                    button_style = "primary"
-                elif len(status_parts) > 0:
-                    button_style = "secondary"
-                else:
-                    button_style = "secondary"
+                # Mettre en avant les configurations testées ou améliorées
+                button_style = "primary" if flags & (STATUS_TESTED | STATUS_IMPROVED) else "secondary"
                 
                 # Button to select this configuration
                 if st.button(
@@ -296,7 +352,7 @@ def show_asset_selector(current_assets):
         if st.button(btn_label, use_container_width=True):
             updated_data, new_status = toggle_tested(selected_asset, selected_tf, st.session_state.profile_data)
             st.session_state.profile_data = updated_data
-            save_profile_data(st.session_state.current_profile, updated_data)
+            queue_profile_save(st.session_state.current_profile, updated_data)
             st.success(f"Marqué comme {'testé' if new_status else 'non testé'}")
             st.rerun()
     
@@ -311,7 +367,7 @@ def show_asset_selector(current_assets):
         if st.button(improve_btn_label, use_container_width=True):
             updated_data, new_status = toggle_improved(selected_asset, selected_tf, st.session_state.profile_data)
             st.session_state.profile_data = updated_data
-            save_profile_data(st.session_state.current_profile, updated_data)
+            queue_profile_save(st.session_state.current_profile, updated_data)
             st.success(f"Marqué comme {'amélioré' if new_status else 'non amélioré'}")
             st.rerun()
     
@@ -359,6 +415,7 @@ def show_assets_view(show_selector=True):
             asset_type = "finance"
     
     # Generate and display the interactive asset table
+    show_bulk_actions(current_assets, TIMEFRAMES)
     generate_interactive_asset_table(current_assets, TIMEFRAMES, st.session_state.profile_data)
     
     # Show table legend
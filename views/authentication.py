@@ -10,9 +10,56 @@ from models.auth import (
     set_admin_password, 
     get_profile_list
 )
-from models.data import load_profile_data
+from models.data import load_profile_data, ProfileData
+from models.catalog import record_login
+from config.settings import LOGIN_PROFILE_OPTIONS
 from config.styles import MAIN_CSS
 
+def show_profile_search(registry):
+    """
+    Display a profile search box with a bounded list of matching profiles
+    
+    Only one page of LOGIN_PROFILE_OPTIONS profiles is rendered at a time,
+    however many profiles exist.
+    
+    Args:
+        registry (ProfileRegistry): Registered profiles
+        
+    Returns:
+        str: Selected profile name, or None if nothing matches
+    """
+    prefix = st.text_input("Rechercher un profil:", key="login_profile_search",
+                           placeholder="Début du nom du profil").strip()
+    
+    # Revenir à la première page quand la recherche change
+    if st.session_state.get("login_profile_prefix") != prefix:
+        st.session_state.login_profile_prefix = prefix
+        st.session_state.login_profile_page = 0
+    page = st.session_state.get("login_profile_page", 0)
+    
+    matches, total = registry.search(prefix, offset=page * LOGIN_PROFILE_OPTIONS,
+                                      limit=LOGIN_PROFILE_OPTIONS)
+    if not total:
+        st.info("Aucun profil ne correspond à cette recherche.")
+        return None
+    
+    profile_choice = st.radio("Sélectionner un profil existant:", matches, key="login_profile_choice")
+    
+    pages = (total + LOGIN_PROFILE_OPTIONS - 1) // LOGIN_PROFILE_OPTIONS
+    if pages > 1:
+        prev_col, info_col, next_col = st.columns([1, 3, 1])
+        with prev_col:
+            if st.button("◀", key="login_profiles_prev", disabled=page == 0):
+                st.session_state.login_profile_page = page - 1
+                st.rerun()
+        with info_col:
+            st.caption(f"{total} profils correspondants — page {page + 1}/{pages}")
+        with next_col:
+            if st.button("▶", key="login_profiles_next", disabled=page >= pages - 1):
+                st.session_state.login_profile_page = page + 1
+                st.rerun()
+    return profile_choice
+
 def show_login_screen():
     """
     Display the login/profile selection screen
@@ -73,13 +120,14 @@ def show_login_screen():
         # List existing profiles
         existing_profiles = get_profile_list(app_config)
         if existing_profiles:
-            profile_choice = st.radio("Sélectionner un profil existant:", existing_profiles)
+            profile_choice = show_profile_search(existing_profiles)
             
-            if st.button("Se connecter", key="login_existing"):
+            if profile_choice and st.button("Se connecter", key="login_existing"):
                 st.session_state.is_logged_in = True
                 st.session_state.is_super_admin = False
                 st.session_state.current_profile = profile_choice
                 st.session_state.profile_data = load_profile_data(profile_choice)
+                record_login(profile_choice)
                 st.rerun()
         else:
             st.info("Aucun profil existant.")
@@ -99,7 +147,8 @@ def show_login_screen():
                     st.session_state.is_logged_in = True
                     st.session_state.is_super_admin = False
                     st.session_state.current_profile = new_profile_name
-                    st.session_state.profile_data = {}
+                    st.session_state.profile_data = ProfileData()
+                    record_login(new_profile_name)
                     st.rerun()
                 else:
                     st.error(message)
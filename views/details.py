@@ -3,14 +3,17 @@ Details view for the Trading Dashboard Pro application.
 Shows detailed information for a selected asset and timeframe, including
 parameters, notes, and screenshots.
 """
+import html
+from concurrent.futures import wait
 import streamlit as st
+from models.image_service import submit_upload
 from models.data import (
     is_tested, is_improved, get_params, save_params, 
     get_note, save_note, get_screenshots, save_screenshot, 
-    delete_screenshot, process_uploaded_image, save_profile_data,
+    delete_screenshot, queue_profile_save,
     toggle_tested, toggle_improved
 )
-from config.settings import DEFAULT_PARAMS, MAX_SCREENSHOTS
+from config.settings import DEFAULT_PARAMS, MAX_SCREENSHOTS, UPLOAD_POLL_INTERVAL, SCREENSHOT_SERVING
 
 def show_status_indicators(asset, timeframe, profile_data):
     """
@@ -164,7 +167,6 @@ def show_parameters_tab(asset, timeframe, profile_data):
         # Save button
         if st.button("Sauvegarder les paramètres", key="save_params_btn", use_container_width=True):
             updated_data = save_params(asset, timeframe, new_params, profile_data)
-            save_profile_data(st.session_state.current_profile, updated_data)
             st.success("Paramètres sauvegardés!")
             return updated_data
         
@@ -201,7 +203,6 @@ def show_notes_tab(asset, timeframe, profile_data):
         # Save button
         if st.button("Sauvegarder la note", key="save_note_btn", use_container_width=True):
             updated_data = save_note(asset, timeframe, new_note, profile_data)
-            save_profile_data(st.session_state.current_profile, updated_data)
             st.success("Note sauvegardée!")
             return updated_data
         
@@ -209,14 +210,74 @@ def show_notes_tab(asset, timeframe, profile_data):
     
     return profile_data
 
-def show_screenshots_tab(asset, timeframe, profile_data):
+# Affichages d'une capture: variante de THUMBNAIL_SIZES, None pour l'original
+SCREENSHOT_VIEWS = {
+    "Miniature": "thumb",
+    "Aperçu": "preview",
+    "Originale": None,
+}
+
+def _show_screenshot_image(screenshot, variant):
+    """Display a screenshot image, by URL when published as a static file"""
+    url = None
+    if SCREENSHOT_SERVING == "static" and st.get_option("server.enableStaticServing"):
+        url = screenshot.get_image_url(variant)
+    if url:
+        # Fichier en cache dans le navigateur: rien n'est renvoyé aux affichages suivants
+        style = "max-width:100%" if variant == "thumb" else "width:100%"
+        st.markdown(f'<img src="{url}" alt="{html.escape(screenshot.description)}" style="{style}">',
+                    unsafe_allow_html=True)
+    elif variant == "thumb":
+        st.image(screenshot.read_image(variant))
+    else:
+        st.image(screenshot.read_image(variant), use_column_width=True)
+
+def _pending_uploads(profile_name, asset, timeframe):
+    """Get the uploads of this session still being processed for a configuration"""
+    pending = st.session_state.setdefault("pending_screenshots", {})
+    return pending.setdefault((profile_name, asset, timeframe), [])
+
+def _attach_processed_uploads(asset, timeframe, profile_data, uploads):
+    """Save the finished uploads as screenshots and show the ones still in progress"""
+    for upload in list(uploads):
+        if not upload["future"].done():
+            st.info(f"⏳ Traitement de la capture « {upload['description'] or 'sans description'} » en cours...")
+            continue
+        uploads.remove(upload)
+        try:
+            profile_data = save_screenshot(asset, timeframe, upload["future"].result(),
+                                           upload["description"], profile_data)
+            st.success("Capture d'écran ajoutée!")
+        except Exception as e:
+            st.error(f"Erreur lors du traitement de l'image: {e}")
+    return profile_data
+
+def _await_pending_uploads(profile_name, asset, timeframe):
+    """Rerun the page when an upload of the displayed configuration finishes processing"""
+    # Seules les captures de cette configuration sont rattachées à la relance:
+    # celles des autres le seront quand elles seront de nouveau affichées
+    pending = st.session_state.get("pending_screenshots", {})
+    key = (profile_name, asset, timeframe)
+    futures = [upload["future"] for upload in pending.get(key, [])]
+    if not futures:
+        pending.pop(key, None)
+    else:
+        wait(futures, timeout=UPLOAD_POLL_INTERVAL, return_when="FIRST_COMPLETED")
+        st.rerun()
+
+def show_screenshots_tab(asset, timeframe, profile_data, profile_name=None):
     """
     Display and manage screenshots for the selected configuration
     
+    Uploads are processed in the background by the image service; they are
+    attached to the profile data on the first run after they finish.
+    
     Args:
         asset (str): Selected asset
         timeframe (str): Selected timeframe
         profile_data (dict): User profile data
+        profile_name (str, optional): Profile the data belongs to, so pending
+            uploads are attached to the right profile
         
     Returns:
         dict: Updated profile data
@@ -225,6 +286,9 @@ def show_screenshots_tab(asset, timeframe, profile_data):
         st.markdown('<div class="section screenshot-section">', unsafe_allow_html=True)
         st.subheader("Captures d'écran")
         
+        uploads = _pending_uploads(profile_name, asset, timeframe)
+        profile_data = _attach_processed_uploads(asset, timeframe, profile_data, uploads)
+        
         # Get current screenshots
         screenshots = get_screenshots(asset, timeframe, profile_data)
         
@@ -233,26 +297,21 @@ def show_screenshots_tab(asset, timeframe, profile_data):
             st.markdown('<div class="thumbnails">', unsafe_allow_html=True)
             
             for i, screenshot in enumerate(screenshots):
-                st.markdown(f"##### Capture {i+1} ({screenshot['date']})")
+                st.markdown(f"##### Capture {i+1} ({screenshot.date})")
                 
-                if screenshot['description']:
-                    st.markdown(f"*{screenshot['description']}*")
+                if screenshot.description:
+                    st.markdown(f"*{screenshot.description}*")
                 
                 try:
-                    # Display the image
-                    import base64
-                    from io import BytesIO
-                    from PIL import Image
-                    
-                    image_data = base64.b64decode(screenshot['image_data'])
-                    image = Image.open(BytesIO(image_data))
-                    st.image(image, use_column_width=True)
+                    # Miniature par défaut: l'image complète n'est lue qu'à la demande
+                    view = st.radio("Affichage", list(SCREENSHOT_VIEWS), horizontal=True,
+                                    key=f"screenshot_view_{i}", label_visibility="collapsed")
+                    _show_screenshot_image(screenshot, SCREENSHOT_VIEWS[view])
                     
                     # Delete button
                     if st.button(f"Supprimer", key=f"delete_screenshot_{i}"):
                         updated_data, success = delete_screenshot(asset, timeframe, i, profile_data)
                         if success:
-                            save_profile_data(st.session_state.current_profile, updated_data)
                             st.success("Capture d'écran supprimée!")
                             return updated_data  # Force a rerun by returning the updated data
                 except Exception as e:
@@ -265,34 +324,24 @@ def show_screenshots_tab(asset, timeframe, profile_data):
             st.info("Aucune capture d'écran pour cette configuration.")
         
         # Upload new screenshot
-        if len(screenshots) < MAX_SCREENSHOTS:
+        if len(screenshots) + len(uploads) < MAX_SCREENSHOTS:
             st.markdown("### Ajouter une capture d'écran")
             
             description = st.text_input("Description:", key="new_screenshot_desc")
-            uploaded_file = st.file_uploader("Choisir une image...", type=["jpg", "jpeg", "png"])
+            uploaded_file = st.file_uploader("Choisir une image...", type=["jpg", "jpeg", "png", "webp"])
             
             if uploaded_file is not None:
-                # Preview the image
-                try:
-                    from PIL import Image
-                    image = Image.open(uploaded_file)
-                    st.image(image, caption="Aperçu", width=300)
-                    
-                    # Save button
-                    if st.button("Sauvegarder cette capture d'écran"):
-                        # Process the image
-                        img_str = process_uploaded_image(uploaded_file)
-                        
-                        if img_str:
-                            # Save the screenshot
-                            updated_data = save_screenshot(asset, timeframe, img_str, description, profile_data)
-                            save_profile_data(st.session_state.current_profile, updated_data)
-                            st.success("Capture d'écran ajoutée!")
-                            return updated_data
-                        else:
-                            st.error("Erreur lors du traitement de l'image.")
-                except Exception as e:
-                    st.error(f"Erreur: {e}")
+                # Aperçu par le navigateur: l'image n'est pas décodée ici
+                st.image(uploaded_file.getvalue(), caption="Aperçu", width=300)
+                
+                # Save button
+                if st.button("Sauvegarder cette capture d'écran"):
+                    # Encodage et miniatures dans un processus séparé: la page reste réactive
+                    uploads.append({
+                        "future": submit_upload(uploaded_file.getvalue()),
+                        "description": description,
+                    })
+                    st.info("⏳ Traitement de la capture en cours...")
         else:
             st.warning(f"Vous avez atteint la limite de {MAX_SCREENSHOTS} captures d'écran. "
                       "Supprimez-en une pour en ajouter une nouvelle.")
@@ -301,20 +350,35 @@ def show_screenshots_tab(asset, timeframe, profile_data):
     
     return profile_data
 
-def show_details_view(asset, timeframe, data_override=None):
+def _commit_details(profile_name, profile_data, revision, data_override):
+    """Queue a save if the data changed during this run and publish it to the session"""
+    if profile_data.revision != revision:
+        queue_profile_save(profile_name, profile_data)
+    if data_override is None:
+        st.session_state.profile_data = profile_data
+    return profile_data
+
+def show_details_view(asset, timeframe, data_override=None, profile_name=None):
     """
     Display detailed view for a selected asset and timeframe
     
+    Changes made in this view are saved once per run, only if the revision
+    of the profile data moved.
+    
     Args:
         asset (str): Selected asset
         timeframe (str): Selected timeframe
-        data_override (dict, optional): Override session data with this data. Used in admin view.
+        data_override (ProfileData, optional): Override session data with this data. Used in admin view.
+        profile_name (str, optional): Profile the data belongs to. Default is the current profile.
         
     Returns:
-        dict: Updated profile data
+        ProfileData: Updated profile data
     """
     # Utiliser les données spécifiques si fournies, sinon utiliser les données de session
     profile_data = data_override if data_override is not None else st.session_state.profile_data
+    if profile_name is None:
+        profile_name = st.session_state.current_profile
+    revision = profile_data.revision
     
     st.markdown(f"## Configuration: {asset} - {timeframe}")
     
@@ -325,41 +389,34 @@ def show_details_view(asset, timeframe, data_override=None):
     col1, col2 = st.columns(2)
     
     with col1:
-        is_already_tested = is_tested(asset, timeframe, st.session_state.profile_data)
+        is_already_tested = is_tested(asset, timeframe, profile_data)
         btn_label = "Marquer Non Testé" if is_already_tested else "Marquer Testé"
         
         if st.button(btn_label, use_container_width=True, key="detail_test_btn"):
-            updated_data, new_status = toggle_tested(asset, timeframe, st.session_state.profile_data)
-            st.session_state.profile_data = updated_data
-            save_profile_data(st.session_state.current_profile, updated_data)
+            profile_data, new_status = toggle_tested(asset, timeframe, profile_data)
             st.success(f"Marqué comme {'testé' if new_status else 'non testé'}")
-            return updated_data
+            return _commit_details(profile_name, profile_data, revision, data_override)
     
     with col2:
-        is_already_improved = is_improved(asset, timeframe, st.session_state.profile_data)
+        is_already_improved = is_improved(asset, timeframe, profile_data)
         improve_btn_label = "Marquer Non Amélioré" if is_already_improved else "Marquer Amélioré"
         
         if st.button(improve_btn_label, use_container_width=True, key="detail_improve_btn"):
-            updated_data, new_status = toggle_improved(asset, timeframe, st.session_state.profile_data)
-            st.session_state.profile_data = updated_data
-            save_profile_data(st.session_state.current_profile, updated_data)
+            profile_data, new_status = toggle_improved(asset, timeframe, profile_data)
             st.success(f"Marqué comme {'amélioré' if new_status else 'non amélioré'}")
-            return updated_data
+            return _commit_details(profile_name, profile_data, revision, data_override)
     
     # Sections de détails empilées verticalement
     with st.expander("📊 Paramètres", expanded=True):
-        updated_data = show_parameters_tab(asset, timeframe, profile_data)
-        if data_override is None and updated_data != st.session_state.profile_data:
-            st.session_state.profile_data = updated_data
+        profile_data = show_parameters_tab(asset, timeframe, profile_data)
     
     with st.expander("📝 Notes", expanded=True):  
-        updated_data = show_notes_tab(asset, timeframe, profile_data)
-        if data_override is None and updated_data != st.session_state.profile_data:
-            st.session_state.profile_data = updated_data
+        profile_data = show_notes_tab(asset, timeframe, profile_data)
     
     with st.expander("🖼️ Captures d'écran", expanded=True):
-        updated_data = show_screenshots_tab(asset, timeframe, profile_data)
-        if data_override is None and updated_data != st.session_state.profile_data:
-            st.session_state.profile_data = updated_data
+        profile_data = show_screenshots_tab(asset, timeframe, profile_data, profile_name)
     
-    return st.session_state.profile_data
+    profile_data = _commit_details(profile_name, profile_data, revision, data_override)
+    # Après l'enregistrement: une relance ne perd aucune modification
+    _await_pending_uploads(profile_name, asset, timeframe)
+    return profile_data
@@ -0,0 +1,54 @@
+"""
+Export view for the Trading Dashboard Pro application.
+Prepares a profile export as a temporary file and offers it through a
+download button, instead of embedding the whole export in a data URL.
+"""
+import os
+import streamlit as st
+from models.data import export_profile_to_file
+
+# Libellés des modes d'export des captures d'écran
+SCREENSHOT_MODE_LABELS = {
+    "inline": "Intégrées au fichier",
+    "omit": "Exclues",
+    "external": "Fichiers séparés (archive zip)"
+}
+
+def show_export_controls(profile_name, key):
+    """
+    Display the export options and the download button of a profile
+
+    Args:
+        profile_name (str): Name of the profile to export
+        key (str): Unique key prefix for the widgets
+    """
+    compress = st.checkbox("Compresser l'export", value=False, key=f"{key}_compress")
+    screenshots = st.radio(
+        "Captures d'écran:",
+        list(SCREENSHOT_MODE_LABELS),
+        format_func=SCREENSHOT_MODE_LABELS.get,
+        key=f"{key}_screenshots"
+    )
+
+    if st.button("Préparer l'export", key=f"{key}_prepare", use_container_width=True):
+        try:
+            path, download_filename, mime = export_profile_to_file(
+                profile_name, compress=compress, screenshots=screenshots
+            )
+        except Exception as e:
+            st.error(f"Erreur lors de l'export: {e}")
+            return
+
+        try:
+            # Streamlit lit le fichier une seule fois; il peut être supprimé ensuite
+            with open(path, 'rb') as f:
+                st.download_button(
+                    f"Télécharger {download_filename}",
+                    data=f,
+                    file_name=download_filename,
+                    mime=mime,
+                    key=f"{key}_download",
+                    use_container_width=True
+                )
+        finally:
+            os.remove(path)